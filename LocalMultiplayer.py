@@ -1,7 +1,7 @@
 import pygame
 import sys
 from checkers.constants import WIDTH, HEIGHT, SQUARE_SIZE, RED, WHITE
-from checkers.game import Game
+from checkers.gameAI import Game
 
 FPS = 60
 MUTE_BTN_RECT = pygame.Rect(10, 10, 40, 40)
@@ -72,7 +72,8 @@ def show_draw_popup(win, draw_type):
     messages = {
         "threefold_repetition": "Draw by threefold repetition!",
         "40_moves_no_capture": "Draw by 40-move rule!",
-        "no_legal_moves": "Draw - no legal moves!"
+        "no_legal_moves": "Draw - no legal moves!",
+        "insufficient_material": "Draw by insufficient material!"
     }
     
     overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
@@ -1,15 +1,23 @@
 import pygame
-import numpy as np
-from sb3_contrib import MaskablePPO
-from sb3_contrib.common.maskable.policies import MaskableActorCriticPolicy
 from checkers.constants import WIDTH, HEIGHT, SQUARE_SIZE, RED, WHITE
 from checkers.gameAI import Game
+from checkers.actions import predict
+from checkers.search import Searcher
+from checkers.parallel_search import ParallelSearcher
+from checkers.mcts import MCTS, PolicyEvaluator
+from checkers.tablebase import Tablebase
+from checkers.book import OpeningBook
+import argparse
 import time
 import sys
 
 FPS = 60
 MUTE_BTN_RECT = pygame.Rect(10, 10, 50, 40)
 AI_MOVE_DELAY = 0.5
+SEARCH_TIME = 1.0  # seconds per move for the alpha-beta opponent
+PLAYOUTS = 400  # MCTS playouts per move
+BATCH_SIZE = 16  # MCTS leaves per policy forward pass
+OPPONENTS = ("ppo", "search", "mcts")
 
 def get_row_col_from_mouse(pos):
     x, y = pos
@@ -123,31 +131,19 @@ def show_draw_popup(win, draw_type):
                     return "rematch"
 
 def get_observation_and_mask(game, current_player):
-    board_obs = np.zeros((64,), dtype=np.int8)
-    action_mask = np.zeros(4096, dtype=np.int8)
+    return game.context(current_player).observation()
 
-    for row in range(8):
-        for col in range(8):
-            piece = game.board.get_piece(row, col)
-            if piece:
-                idx = row * 8 + col
-                val = 1 if piece.color == WHITE else -1
-                if piece.king:
-                    val *= 2
-                board_obs[idx] = val
+def load_model():
+    # Imported here so the search opponent runs without torch installed
+    from sb3_contrib import MaskablePPO
+    from sb3_contrib.common.maskable.policies import MaskableActorCriticPolicy
+    return MaskablePPO.load(
+        "model/checkers_ai_model.zip",
+        policy=MaskableActorCriticPolicy
+    )
 
-                if piece.color == current_player:
-                    valid_moves = game.board.get_valid_moves(piece)
-                    for (to_row, to_col) in valid_moves:
-                        to_idx = to_row * 8 + to_col
-                        action_idx = idx * 64 + to_idx
-                        action_mask[action_idx] = 1
-    return {
-        "board": board_obs,
-        "action_mask": action_mask
-    }
-
-def run_singleplayer():
+def run_singleplayer(opponent="ppo", search_time=SEARCH_TIME, workers=1, tablebase=None, book=None,
+                     playouts=PLAYOUTS, batch_size=BATCH_SIZE):
     pygame.init()
     pygame.mixer.init()
     WIN = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -162,16 +158,27 @@ def run_singleplayer():
     except Exception as e:
         print(f"Could not load music: {e}")
 
-    try:
-        model = MaskablePPO.load(
-            "model/checkers_ai_model.zip",
-            policy=MaskableActorCriticPolicy
-        )
-        print("✅ MaskablePPO AI loaded successfully!")
-    except Exception as e:
-        print(f"❌ Error loading AI: {e}")
-        pygame.quit()
-        return
+    model = searcher = mcts = None
+    if opponent == "search":
+        searcher = ParallelSearcher(workers) if workers > 1 else Searcher()
+        print(f"✅ Alpha-beta search AI ready! ({workers} worker(s))")
+    else:
+        try:
+            model = load_model()
+            print("✅ MaskablePPO AI loaded successfully!")
+            if opponent == "mcts":
+                mcts = MCTS(PolicyEvaluator(model), batch_size)
+        except Exception as e:
+            print(f"❌ Error loading AI: {e}")
+            pygame.quit()
+            return
+
+    if tablebase is not None:
+        tablebase = Tablebase(tablebase)
+        print(f"✅ Endgame tablebase loaded (up to {tablebase.max_pieces} pieces)")
+    if book is not None:
+        book = OpeningBook(book)
+        print(f"✅ Opening book loaded ({len(book)} moves)")
 
     game = Game(WIN)
     clock = pygame.time.Clock()
@@ -205,20 +212,36 @@ def run_singleplayer():
             ai_move_time = current_time + AI_MOVE_DELAY
 
         if ai_thinking and current_time >= ai_move_time:
-            observation = get_observation_and_mask(game, WHITE)
-            action, _ = model.predict(observation, action_masks=observation["action_mask"], deterministic=True)
-
-            from_idx = action // 64
-            to_idx = action % 64
-            from_row, from_col = divmod(from_idx, 8)
-            to_row, to_col = divmod(to_idx, 8)
+            action = None
+            if book is not None:
+                legal = {frm * 64 + to for frm, to, _ in game.board.generate_moves(WHITE)}
+                action = book.choose(game.get_board_hash(), legal)
+                if action is not None:
+                    print(f"📖 Book move: {action}")
+            if action is None and tablebase is not None:
+                move = tablebase.best_move(game.board, WHITE)
+                if move is not None:
+                    print(f"📖 Tablebase: {tablebase.probe(game.board, WHITE)}")
+                    action = move[0] * 64 + move[1]
+            if action is None and searcher is not None:
+                move, info = searcher.search(game.board, WHITE, search_time)
+                print(f"🔎 Depth {info['depth']} | Nodes: {info['nodes']} | "
+                      f"{info['nps']:.0f} nodes/s | Score: {info['score']:.2f}")
+                action = move[0] * 64 + move[1] if move else None
+            elif action is None and mcts is not None:
+                move, info = mcts.search(game.board, WHITE, playouts)
+                print(f"🌳 Playouts: {info['playouts']} in {info['batches']} batches | "
+                      f"{info['playouts_per_sec']:.0f} playouts/s | Value: {info['value']:.2f}")
+                action = move[0] * 64 + move[1] if move else None
+            elif action is None:
+                observation = get_observation_and_mask(game, WHITE)
+                # Decodes grid or compact models alike (checkers.actions)
+                action = predict(model, observation["board"], observation["action_mask"])
+                if not observation["action_mask"][action]:
+                    action = None
 
-            piece = game.board.get_piece(from_row, from_col)
-            if piece and piece.color == WHITE:
-                valid_moves = game.board.get_valid_moves(piece)
-                if (to_row, to_col) in valid_moves:
-                    game.select(from_row, from_col)
-                    game.select(to_row, to_col)
+            if action is not None:
+                game.play(action)
 
             ai_thinking = False
 
@@ -253,10 +276,34 @@ def run_singleplayer():
         pygame.display.update()
 
     pygame.quit()
+    if isinstance(searcher, ParallelSearcher):
+        searcher.close()
+    if tablebase is not None:
+        tablebase.close()
+    if book is not None:
+        book.close()
     # Only return to menu if "Menu" was clicked
     if not run:  # This means "Menu" was clicked
         import subprocess
         subprocess.run([sys.executable, "game_launcher.py"])
 
 if __name__ == "__main__":
-    run_singleplayer()
+    parser = argparse.ArgumentParser(description="Checkers - Human vs AI")
+    parser.add_argument("--opponent", choices=OPPONENTS, default="ppo",
+                        help="ppo: trained MaskablePPO model, search: alpha-beta engine (no torch needed), "
+                             "mcts: tree search guided by the MaskablePPO policy and value")
+    parser.add_argument("--search-time", type=float, default=SEARCH_TIME,
+                        help="seconds per move for the search opponent")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes for the search opponent (root-split parallel search)")
+    parser.add_argument("--tablebase", default=None,
+                        help="directory of endgame tables (python -m checkers.tablebase) to play covered endings perfectly")
+    parser.add_argument("--book", default=None,
+                        help="opening book file (python -m checkers.book) answering known positions without the AI")
+    parser.add_argument("--playouts", type=int, default=PLAYOUTS,
+                        help="playouts per move for the mcts opponent")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help="leaf positions per policy forward pass for the mcts opponent")
+    args = parser.parse_args()
+    run_singleplayer(args.opponent, args.search_time, args.workers, args.tablebase, args.book,
+                     args.playouts, args.batch_size)
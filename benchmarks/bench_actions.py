@@ -0,0 +1,100 @@
+"""Cost of the grid (4096) and compact (250) action encodings.
+
+Run from the project directory:
+
+    python -m benchmarks.bench_actions --envs 16 --steps 300
+
+Reports env steps/sec of CheckersEnv and CheckersVecEnv, the time to build
+one position's mask, and (when torch is installed) a forward pass through
+a policy-sized MLP with a 4096- or 250-wide action head.
+"""
+import argparse
+import contextlib
+import io
+import timeit
+
+import numpy as np
+
+from checkers import batch_moves
+from checkers.actions import ENCODINGS, action_dim
+from checkers.gameAI import PositionContext
+from checkers_env import CheckersEnv
+from checkers_vec_env import CheckersVecEnv
+from benchmarks.bench_vec_env import random_legal_actions
+
+
+def bench_env(encoding, steps, seed=0):
+    """One CheckersEnv under random legal play; returns steps/sec"""
+    rng = np.random.default_rng(seed)
+    env = CheckersEnv(action_encoding=encoding)
+    obs, _ = env.reset(seed=seed)
+    start = timeit.default_timer()
+    # CheckersEnv prints every high-reward step; keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(steps):
+            action = random_legal_actions(obs['action_mask'][None], rng)[0]
+            obs, _, terminated, truncated, _ = env.step(int(action))
+            if terminated or truncated:
+                obs, _ = env.reset()
+    return steps / (timeit.default_timer() - start)
+
+
+def bench_vec(encoding, num_envs, steps, seed=0):
+    """CheckersVecEnv under random legal play; returns env steps/sec"""
+    rng = np.random.default_rng(seed)
+    env = CheckersVecEnv(num_envs, action_encoding=encoding)
+    obs = env.reset()
+    start = timeit.default_timer()
+    for _ in range(steps):
+        obs, _, _, _ = env.step(random_legal_actions(obs['action_mask'], rng))
+    return num_envs * steps / (timeit.default_timer() - start)
+
+
+def bench_masks(encoding, num_envs, number=200):
+    """Microseconds per mask: one PositionContext, and per board of a legal_masks batch"""
+    game = CheckersEnv().game
+    attribute = 'compact_mask' if encoding == 'compact' else 'mask'
+    context = timeit.timeit(lambda: getattr(PositionContext(game.board, game.turn), attribute), number=number)
+    boards = np.tile(game.board.state, (num_envs, 1))
+    compact = encoding == 'compact'
+    batch = timeit.timeit(lambda: batch_moves.legal_masks(boards, game.turn, compact), number=number)
+    return 1e6 * context / number, 1e6 * batch / (number * num_envs)
+
+
+def bench_head(encoding, batch_size, number=200):
+    """Microseconds per forward pass of a 64-256-256-n_actions MLP on batch_size boards"""
+    # Imported here so the env numbers still print without torch installed
+    import torch
+
+    net = torch.nn.Sequential(torch.nn.Linear(64, 256), torch.nn.ReLU(), torch.nn.Linear(256, 256),
+                              torch.nn.ReLU(), torch.nn.Linear(256, action_dim(encoding)))
+    boards = torch.zeros((batch_size, 64))
+    with torch.no_grad():
+        seconds = timeit.timeit(lambda: torch.distributions.Categorical(logits=net(boards)), number=number)
+    return 1e6 * seconds / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--envs', type=int, default=16)
+    parser.add_argument('--steps', type=int, default=300, help="steps per run")
+    args = parser.parse_args()
+
+    try:
+        import torch  # noqa: F401
+        has_torch = True
+    except ImportError:
+        has_torch = False
+        print("torch not installed: skipping the action head column")
+
+    print(f"{'encoding':>8} {'env steps/s':>12} {'vec steps/s':>12} {'context mask us':>16} {'batch mask us':>14} {'head us':>8}")
+    for encoding in ENCODINGS:
+        env_rate = bench_env(encoding, args.steps)
+        vec_rate = bench_vec(encoding, args.envs, args.steps)
+        context_us, batch_us = bench_masks(encoding, args.envs)
+        head = f"{bench_head(encoding, args.envs):>8.0f}" if has_torch else f"{'-':>8}"
+        print(f"{encoding:>8} {env_rate:>12.0f} {vec_rate:>12.0f} {context_us:>16.1f} {batch_us:>14.2f} {head}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Throughput of the board backends behind checkers.gameAI.Game.
+
+Run from the project directory:
+
+    python -m benchmarks.bench_backends --steps 20000
+
+Both backends replay the same random games (same seed), so the numbers
+compare identical work.
+"""
+import argparse
+import copy
+import random
+import time
+
+from checkers.constants import RED, WHITE
+from checkers.gameAI import BACKENDS
+from checkers_env import CheckersEnv
+
+
+def random_legal_action(obs, rng):
+    legal = obs['action_mask'].nonzero()[0]
+    return int(legal[rng.randrange(len(legal))])
+
+
+def bench_env(backend, steps, seed=0):
+    """Random legal play through CheckersEnv; returns env steps/sec"""
+    rng = random.Random(seed)
+    env = CheckersEnv(backend=backend)
+    obs, _ = env.reset(seed=seed)
+    start = time.perf_counter()
+    for _ in range(steps):
+        obs, _, terminated, truncated, _ = env.step(random_legal_action(obs, rng))
+        if terminated or truncated or not obs['action_mask'].any():
+            obs, _ = env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def sample_positions(backend, count, seed=0):
+    """Play random games and return [(board copy, side to move)]"""
+    rng = random.Random(seed)
+    board_cls = BACKENDS[backend]
+    board, turn = board_cls(), RED
+    positions = []
+    while len(positions) < count:
+        options = []
+        for piece in board.get_all_pieces(turn):
+            for target, skipped in board.get_valid_moves(piece).items():
+                options.append((piece, target, skipped))
+        if not options or board.winner() is not None:
+            board, turn = board_cls(), RED
+            continue
+        positions.append((copy.deepcopy(board), turn))
+        piece, (row, col), skipped = options[rng.randrange(len(options))]
+        board.move(piece, row, col)
+        if skipped:
+            board.remove(skipped)
+        turn = WHITE if turn == RED else RED
+    return positions
+
+
+def bench_movegen(positions):
+    """Generate every move of the side to move through the Piece API; returns positions/sec"""
+    start = time.perf_counter()
+    for board, turn in positions:
+        for piece in board.get_all_pieces(turn):
+            board.get_valid_moves(piece)
+    return len(positions) / (time.perf_counter() - start)
+
+
+def bench_native(positions):
+    """Same as bench_movegen on BitBoard's mask level generator; returns positions/sec"""
+    start = time.perf_counter()
+    for board, turn in positions:
+        board.moves(turn)
+    return len(positions) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--steps', type=int, default=20000)
+    args = parser.parse_args()
+
+    results = {}
+    positions = {}
+    for backend in BACKENDS:
+        positions[backend] = sample_positions(backend, args.steps)
+        results[backend] = (bench_env(backend, args.steps), bench_movegen(positions[backend]))
+
+    base_env, base_gen = results['list']
+    print(f"{'backend':<10} {'env steps/s':>12} {'speedup':>8} {'movegen pos/s':>14} {'speedup':>8}")
+    for backend, (env_rate, gen_rate) in results.items():
+        print(f"{backend:<10} {env_rate:>12.0f} {env_rate / base_env:>7.2f}x "
+              f"{gen_rate:>14.0f} {gen_rate / base_gen:>7.2f}x")
+    native = bench_native(positions['bitboard'])
+    print(f"{'bitboard (mask API)':<32} {native:>14.0f} {native / base_gen:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Throughput of checkers.batch_moves against per-board move generation.
+
+Run from the project directory:
+
+    python -m benchmarks.bench_batch_moves --sizes 1 16 256 4096
+
+For each batch size N the same N positions (sampled from random games) get
+their (N, 4096) legal-action masks and one random legal action applied,
+first with the vectorised functions and then board by board through
+BitBoard.generate_moves/make_move, which is what the env does today.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from checkers import batch_moves
+from checkers.constants import WHITE
+from benchmarks.bench_backends import sample_positions
+
+SIZES = (1, 4, 16, 64, 256, 1024, 4096)
+
+
+def _repeat(fn, min_time):
+    """Call fn until min_time has passed; returns seconds per call"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / calls
+
+
+def bench_size(positions, n, min_time=0.3, seed=0):
+    """Returns (batched mask, batched apply, per-board loop) boards/sec for the first n positions"""
+    rng = np.random.default_rng(seed)
+    chosen = positions[:n]
+    boards = np.stack([board.state for board, _ in chosen])
+    sides = np.array([1 if turn == WHITE else -1 for _, turn in chosen], dtype=np.int8)
+    masks = batch_moves.legal_masks(boards, sides)
+    actions = np.argmax(masks * rng.random(masks.shape), axis=1)
+
+    mask_time = _repeat(lambda: batch_moves.legal_masks(boards, sides), min_time)
+    apply_time = _repeat(lambda: batch_moves.apply_actions(boards, sides, actions), min_time)
+
+    def loop():
+        for (board, turn), action in zip(chosen, actions):
+            mask = np.zeros((4096,), dtype=np.int8)
+            moves = board.generate_moves(turn)
+            for frm, to, _ in moves:
+                mask[frm * 64 + to] = 1
+            for move in moves:
+                if move[0] * 64 + move[1] == action:
+                    board.unmake_move(board.make_move(move))
+                    break
+    loop_time = _repeat(loop, min_time)
+    return n / mask_time, n / apply_time, n / loop_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    args = parser.parse_args()
+
+    positions = sample_positions('bitboard', max(args.sizes))
+    print(f"{'N':>6} {'mask boards/s':>14} {'apply boards/s':>15} {'loop boards/s':>14} {'speedup':>8}")
+    for n in args.sizes:
+        mask_rate, apply_rate, loop_rate = bench_size(positions, n)
+        batched = 1 / (1 / mask_rate + 1 / apply_rate)
+        print(f"{n:>6} {mask_rate:>14.0f} {apply_rate:>15.0f} {loop_rate:>14.0f} {batched / loop_rate:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
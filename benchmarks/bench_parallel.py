@@ -0,0 +1,52 @@
+"""Scaling of checkers.parallel_search with the number of worker processes.
+
+Run from the project directory:
+
+    python -m benchmarks.bench_parallel --depth 10 --workers 1 2 4 8 16
+
+For every stored perft position the sequential Searcher and each worker
+count search to a fixed depth (no time limit). The table reports
+time-to-depth, the nodes searched relative to the sequential search (the
+cost of splitting the tree) and the time-to-depth speedup over it. Worker
+counts above the machine's CPU count share cores, so their speedup is
+meaningless and they are marked.
+"""
+import argparse
+import os
+
+from checkers.bitboard import BitBoard
+from checkers.parallel_search import ParallelSearcher
+from checkers.perft import POSITIONS, load_board
+from checkers.search import Searcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--depth', type=int, default=10)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--position', action='append', choices=sorted(POSITIONS),
+                        help="stored position to search (repeatable, default: all)")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    print(f"{cpus} CPU(s)")
+    print(f"{'position':<16} {'workers':>10} {'depth':>5} {'seconds':>8} {'nodes':>9} "
+          f"{'node ratio':>10} {'speedup':>8}")
+    for name in args.position or list(POSITIONS):
+        position = POSITIONS[name]
+        board = load_board(BitBoard, position['diagram'])
+        _, base = Searcher().search(board, position['turn'], time_limit=float('inf'), max_depth=args.depth)
+        print(f"{name:<16} {'sequential':>10} {base['depth']:>5} {base['time']:>8.2f} {base['nodes']:>9} "
+              f"{1.0:>9.2f}x {1.0:>7.2f}x")
+        for workers in args.workers:
+            board = load_board(BitBoard, position['diagram'])
+            with ParallelSearcher(workers) as searcher:
+                _, info = searcher.search(board, position['turn'], time_limit=float('inf'),
+                                          max_depth=args.depth)
+            shared = '  (more workers than CPUs)' if workers > cpus else ''
+            print(f"{name:<16} {workers:>10} {info['depth']:>5} {info['time']:>8.2f} {info['nodes']:>9} "
+                  f"{info['nodes'] / base['nodes']:>9.2f}x {base['time'] / info['time']:>7.2f}x{shared}")
+
+
+if __name__ == "__main__":
+    main()
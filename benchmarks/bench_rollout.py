@@ -0,0 +1,69 @@
+"""Rollout FPS of SharedMemoryVecEnv against the number of worker processes.
+
+Run from the project directory:
+
+    python -m benchmarks.bench_rollout --workers 1 2 4 8 --envs-per-worker 8
+
+Every run plays random legal actions for the same number of vector steps.
+'in-process' is the same envs stepped one by one in this process (what
+DummyVecEnv does); speedups are against it and against one worker.
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+from sb3_contrib.common.wrappers import ActionMasker
+
+from checkers_env import CheckersEnv
+from shared_vec_env import SharedMemoryVecEnv
+from benchmarks.bench_vec_env import bench_loop, random_legal_actions
+
+
+def _mask(env):
+    return env.get_observation()['action_mask'].astype(bool)
+
+
+def masked_env():
+    return ActionMasker(CheckersEnv(), _mask)
+
+
+def bench_workers(workers, envs_per_worker, steps, seed=0):
+    """Random legal play through SharedMemoryVecEnv; returns env steps/sec"""
+    rng = np.random.default_rng(seed)
+    # CheckersEnv prints every high-reward step; keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = SharedMemoryVecEnv(masked_env, workers, envs_per_worker)
+        try:
+            obs = env.reset()
+            start = time.perf_counter()
+            for _ in range(steps):
+                obs, _, _, _ = env.step(random_legal_actions(obs['action_mask'], rng))
+            elapsed = time.perf_counter() - start
+        finally:
+            env.close()
+    return workers * envs_per_worker * steps / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--envs-per-worker', type=int, default=8)
+    parser.add_argument('--steps', type=int, default=300, help="vector steps per run")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'envs':>5} {'in-process fps':>15} {'workers fps':>12} {'vs in-process':>13} {'vs 1 worker':>11}")
+    base = None
+    for workers in args.workers:
+        envs = workers * args.envs_per_worker
+        loop_rate = bench_loop(envs, args.steps)
+        rate = bench_workers(workers, args.envs_per_worker, args.steps)
+        base = base or rate
+        print(f"{workers:>7} {envs:>5} {loop_rate:>15.0f} {rate:>12.0f} {rate / loop_rate:>12.2f}x {rate / base:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Throughput of CheckersVecEnv against CheckersEnv in a DummyVecEnv-style loop.
+
+Run from the project directory:
+
+    python -m benchmarks.bench_vec_env --envs 1 16 64 256 --steps 200
+
+Both sides play random legal actions for the same number of vector steps;
+the table reports aggregate env steps/sec (all games together).
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from checkers_env import CheckersEnv
+from checkers_vec_env import CheckersVecEnv
+
+ENVS = (1, 16, 64, 256)
+
+
+def random_legal_actions(masks, rng):
+    """One random legal action per row (0 for rows without one)"""
+    rows, actions = np.nonzero(masks.view(bool))
+    counts = np.bincount(rows, minlength=len(masks))
+    first = np.cumsum(counts) - counts
+    picks = first + (rng.random(len(masks)) * counts).astype(np.int64)
+    return np.where(counts > 0, actions[np.minimum(picks, len(actions) - 1)], 0)
+
+
+def bench_loop(num_envs, steps, seed=0):
+    """N CheckersEnv stepped one by one with resets, like DummyVecEnv; returns env steps/sec"""
+    rng = np.random.default_rng(seed)
+    envs = [CheckersEnv() for _ in range(num_envs)]
+    masks = np.stack([env.reset(seed=seed)[0]['action_mask'] for env in envs])
+    start = time.perf_counter()
+    # CheckersEnv prints every high-reward step; keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(steps):
+            for i, action in enumerate(random_legal_actions(masks, rng)):
+                obs, _, terminated, truncated, _ = envs[i].step(int(action))
+                if terminated or truncated:
+                    obs, _ = envs[i].reset()
+                masks[i] = obs['action_mask']
+    return num_envs * steps / (time.perf_counter() - start)
+
+
+def bench_vec(num_envs, steps, seed=0):
+    """CheckersVecEnv with the same random policy; returns (env steps/sec, steps_per_second())"""
+    rng = np.random.default_rng(seed)
+    env = CheckersVecEnv(num_envs)
+    obs = env.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        obs, _, _, _ = env.step(random_legal_actions(obs['action_mask'], rng))
+    return num_envs * steps / (time.perf_counter() - start), env.steps_per_second()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--envs', type=int, nargs='+', default=ENVS)
+    parser.add_argument('--steps', type=int, default=200, help="vector steps per run")
+    args = parser.parse_args()
+
+    print(f"{'envs':>5} {'loop steps/s':>13} {'vec steps/s':>12} {'inside env':>11} {'speedup':>8}")
+    for n in args.envs:
+        loop_rate = bench_loop(n, args.steps)
+        vec_rate, inside = bench_vec(n, args.steps)
+        print(f"{n:>5} {loop_rate:>13.0f} {vec_rate:>12.0f} {inside:>11.0f} {vec_rate / loop_rate:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
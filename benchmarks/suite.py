@@ -0,0 +1,329 @@
+"""Env and engine benchmark suite with a stored baseline, to gate performance regressions.
+
+Run from the project directory (no display is opened):
+
+    python -m benchmarks.suite                    # measure, write benchmarks/results.json, compare
+    python -m benchmarks.suite --save-baseline    # measure and store benchmarks/baseline.json
+
+Every metric is the best of --repeat runs over the same seeded random games.
+A metric regresses when it is more than --tolerance worse than the baseline
+(lower for rates, higher for latencies) and stays so over --retries extra
+rounds of the suite; the exit status is 1 if any did, so a change to
+checkers/ or checkers_env.py can be checked before retraining. Baselines
+hold the median of 1 + --retries rounds.
+
+Timings only compare on the machine they were taken on, so no baseline is
+committed. Setting up a gate machine is one step, run there (and again after
+a hardware, Python or NumPy change):
+
+    python -m benchmarks.suite --save-baseline
+
+Without a baseline, or with one stored on a different machine, the suite
+still measures and writes its results but gates nothing and exits with 2.
+The MaskablePPO.predict latencies need torch and sb3_contrib; without them
+they are reported as skipped and never gate. parallel_speedup is the
+time-to-depth of checkers.search.Searcher over checkers.parallel_search's
+(higher is better, below 1 the split does not pay); it needs at least two
+CPUs and is skipped on one.
+"""
+import os
+
+# Headless: set before anything imports pygame
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import contextlib
+import copy
+import datetime
+import gc
+import io
+import json
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+from checkers.bitboard import BitBoard
+from checkers.gameAI import BACKENDS, PositionContext
+from checkers.parallel_search import ParallelSearcher
+from checkers.perft import POSITIONS, load_board
+from checkers.search import Searcher
+from checkers_env import CheckersEnv
+
+BATCH_SIZES = (1, 32, 256)
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results.json')
+TOLERANCE = 0.25
+HASH_LOOPS = 100
+SEARCH_POSITIONS = ('start', 'kings')
+MAX_WORKERS = 4
+
+
+def _random_action(obs, rng):
+    legal = obs['action_mask'].nonzero()[0]
+    return int(legal[rng.randrange(len(legal))])
+
+
+def sample_games(backend, count, seed=0):
+    """Copies of CheckersEnv's Game along seeded random games, one per ply"""
+    rng = random.Random(seed)
+    env = CheckersEnv(backend=backend)
+    obs, _ = env.reset(seed=seed)
+    games = []
+    # CheckersEnv prints every high-reward step
+    with contextlib.redirect_stdout(io.StringIO()):
+        while len(games) < count:
+            games.append(copy.deepcopy(env.game))
+            obs, _, terminated, truncated, _ = env.step(_random_action(obs, rng))
+            if terminated or truncated or not obs['action_mask'].any():
+                obs, _ = env.reset()
+    return games
+
+
+def _best(repeat, run):
+    """Smallest of repeat timings of run() (seconds), with the garbage collector off like timeit"""
+    timings = []
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+    finally:
+        if enabled:
+            gc.enable()
+    return min(timings)
+
+
+def bench_env(backend, steps, repeat):
+    """{metric: value} for CheckersEnv.reset and .step under random legal play"""
+    env = CheckersEnv(backend=backend)
+    reset = _best(repeat, lambda: [env.reset() for _ in range(steps)])
+
+    def play():
+        rng = random.Random(0)
+        obs, _ = env.reset(seed=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(steps):
+                obs, _, terminated, truncated, _ = env.step(_random_action(obs, rng))
+                if terminated or truncated or not obs['action_mask'].any():
+                    obs, _ = env.reset()
+    step = _best(repeat, play)
+    return {f'env_reset[{backend}]': steps / reset, f'env_step[{backend}]': steps / step}
+
+
+def bench_engine(backend, games, repeat):
+    """{metric: microseconds per call} for the per-ply work of CheckersEnv.step, nothing cached"""
+    env = CheckersEnv(backend=backend)
+    pieces = [(game.board, piece) for game in games for piece in game.board.get_all_pieces(game.turn)]
+
+    def observe():
+        for game in games:
+            game._contexts.clear()
+            env.game, env.current_player = game, game.turn
+            env.get_observation()
+
+    def check_draw():
+        for game in games:
+            game._contexts.clear()
+            game.check_draw()
+
+    n = len(games)
+    return {
+        f'get_observation[{backend}]': 1e6 * _best(repeat, observe) / n,
+        f'action_mask[{backend}]': 1e6 * _best(repeat, lambda: [PositionContext(game.board, game.turn).mask
+                                                                 for game in games]) / n,
+        f'get_valid_moves[{backend}]': 1e6 * _best(repeat, lambda: [board.get_valid_moves(piece)
+                                                                     for board, piece in pieces]) / len(pieces),
+        f'check_draw[{backend}]': 1e6 * _best(repeat, check_draw) / n,
+        # Sub-microsecond: loop over the games HASH_LOOPS times so a run lasts long enough to time
+        f'get_board_hash[{backend}]': 1e6 * _best(repeat, lambda: [game.get_board_hash() for _ in range(HASH_LOOPS)
+                                                                    for game in games]) / (n * HASH_LOOPS),
+    }
+
+
+def bench_predict(games, repeat, model_path=None):
+    """{metric: milliseconds per MaskablePPO.predict call} for each batch size, or None without torch"""
+    try:
+        # Imported here so the env and engine metrics run without torch installed
+        from sb3_contrib import MaskablePPO
+    except ImportError:
+        return None
+    env = CheckersEnv()
+    model = MaskablePPO.load(model_path, device='cpu') if model_path else \
+        MaskablePPO('MultiInputPolicy', env, device='cpu', seed=0)
+    results = {}
+    for size in BATCH_SIZES:
+        batch = [games[i % len(games)] for i in range(size)]
+        observations = [PositionContext(game.board, game.turn).observation() for game in batch]
+        obs = {key: np.stack([o[key] for o in observations]) for key in ('board', 'action_mask')}
+        calls = max(2000 // size, 10)
+        seconds = _best(repeat, lambda: [model.predict(obs, action_masks=obs['action_mask'], deterministic=True)
+                                         for _ in range(calls)])
+        results[f'predict[batch={size}]'] = 1e3 * seconds / calls
+    return results
+
+
+def _time_to_depth(make_searcher, depth):
+    """Seconds the searcher make_searcher() builds takes to search SEARCH_POSITIONS to depth"""
+    seconds = 0.0
+    for name in SEARCH_POSITIONS:
+        position = POSITIONS[name]
+        board = load_board(BitBoard, position['diagram'])
+        searcher = make_searcher()
+        try:
+            _, info = searcher.search(board, position['turn'], time_limit=float('inf'), max_depth=depth)
+        finally:
+            if isinstance(searcher, ParallelSearcher):
+                searcher.close()
+        seconds += info['time']
+    return seconds
+
+
+def bench_parallel(depth, repeat):
+    """{metric: time-to-depth speedup of ParallelSearcher over Searcher}, or None on a single CPU
+
+    Every run starts from empty transposition tables; pool start-up is not timed.
+    """
+    cpus = os.cpu_count() or 1
+    if cpus < 2:
+        return None
+    workers = min(cpus, MAX_WORKERS)
+    sequential = min(_time_to_depth(Searcher, depth) for _ in range(repeat))
+    parallel = min(_time_to_depth(lambda: ParallelSearcher(workers), depth) for _ in range(repeat))
+    return {f'parallel_speedup[workers={workers}]': sequential / parallel}
+
+
+def run(steps, positions, repeat, model_path=None, search_depth=8):
+    """{metric: {'value', 'unit', 'higher_is_better'}} for the whole suite"""
+    metrics = {}
+
+    def add(values, unit, higher_is_better):
+        for name, value in values.items():
+            metrics[name] = {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+
+    for backend in BACKENDS:
+        add(bench_env(backend, steps, repeat), 'calls/s', True)
+        add(bench_engine(backend, sample_games(backend, positions), repeat), 'us/call', False)
+    predict = bench_predict(sample_games('list', max(BATCH_SIZES)), repeat, model_path)
+    if predict is not None:
+        add(predict, 'ms/call', False)
+    speedup = bench_parallel(search_depth, repeat)
+    if speedup is not None:
+        add(speedup, 'x', True)
+    return metrics
+
+
+def median_of(runs):
+    """Per-metric median of several run() results"""
+    metrics = runs[0]
+    for name, metric in metrics.items():
+        metric['value'] = float(np.median([run[name]['value'] for run in runs]))
+    return metrics
+
+
+def best_of(metrics, more):
+    """Per-metric best of two run() results"""
+    for name, metric in more.items():
+        old = metrics.setdefault(name, metric)['value']
+        value = metric['value']
+        metrics[name]['value'] = max(old, value) if metric['higher_is_better'] else min(old, value)
+    return metrics
+
+
+def compare(metrics, baseline, tolerance):
+    """{metric: {'baseline', 'change', 'regressed'}} for the metrics the baseline also has
+
+    change is the relative improvement (negative: worse), whatever the metric's direction.
+    """
+    comparisons = {}
+    for name, metric in metrics.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]['value']
+        change = metric['value'] / old - 1 if metric['higher_is_better'] else old / metric['value'] - 1
+        comparisons[name] = {'baseline': old, 'change': change, 'regressed': change < -tolerance}
+    return comparisons
+
+
+def machine():
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+            'processor': platform.processor(), 'cpus': os.cpu_count()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--steps', type=int, default=3000, help="env steps (and resets) per run")
+    parser.add_argument('--positions', type=int, default=1000, help="positions timed per engine metric")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help="allowed slowdown, as a fraction")
+    parser.add_argument('--search-depth', type=int, default=8, help="depth the parallel speedup is timed to")
+    parser.add_argument('--model', help="MaskablePPO checkpoint to time (default: an untrained MultiInputPolicy)")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--output', default=RESULTS_PATH)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="store the results as the new baseline (median of 1 + RETRIES rounds)")
+    parser.add_argument('--retries', type=int, default=2,
+                        help="extra rounds of the suite (best kept) while a metric looks regressed")
+    args = parser.parse_args()
+
+    if args.save_baseline:
+        # A typical round rather than the luckiest one, so the gate does not chase noise
+        metrics = median_of([run(args.steps, args.positions, args.repeat, args.model, args.search_depth)
+                             for _ in range(1 + args.retries)])
+    else:
+        metrics = run(args.steps, args.positions, args.repeat, args.model, args.search_depth)
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    if baseline is not None and baseline['machine'] != machine():
+        print(f"{args.baseline} was stored on another machine ({baseline['machine']}), not compared")
+        baseline = None
+    comparisons = compare(metrics, baseline['metrics'], args.tolerance) if baseline else {}
+    # Timings on a busy machine only err on the slow side: a regression has to persist over the retries
+    rounds = 1 + args.retries if args.save_baseline else 1
+    while rounds <= args.retries and any(comparison['regressed'] for comparison in comparisons.values()):
+        metrics = best_of(metrics, run(args.steps, args.positions, args.repeat, args.model, args.search_depth))
+        comparisons = compare(metrics, baseline['metrics'], args.tolerance) if baseline else {}
+        rounds += 1
+
+    results = {'timestamp': datetime.datetime.now().isoformat(timespec='seconds'), 'machine': machine(),
+               'settings': {'steps': args.steps, 'positions': args.positions, 'repeat': args.repeat,
+                            'rounds': rounds, 'tolerance': args.tolerance, 'model': args.model},
+               'metrics': metrics, 'comparisons': comparisons}
+    with open(args.baseline if args.save_baseline else args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    if not any(name.startswith('predict') for name in metrics):
+        print("torch/sb3_contrib not installed: skipped the MaskablePPO.predict metrics")
+    if not any(name.startswith('parallel_speedup') for name in metrics):
+        print("single CPU: skipped the parallel_speedup metric")
+    print(f"{'metric':<28} {'value':>10} {'unit':<8} {'baseline':>10} {'change':>8}")
+    for name, metric in metrics.items():
+        line = f"{name:<28} {metric['value']:>10.2f} {metric['unit']:<8}"
+        if name in comparisons:
+            comparison = comparisons[name]
+            line += f" {comparison['baseline']:>10.2f} {comparison['change']:>+7.1%}"
+            if comparison['regressed']:
+                line += "  REGRESSION"
+        print(line)
+    if args.save_baseline:
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if baseline is None:
+        print("No baseline for this machine: run python -m benchmarks.suite --save-baseline on it first")
+        return 2
+    regressions = [name for name, comparison in comparisons.items() if comparison['regressed']]
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
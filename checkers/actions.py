@@ -0,0 +1,128 @@
+"""Action encodings for CheckersEnv and the PPO model.
+
+'grid' is the original Discrete(4096) index from_square * 64 + to_square.
+'compact' numbers only the (from, to) pairs some legal move can ever
+produce -- every step and (multi-)jump landing on the 32 playable squares,
+250 in all, in grid order. Masks shrink 16x and the policy head has 250
+logits instead of 4096. The other 3846 grid actions are always masked, so
+a checkpoint converts between encodings without changing its policy:
+
+    python -m checkers.actions model/checkers_ai_model.zip model/checkers_ai_compact.zip --to compact
+"""
+import argparse
+
+import numpy as np
+
+from . import batch_moves
+
+ENCODINGS = ('grid', 'compact')
+GRID_DIM = batch_moves.ACTION_DIM
+# Grid action of each compact index, and compact index of each grid action (-1: never legal)
+COMPACT_ACTIONS = np.unique(batch_moves.ACTION)
+COMPACT_DIM = len(COMPACT_ACTIONS)
+GRID_TO_COMPACT = np.full(GRID_DIM, -1)
+GRID_TO_COMPACT[COMPACT_ACTIONS] = np.arange(COMPACT_DIM)
+
+
+def action_dim(encoding):
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown action encoding: {encoding}")
+    return COMPACT_DIM if encoding == 'compact' else GRID_DIM
+
+
+def encoding_of(model):
+    """Encoding a MaskablePPO model (or anything with an action_space) was trained with"""
+    return 'compact' if model.action_space.n == COMPACT_DIM else 'grid'
+
+
+def to_grid(action, encoding):
+    """Grid action (from * 64 + to) of an action in encoding"""
+    return int(COMPACT_ACTIONS[action]) if encoding == 'compact' else int(action)
+
+
+def from_grid(action, encoding):
+    """Action in encoding of a grid action (-1 if it has no compact index)"""
+    return int(GRID_TO_COMPACT[action]) if encoding == 'compact' else int(action)
+
+
+def convert_mask(grid_mask, encoding):
+    """(..., 4096) grid masks as masks in encoding"""
+    return grid_mask[..., COMPACT_ACTIONS] if encoding == 'compact' else grid_mask
+
+
+def grid_mask(mask, encoding):
+    """(..., n) masks in encoding as (..., 4096) grid masks"""
+    if encoding != 'compact':
+        return mask
+    grid = np.zeros(mask.shape[:-1] + (GRID_DIM,), dtype=mask.dtype)
+    grid[..., COMPACT_ACTIONS] = mask
+    return grid
+
+
+def predict(model, board_obs, grid_mask, deterministic=True):
+    """model.predict for one CheckersEnv position in grid terms; returns the grid action"""
+    encoding = encoding_of(model)
+    mask = convert_mask(grid_mask, encoding)
+    action, _ = model.predict({'board': board_obs, 'action_mask': mask},
+                              action_masks=mask, deterministic=deterministic)
+    return to_grid(action, encoding)
+
+
+def convert_checkpoint(src, dst, encoding='compact'):
+    """Save the MaskablePPO checkpoint at src with its action head and spaces in encoding.
+
+    The rows of the action layer for never-legal grid actions are dropped
+    (to compact) or zero-filled (to grid); the optimizer state is reset.
+    """
+    # Imported here so the encoding tables work without torch installed
+    import torch
+    from gymnasium import spaces
+    from sb3_contrib import MaskablePPO
+    from sb3_contrib.common.maskable.distributions import make_masked_proba_distribution
+
+    model = MaskablePPO.load(src, device='cpu')
+    policy = model.policy
+    old = policy.action_net
+    if encoding_of(model) == encoding:
+        model.save(dst)
+        return model
+    dim = action_dim(encoding)
+    rows = torch.as_tensor(COMPACT_ACTIONS)
+    head = torch.nn.Linear(old.in_features, dim)
+    with torch.no_grad():
+        if encoding == 'compact':
+            head.weight.copy_(old.weight[rows])
+            head.bias.copy_(old.bias[rows])
+        else:
+            head.weight.zero_()
+            head.bias.zero_()
+            head.weight[rows] = old.weight
+            head.bias[rows] = old.bias
+    policy.action_net = head
+
+    action_space = spaces.Discrete(dim)
+    observation_space = spaces.Dict({
+        'board': model.observation_space['board'],
+        'action_mask': spaces.Box(low=0, high=1, shape=(dim,), dtype=np.int8)
+    })
+    model.action_space = policy.action_space = action_space
+    model.observation_space = policy.observation_space = observation_space
+    policy.action_dist = make_masked_proba_distribution(action_space)
+    policy.optimizer = policy.optimizer_class(policy.parameters(), lr=model.lr_schedule(1),
+                                              **policy.optimizer_kwargs)
+    model.save(dst)
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a MaskablePPO checkpoint between action encodings")
+    parser.add_argument('src')
+    parser.add_argument('dst')
+    parser.add_argument('--to', choices=ENCODINGS, default='compact')
+    args = parser.parse_args()
+    convert_checkpoint(args.src, args.dst, args.to)
+    print(f"{args.src} -> {args.dst} ({args.to}, {action_dim(args.to)} actions)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Vectorised move generation for a whole stack of boards at once.
+
+Boards are int8 arrays in the CheckersEnv 'board' encoding (1/2 white
+man/king, -1/-2 red man/king), shaped (N, 64) for the 8x8 layout or (N, 32)
+for the playable squares in checkers.bitboard order. The side to move is
+WHITE/RED for the whole batch or an (N,) array of +1 (WHITE) / -1 (RED).
+
+Every move is a template built once from the same walk as checkers.movegen:
+origin, landing, removed pieces and the squares that must hold an opponent
+or be empty. A board packs into one uint64 key with two bits per square
+(empty, opponent, piece able to move this way, own blocked piece), so a
+template is legal when key & CARE == WANT. Python never loops over boards.
+"""
+import numpy as np
+
+from .constants import ROWS, COLS, WHITE
+from .bitboard import SQUARE_OF, SQUARE64
+
+ACTION_DIM = 4096
+_SQUARE64_INDEX = np.array(SQUARE64)
+
+
+def _bit(row, col):
+    return 1 << SQUARE_OF[row * COLS + col]
+
+
+def _walk(origin, row, col, step, side, skipped, need_opp, need_empty, out):
+    """Template twin of checkers.movegen._walk: append every move along one diagonal.
+
+    Templates are (origin, vertical step, landing, removed mask, required
+    opponents mask, required empty mask).
+    """
+    top = 1 if skipped and step < 0 else 0
+    r1, c1 = row + step, col + side
+    if r1 < top or r1 >= ROWS or c1 < 0 or c1 >= COLS:
+        return
+    if not skipped:
+        out.append((origin, step, SQUARE_OF[r1 * COLS + c1], 0, 0, _bit(r1, c1)))
+    r2, c2 = r1 + step, c1 + side
+    if r2 < top or r2 >= ROWS or c2 < 0 or c2 >= COLS:
+        return
+    jumped = _bit(r1, c1)
+    need_opp |= jumped
+    need_empty |= _bit(r2, c2)
+    out.append((origin, step, SQUARE_OF[r2 * COLS + c2], jumped | skipped, need_opp, need_empty))
+    _walk(origin, r2, c2, step, -1, jumped, need_opp, need_empty, out)
+    _walk(origin, r2, c2, step, 1, jumped, need_opp, need_empty, out)
+
+
+def _build_templates():
+    out = []
+    for sq in range(32):
+        row, col = divmod(SQUARE64[sq], COLS)
+        for step in (-1, 1):
+            for side in (-1, 1):
+                _walk(sq, row, col, step, side, 0, 0, 0, out)
+    return out
+
+
+_TEMPLATES = _build_templates()
+ORIGIN = np.array([t[0] for t in _TEMPLATES])
+LANDING = np.array([t[2] for t in _TEMPLATES])
+ACTION = _SQUARE64_INDEX[ORIGIN] * 64 + _SQUARE64_INDEX[LANDING]
+# Removed pieces (only the last two of a chain, as on the list boards) as (T, 32) bools
+CAPTURED = np.array([[(t[3] >> sq) & 1 for sq in range(32)] for t in _TEMPLATES], dtype=bool)
+KINGING = np.array([SQUARE64[t[2]] // COLS in (0, ROWS - 1) for t in _TEMPLATES])
+# The extra last entries belong to a sentinel template no key matches (pads GROUPS)
+UPWARD = np.array([t[1] < 0 for t in _TEMPLATES] + [False])
+# Key bits: low word opponents | own blocked pieces, high word movers | own blocked pieces.
+# The origin wants (0, 1), jumped squares (1, 0) and empty squares (0, 0). The sentinel
+# wants (1, 0) on a square it does not care about, which no key can give.
+_SQUARES = [1 << t[0] | t[4] | t[5] for t in _TEMPLATES]
+CARE = np.array([squares | squares << 32 for squares in _SQUARES] + [0], dtype=np.uint64)
+WANT = np.array([1 << t[0] << 32 | t[4] for t in _TEMPLATES] + [1], dtype=np.uint64)
+_UP = np.nonzero(UPWARD)[0]
+_DOWN = np.nonzero(~UPWARD[:-1])[0]
+
+
+def _build_groups():
+    """Templates sharing an action, in walk order so the last valid one wins like the targets dict"""
+    by_action = {}
+    for index, action in enumerate(ACTION):
+        by_action.setdefault(int(action), []).append(index)
+    width = max(len(group) for group in by_action.values())
+    sentinel = len(_TEMPLATES)
+    actions = np.array(sorted(by_action))
+    groups = np.full((len(actions), width), sentinel)
+    for row, action in enumerate(actions):
+        groups[row, :len(by_action[action])] = by_action[action]
+    group_of = np.full(ACTION_DIM, -1)
+    group_of[actions] = np.arange(len(actions))
+    return groups, group_of
+
+
+GROUPS, GROUP_OF = _build_groups()
+# Groups are the distinct actions in grid order, i.e. checkers.actions' compact encoding
+COMPACT = GROUP_OF[ACTION]
+
+
+def to_squares(boards):
+    """(N, 64) boards -> (N, 32) playable squares"""
+    return np.asarray(boards)[:, _SQUARE64_INDEX]
+
+
+def to_grid(squares):
+    """(N, 32) playable squares -> (N, 64) boards"""
+    grid = np.zeros((len(squares), 64), dtype=np.int8)
+    grid[:, _SQUARE64_INDEX] = squares
+    return grid
+
+
+def _squares_of(boards):
+    boards = np.asarray(boards)
+    return boards if boards.shape[1] == 32 else to_squares(boards)
+
+
+def _sides(turn, n):
+    if isinstance(turn, tuple):
+        return np.full(n, 1 if turn == WHITE else -1, dtype=np.int8)
+    return np.asarray(turn, dtype=np.int8).reshape(n)
+
+
+def _pack(bits):
+    """(N, 32) bools -> (N,) uint32 masks"""
+    return np.ascontiguousarray(np.packbits(bits, axis=1, bitorder='little')).view('<u4').reshape(-1)
+
+
+def _key(blocked_or_opp, movers):
+    return _pack(blocked_or_opp).astype(np.uint64) | _pack(movers).astype(np.uint64) << np.uint64(32)
+
+
+def _keys(squares, sides):
+    """uint64 keys of every board for upward and for downward templates"""
+    relative = squares * sides[:, None]
+    kings = relative == 2
+    opp = relative < 0
+    red_men = (relative == 1) & (sides < 0)[:, None]      # RED men move up the board
+    white_men = (relative == 1) & (sides > 0)[:, None]    # WHITE men move down
+    return _key(opp | white_men, kings | red_men | white_men), _key(opp | red_men, kings | red_men | white_men)
+
+
+def legal_masks(boards, turn, compact=False):
+    """(N, 4096) int8 legal-action masks, matching CheckersEnv.get_observation()['action_mask'].
+
+    compact=True gives (N, 250) masks in the compact encoding (see checkers.actions).
+    """
+    squares = _squares_of(boards)
+    n = len(squares)
+    up, down = _keys(squares, _sides(turn, n))
+    columns = COMPACT if compact else ACTION
+    masks = np.zeros((n, len(GROUPS) if compact else ACTION_DIM), dtype=np.int8)
+    for keys, templates in ((up, _UP), (down, _DOWN)):
+        rows, index = np.nonzero((keys[:, None] & CARE[templates]) == WANT[templates])
+        masks[rows, columns[templates[index]]] = 1
+    return masks
+
+
+def apply_actions(boards, turn, actions):
+    """Play one action per board; returns (new boards, pieces captured, legal).
+
+    Boards whose action is illegal are returned unchanged with legal False.
+    New boards keep the input layout ((N, 64) or (N, 32)).
+    """
+    boards = np.asarray(boards)
+    squares = _squares_of(boards)
+    n = len(squares)
+    up, down = _keys(squares, _sides(turn, n))
+    actions = np.asarray(actions).reshape(n)
+    group = GROUP_OF[actions]
+    candidates = GROUPS[np.maximum(group, 0)]
+    keys = np.where(UPWARD[candidates], up[:, None], down[:, None])
+    valid = ((keys & CARE[candidates]) == WANT[candidates]) & (group >= 0)[:, None]
+    legal = valid.any(axis=1)
+    # Last valid template of the group, like the last write into movegen's targets dict
+    last = candidates.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    chosen = candidates[np.arange(n), last][legal]
+
+    rows = np.nonzero(legal)[0]
+    squares = squares.copy()
+    piece = squares[rows, ORIGIN[chosen]]
+    squares[rows, ORIGIN[chosen]] = 0
+    squares[rows, LANDING[chosen]] = np.where(KINGING[chosen], np.sign(piece) * 2, piece)
+    squares[rows] = np.where(CAPTURED[chosen], 0, squares[rows])
+    captures = np.zeros(n, dtype=np.int64)
+    captures[rows] = CAPTURED[chosen].sum(axis=1)
+
+    if boards.shape[1] == 32:
+        return squares, captures, legal
+    return to_grid(squares), captures, legal
@@ -0,0 +1,494 @@
+import struct
+
+import numpy as np
+from .constants import ROWS, RED, COLS, WHITE
+from .piece import Piece
+from .zobrist import PIECE_KEYS, WHITE_MAN, WHITE_KING, RED_MAN, RED_KING, piece_key, hash_pieces
+
+# Playable (dark) squares are numbered 0..31, four per row:
+# square = row * 4 + col // 2, bit `square` set in a 32-bit mask.
+FULL = 0xFFFFFFFF
+EVEN_ROWS = 0
+for _row in range(0, ROWS, 2):
+    EVEN_ROWS |= 0xF << (_row * 4)
+ODD_ROWS = FULL & ~EVEN_ROWS
+LEFT_EDGE = 0   # column 0, only on odd rows
+RIGHT_EDGE = 0  # column 7, only on even rows
+for _row in range(ROWS):
+    if _row % 2:
+        LEFT_EDGE |= 1 << (_row * 4)
+    else:
+        RIGHT_EDGE |= 1 << (_row * 4 + 3)
+
+
+def up_left(b):
+    return ((b & EVEN_ROWS) >> 4) | ((b & ODD_ROWS & ~LEFT_EDGE) >> 5)
+
+
+def up_right(b):
+    return ((b & EVEN_ROWS & ~RIGHT_EDGE) >> 3) | ((b & ODD_ROWS) >> 4)
+
+
+def down_left(b):
+    return (((b & EVEN_ROWS) << 4) | ((b & ODD_ROWS & ~LEFT_EDGE) << 3)) & FULL
+
+
+def down_right(b):
+    return (((b & EVEN_ROWS & ~RIGHT_EDGE) << 5) | ((b & ODD_ROWS) << 4)) & FULL
+
+
+# Directions in the order Board.get_valid_moves explores them.
+UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT = range(4)
+SHIFTS = (up_left, up_right, down_left, down_right)
+# Reverse shift for each direction (used to map targets back onto movers).
+REVERSE = (down_right, down_left, up_right, up_left)
+# Left/right continuation directions for a chain that keeps going up or down.
+CHAIN = ((UP_LEFT, UP_RIGHT), (UP_LEFT, UP_RIGHT), (DOWN_LEFT, DOWN_RIGHT), (DOWN_LEFT, DOWN_RIGHT))
+
+SQUARE_ROW = [sq // 4 for sq in range(32)]
+SQUARE_COL = [2 * (sq % 4) + (1 - (sq // 4) % 2) for sq in range(32)]
+# Playable square -> 8x8 index (row * 8 + col) used by checkers.movegen moves
+SQUARE64 = [SQUARE_ROW[sq] * COLS + SQUARE_COL[sq] for sq in range(32)]
+_SQUARE64_INDEX = np.array(SQUARE64)
+# Observation value of each mask in (white men, white kings, red men, red kings) order
+_MASK_VALUES = np.array([1, 2, -1, -2], dtype=np.int8)
+
+
+# 8x8 index (row * 8 + col) -> playable square, -1 for light squares
+SQUARE_OF = [row * 4 + col // 2 if (row + col) % 2 else -1
+             for row in range(ROWS) for col in range(COLS)]
+
+
+def square_of(row, col):
+    """Return the playable square index for (row, col), or -1 for a light square"""
+    return SQUARE_OF[row * COLS + col]
+
+
+# Board snapshot (to_bytes/restore on either backend): the white men, white kings,
+# red men and red kings masks, in zobrist kind order as in checkers.tablebase
+MASKS = struct.Struct('<4I')
+# Men can only stand where they have not been promoted yet
+WHITE_MAN_ROWS = FULL >> 4
+RED_MAN_ROWS = FULL & ~0xF
+
+
+def unpack_masks(data):
+    """(white men, white kings, red men, red kings) of a board snapshot, checked for consistency"""
+    white_men, white_kings, red_men, red_kings = masks = MASKS.unpack(data)
+    if _popcount(white_men | white_kings | red_men | red_kings) != sum(_popcount(mask) for mask in masks):
+        raise ValueError("Board snapshot puts two pieces on one square")
+    if white_men & ~WHITE_MAN_ROWS or red_men & ~RED_MAN_ROWS:
+        raise ValueError("Board snapshot has a man on its promotion row")
+    return masks
+
+
+def mask_squares(masks):
+    """Yield (8x8 square, zobrist kind) of every piece in (white men, white kings, red men, red kings) masks"""
+    for kind, mask in enumerate(masks):
+        while mask:
+            low = mask & -mask
+            yield SQUARE64[low.bit_length() - 1], kind
+            mask ^= low
+
+
+def _neighbour_table(shift):
+    table = []
+    for sq in range(32):
+        b = shift(1 << sq)
+        table.append(b.bit_length() - 1 if b else -1)
+    return table
+
+
+NEIGHBOUR = [_neighbour_table(shift) for shift in SHIFTS]
+
+
+def _popcount(b):
+    return bin(b).count("1")
+
+
+class BitBoard:
+    """Bitboard implementation of checkers.boardAI.Board.
+
+    The position is four 32-bit masks (white/red men and kings). Pieces handed
+    out by get_piece/get_all_pieces are Piece objects built from the masks and
+    cached until the position changes, so callers can keep using the Piece
+    based API of the list board.
+
+    The gain is in move generation and make_move/unmake_move (search,
+    tablebases, batch work through moves()). Game's select/move path goes
+    through those Piece views, so a CheckersEnv step is no faster, and
+    somewhat slower, than on the list board (benchmarks.bench_backends).
+    """
+
+    def __init__(self):
+        self.white_men = 0
+        self.white_king_mask = 0
+        self.red_men = 0
+        self.red_king_mask = 0
+        self._views = {}
+        self._state = None  # state array once built: kept up to date by moves and captures, dropped otherwise
+        self.undo_stack = []
+        self.create_board()
+        self.hash = hash_pieces(self.get_all_pieces())
+
+    def create_board(self):
+        for sq in range(32):
+            if SQUARE_ROW[sq] < 3:
+                self.white_men |= 1 << sq
+            elif SQUARE_ROW[sq] > 4:
+                self.red_men |= 1 << sq
+
+    def to_bytes(self):
+        """16-byte snapshot of the position (see MASKS), restorable on either backend"""
+        return MASKS.pack(self.white_men, self.white_king_mask, self.red_men, self.red_king_mask)
+
+    @classmethod
+    def from_bytes(cls, data):
+        board = cls()
+        board.restore(data)
+        return board
+
+    def restore(self, data):
+        """Set the position to a to_bytes() snapshot in place"""
+        masks = unpack_masks(data)
+        self.white_men, self.white_king_mask, self.red_men, self.red_king_mask = masks
+        self._views.clear()
+        self._state = None
+        self.undo_stack.clear()
+        self.hash = 0
+        for square, kind in mask_squares(masks):
+            self.hash ^= PIECE_KEYS[square][kind]
+
+    @property
+    def white(self):
+        return self.white_men | self.white_king_mask
+
+    @property
+    def red(self):
+        return self.red_men | self.red_king_mask
+
+    @property
+    def occupied(self):
+        return self.white_men | self.white_king_mask | self.red_men | self.red_king_mask
+
+    @property
+    def white_left(self):
+        return _popcount(self.white)
+
+    @property
+    def red_left(self):
+        return _popcount(self.red)
+
+    @property
+    def white_kings(self):
+        return _popcount(self.white_king_mask)
+
+    @property
+    def red_kings(self):
+        return _popcount(self.red_king_mask)
+
+    @property
+    def state(self):
+        """int8[64] board in the CheckersEnv observation encoding (see Piece.value)
+
+        Built on first use, then updated square by square as pieces move and are
+        captured, like the list board's array: it is the board's own, so copy it
+        to keep a position. Undo, put_back and restore drop it to be rebuilt.
+        """
+        if self._state is None:
+            masks = np.array([self.white_men, self.white_king_mask, self.red_men, self.red_king_mask], dtype='<u4')
+            bits = np.unpackbits(masks.view(np.uint8), bitorder='little').reshape(4, 32)
+            state = np.zeros((64,), dtype=np.int8)
+            state[_SQUARE64_INDEX] = _MASK_VALUES @ bits
+            self._state = state
+        return self._state
+
+    def draw_squares(self, win):
+        # Imported here so the rules load without pygame (see checkers.render)
+        from .render import draw_squares
+        draw_squares(win)
+
+    def draw(self, win):
+        # Imported here so the rules load without pygame (see checkers.render)
+        from .render import draw_board
+        draw_board(win, self)
+
+    def evaluate(self):
+        return self.white_left - self.red_left + (self.white_kings * 0.5 - self.red_kings * 0.5)
+
+    def _piece_at(self, sq):
+        piece = self._views.get(sq)
+        if piece is None:
+            piece = self._views[sq] = self._make_piece(sq)
+        return piece
+
+    def _make_piece(self, sq):
+        bit = 1 << sq
+        if (self.white_men | self.white_king_mask) & bit:
+            piece = Piece(SQUARE_ROW[sq], SQUARE_COL[sq], WHITE)
+        elif (self.red_men | self.red_king_mask) & bit:
+            piece = Piece(SQUARE_ROW[sq], SQUARE_COL[sq], RED)
+        else:
+            return 0
+        if (self.white_king_mask | self.red_king_mask) & bit:
+            piece.make_king()
+        return piece
+
+    def get_piece(self, row, col):
+        sq = SQUARE_OF[row * COLS + col]
+        if sq < 0 or not (self.occupied >> sq) & 1:
+            return 0
+        return self._piece_at(sq)
+
+    def get_all_pieces(self, color=None):
+        if color == WHITE:
+            mask = self.white
+        elif color == RED:
+            mask = self.red
+        else:
+            mask = self.occupied
+        pieces = []
+        while mask:
+            low = mask & -mask
+            pieces.append(self._piece_at(low.bit_length() - 1))
+            mask ^= low
+        return pieces
+
+    def move(self, piece, row, col):
+        kinged = self._move_square(square_of(piece.row, piece.col), square_of(row, col))
+        piece.move(row, col)
+        if kinged:
+            piece.make_king()
+
+    def _move_square(self, from_sq, to_sq):
+        """Move whatever stands on from_sq to to_sq; returns True if it lands on a back row"""
+        from_key = PIECE_KEYS[SQUARE64[from_sq]]
+        to_key = PIECE_KEYS[SQUARE64[to_sq]]
+        frm = 1 << from_sq
+        to = 1 << to_sq
+        kinged = to_sq < 4 or to_sq >= 28
+        if self.white_men & frm:
+            self.white_men ^= frm
+            if kinged:
+                self.white_king_mask |= to
+                self.hash ^= from_key[WHITE_MAN] ^ to_key[WHITE_KING]
+            else:
+                self.white_men |= to
+                self.hash ^= from_key[WHITE_MAN] ^ to_key[WHITE_MAN]
+        elif self.white_king_mask & frm:
+            self.white_king_mask ^= frm | to
+            self.hash ^= from_key[WHITE_KING] ^ to_key[WHITE_KING]
+        elif self.red_men & frm:
+            self.red_men ^= frm
+            if kinged:
+                self.red_king_mask |= to
+                self.hash ^= from_key[RED_MAN] ^ to_key[RED_KING]
+            else:
+                self.red_men |= to
+                self.hash ^= from_key[RED_MAN] ^ to_key[RED_MAN]
+        elif self.red_king_mask & frm:
+            self.red_king_mask ^= frm | to
+            self.hash ^= from_key[RED_KING] ^ to_key[RED_KING]
+        self._views.clear()
+        state = self._state
+        if state is not None:
+            value = state[SQUARE64[from_sq]]
+            state[SQUARE64[from_sq]] = 0
+            state[SQUARE64[to_sq]] = (2 if value > 0 else -2) if kinged else value
+        return kinged
+
+    def remove(self, pieces):
+        for piece in pieces:
+            if piece != 0:
+                self._remove_square(square_of(piece.row, piece.col))
+
+    def _remove_square(self, sq):
+        bit = 1 << sq
+        keys = PIECE_KEYS[SQUARE64[sq]]
+        if self.white_men & bit:
+            self.white_men ^= bit
+            self.hash ^= keys[WHITE_MAN]
+        elif self.white_king_mask & bit:
+            self.white_king_mask ^= bit
+            self.hash ^= keys[WHITE_KING]
+        elif self.red_men & bit:
+            self.red_men ^= bit
+            self.hash ^= keys[RED_MAN]
+        elif self.red_king_mask & bit:
+            self.red_king_mask ^= bit
+            self.hash ^= keys[RED_KING]
+        self._views.clear()
+        if self._state is not None:
+            self._state[SQUARE64[sq]] = 0
+
+    def make_move(self, move):
+        """Play a generate_moves() move in place and return its undo token.
+
+        The token is the previous masks and hash, so unmake_move is O(1).
+        """
+        frm, to, captured = move
+        token = (self.white_men, self.white_king_mask, self.red_men, self.red_king_mask, self.hash)
+        self._move_square(SQUARE_OF[frm], SQUARE_OF[to])
+        while captured:
+            low = captured & -captured
+            self._remove_square(SQUARE_OF[low.bit_length() - 1])
+            captured ^= low
+        self.undo_stack.append(token)
+        return token
+
+    def unmake_move(self, token=None):
+        """Take back the most recent make_move (token defaults to the top of undo_stack)"""
+        # Checked before popping: a refused unmake leaves the board and its undo record as they were
+        if token is not None and token is not self.undo_stack[-1]:
+            raise ValueError("unmake_move must take back the most recent move")
+        last = self.undo_stack.pop()
+        self.white_men, self.white_king_mask, self.red_men, self.red_king_mask, self.hash = last
+        self._views.clear()
+        self._state = None
+
+    def put_back(self, piece):
+        """Return a captured piece to the board (for combo calculation)"""
+        bit = 1 << square_of(piece.row, piece.col)
+        self.hash ^= piece_key(piece)
+        if piece.color == WHITE:
+            if piece.king:
+                self.white_king_mask |= bit
+            else:
+                self.white_men |= bit
+        else:
+            if piece.king:
+                self.red_king_mask |= bit
+            else:
+                self.red_men |= bit
+        self._views.clear()
+        self._state = None
+
+    def winner(self):
+        if not self.red_men | self.red_king_mask:
+            return WHITE
+        elif not self.white_men | self.white_king_mask:
+            return RED
+
+        return None
+
+    def _traverse(self, sq, direction, opponents, empty, skipped, moves):
+        """Follow one diagonal from sq, mirroring Board._traverse_left/_traverse_right.
+
+        Chained jumps keep the vertical direction, record only the last two
+        captured squares and, when going up, cannot land on the back row --
+        exactly like the recursive list implementation.
+        """
+        up = direction < DOWN_LEFT
+        n1 = NEIGHBOUR[direction][sq]
+        if n1 < 0 or (skipped and up and n1 < 4):
+            return
+        b1 = 1 << n1
+        if empty & b1:
+            if not skipped:
+                moves[n1] = 0
+            return
+        if not opponents & b1:
+            return
+        n2 = NEIGHBOUR[direction][n1]
+        if n2 < 0 or (skipped and up and n2 < 4) or not empty & (1 << n2):
+            return
+        moves[n2] = b1 | skipped
+        for follow in CHAIN[direction]:
+            self._traverse(n2, follow, opponents, empty, b1, moves)
+
+    def _square_moves(self, sq):
+        """Return {landing square: captured mask} for the piece on sq"""
+        bit = 1 << sq
+        white = self.white_men | self.white_king_mask
+        if white & bit:
+            opponents = self.red_men | self.red_king_mask
+            directions = (DOWN_LEFT, DOWN_RIGHT)
+        else:
+            opponents = white
+            directions = (UP_LEFT, UP_RIGHT)
+        if (self.white_king_mask | self.red_king_mask) & bit:
+            directions = (UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT)
+        empty = FULL & ~self.occupied
+        moves = {}
+        for direction in directions:
+            self._traverse(sq, direction, opponents, empty, 0, moves)
+        return moves
+
+    def get_valid_moves(self, piece):
+        moves = {}
+        for to, captured in self._square_moves(square_of(piece.row, piece.col)).items():
+            skipped = []
+            while captured:
+                low = captured & -captured
+                skipped.append(self._piece_at(low.bit_length() - 1))
+                captured ^= low
+            moves[(SQUARE_ROW[to], SQUARE_COL[to])] = skipped
+        return moves
+
+    def movers(self, color):
+        """Mask of `color` pieces with at least one step or jump"""
+        empty = FULL & ~self.occupied
+        if color == WHITE:
+            men, kings, opponents = self.white_men, self.white_king_mask, self.red
+            directions = (DOWN_LEFT, DOWN_RIGHT)
+        else:
+            men, kings, opponents = self.red_men, self.red_king_mask, self.white
+            directions = (UP_LEFT, UP_RIGHT)
+        result = 0
+        for direction in range(4):
+            pieces = men | kings if direction in directions else kings
+            back = REVERSE[direction]
+            targets = empty | (back(empty) & opponents)
+            result |= back(targets) & pieces
+        return result
+
+    def has_valid_moves(self, color):
+        return self.movers(color) != 0
+
+    def moves(self, color):
+        """Return [(from square, to square, captured mask)] for every legal `color` move.
+
+        Simple moves come straight from shifting the movers; only pieces that
+        can capture are walked square by square to follow their chains.
+        """
+        empty = FULL & ~self.occupied
+        if color == WHITE:
+            men, kings, opponents = self.white_men, self.white_king_mask, self.red
+            forward = (DOWN_LEFT, DOWN_RIGHT)
+        else:
+            men, kings, opponents = self.red_men, self.red_king_mask, self.white
+            forward = (UP_LEFT, UP_RIGHT)
+        jumpers = 0
+        for direction in range(4):
+            pieces = men | kings if direction in forward else kings
+            back = REVERSE[direction]
+            jumpers |= back(back(empty) & opponents) & pieces
+        result = []
+        for direction in range(4):
+            pieces = (men | kings if direction in forward else kings) & ~jumpers
+            targets = SHIFTS[direction](pieces) & empty
+            origin = NEIGHBOUR[3 - direction]
+            while targets:
+                low = targets & -targets
+                to = low.bit_length() - 1
+                result.append((origin[to], to, 0))
+                targets ^= low
+        while jumpers:
+            low = jumpers & -jumpers
+            sq = low.bit_length() - 1
+            for to, captured in self._square_moves(sq).items():
+                result.append((sq, to, captured))
+            jumpers ^= low
+        return result
+
+    def generate_moves(self, color):
+        """All legal moves of `color` as (from_square, to_square, captured) tuples, see checkers.movegen"""
+        result = []
+        for frm, to, captured in self.moves(color):
+            captured64 = 0
+            while captured:
+                low = captured & -captured
+                captured64 |= 1 << SQUARE64[low.bit_length() - 1]
+                captured ^= low
+            result.append((SQUARE64[frm], SQUARE64[to], captured64))
+        return result
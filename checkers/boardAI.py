@@ -1,41 +1,51 @@
-import pygame
-from .constants import BLACK, ROWS, RED, SQUARE_SIZE, COLS, WHITE,BWHITE
+import numpy as np
+from .constants import ROWS, RED, COLS, WHITE
 from .piece import Piece
+from .movegen import generate_moves, has_move, captured_squares
+from .zobrist import PIECE_KEYS, kind, piece_key, hash_pieces
+from .bitboard import MASKS, SQUARE64, SQUARE_OF, unpack_masks
+
+# Colour and observation value of each snapshot mask (white men, white kings, red men, red kings)
+_MASK_COLORS = (WHITE, WHITE, RED, RED)
+_MASK_VALUES = (1, 2, -1, -2)
 
 class Board:
     def __init__(self):
         self.board = []
-        self.red_left = self.white_left = 12
-        self.red_kings = self.white_kings = 0
+        self.undo_stack = []
         self.create_board()
+        self.index_pieces()
+        self.hash = hash_pieces(self.get_all_pieces())
+        # Piece objects restore() places, so restoring a position creates none
+        self.roster = self.get_all_pieces()
     
     def draw_squares(self, win):
-        win.fill(BLACK)
-        for row in range(ROWS):
-            for col in range(row % 2, COLS, 2):
-                pygame.draw.rect(win, BWHITE, (row*SQUARE_SIZE, col *SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+        # Imported here so the rules load without pygame (see checkers.render)
+        from .render import draw_squares
+        draw_squares(win)
 
     def evaluate(self):
         return self.white_left - self.red_left + (self.white_kings * 0.5 - self.red_kings * 0.5)
 
-    def get_all_pieces(self, color):
-        pieces = []
-        for row in self.board:
-            for piece in row:
-                if piece != 0 and piece.color == color:
-                    pieces.append(piece)
-        return pieces
+    def get_all_pieces(self, color=None):
+        if color is None:
+            return [*self.pieces[WHITE], *self.pieces[RED]]
+        return list(self.pieces[color])
 
     def move(self, piece, row, col):
+        self.hash ^= piece_key(piece)
+        self.state[piece.row * COLS + piece.col] = 0
         self.board[piece.row][piece.col], self.board[row][col] = self.board[row][col], self.board[piece.row][piece.col]
         piece.move(row, col)
 
-        if row == ROWS - 1 or row == 0:
+        if (row == ROWS - 1 or row == 0) and not piece.king:
             piece.make_king()
             if piece.color == WHITE:
                 self.white_kings += 1
             else:
                 self.red_kings += 1 
+        self.state[row * COLS + col] = piece.value
+        self.hash ^= piece_key(piece)
 
     def get_piece(self, row, col):
         return self.board[row][col]
@@ -53,23 +63,91 @@ class Board:
                         self.board[row].append(0)
                 else:
                     self.board[row].append(0)
+
+    def index_pieces(self):
+        """Rebuild the piece sets, counters and state array from the grid (after filling self.board directly)"""
+        self.pieces = {WHITE: set(), RED: set()}
+        # int8[64] copy of the grid in the CheckersEnv observation encoding (see Piece.value)
+        self.state = np.zeros((ROWS * COLS,), dtype=np.int8)
+        for row in self.board:
+            for piece in row:
+                if piece != 0:
+                    self.pieces[piece.color].add(piece)
+                    self.state[piece.row * COLS + piece.col] = piece.value
+        self.white_left = len(self.pieces[WHITE])
+        self.red_left = len(self.pieces[RED])
+        self.white_kings = sum(1 for piece in self.pieces[WHITE] if piece.king)
+        self.red_kings = sum(1 for piece in self.pieces[RED] if piece.king)
+
+    def to_bytes(self):
+        """16-byte snapshot of the position (see checkers.bitboard.MASKS), restorable on either backend"""
+        masks = [0, 0, 0, 0]
+        for piece in self.get_all_pieces():
+            masks[kind(piece.color, piece.king)] |= 1 << SQUARE_OF[piece.row * COLS + piece.col]
+        return MASKS.pack(*masks)
+
+    @classmethod
+    def from_bytes(cls, data):
+        board = cls()
+        board.restore(data)
+        return board
+
+    def restore(self, data):
+        """Set the position to a to_bytes() snapshot in place, placing the roster's pieces"""
+        masks = unpack_masks(data)
+        grid, state, roster = self.board, self.state, self.roster
+        for color in (WHITE, RED):
+            for piece in self.pieces[color]:
+                grid[piece.row][piece.col] = 0
+            self.pieces[color].clear()
+        self.undo_stack.clear()
+        state.fill(0)
+        position_hash = 0
+        index = 0
+        # Runs on every env reset: one pass over the set bits, no generators or properties
+        for piece_kind, mask in enumerate(masks):
+            color, value = _MASK_COLORS[piece_kind], _MASK_VALUES[piece_kind]
+            king = piece_kind % 2 == 1
+            placed = self.pieces[color]
+            while mask:
+                low = mask & -mask
+                mask ^= low
+                square = SQUARE64[low.bit_length() - 1]
+                if index == len(roster):
+                    roster.append(Piece(0, 0, WHITE))
+                piece = roster[index]
+                index += 1
+                piece.row, piece.col = divmod(square, COLS)
+                piece.color = color
+                piece.king = king
+                grid[piece.row][piece.col] = piece
+                placed.add(piece)
+                state[square] = value
+                position_hash ^= PIECE_KEYS[square][piece_kind]
+        self.hash = position_hash
+        self.white_left = len(self.pieces[WHITE])
+        self.red_left = len(self.pieces[RED])
+        self.white_kings = bin(masks[1]).count('1')
+        self.red_kings = bin(masks[3]).count('1')
         
     def draw(self, win):
-        self.draw_squares(win)
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = self.board[row][col]
-                if piece != 0:
-                    piece.draw(win)
+        # Imported here so the rules load without pygame (see checkers.render)
+        from .render import draw_board
+        draw_board(win, self)
 
     def remove(self, pieces):
         for piece in pieces:
             self.board[piece.row][piece.col] = 0
             if piece != 0:
+                self.state[piece.row * COLS + piece.col] = 0
+                self.hash ^= piece_key(piece)
+                self.pieces[piece.color].discard(piece)
                 if piece.color == RED:
                     self.red_left -= 1
+                    self.red_kings -= piece.king
                 else:
                     self.white_left -= 1
+                    self.white_kings -= piece.king
     
     def winner(self):
         if self.red_left <= 0:
@@ -79,6 +157,10 @@ class Board:
         
         return None 
     
+    def generate_moves(self, color):
+        """All legal moves of `color` as (from_square, to_square, captured) tuples, see checkers.movegen"""
+        return generate_moves(self.board, color)
+
     def get_valid_moves(self, piece):
         moves = {}
         left = piece.col - 1
@@ -160,7 +242,53 @@ class Board:
         
         return moves
     def has_valid_moves(self, color):
-        for piece in self.get_all_pieces(color):
-            if self.get_valid_moves(piece):
-                return True
-        return False
\ No newline at end of file
+        return has_move(self.board, self.pieces[color], color)
+
+    def make_move(self, move):
+        """Play a generate_moves() move in place and return its undo token.
+
+        The token keeps the moved piece, its king flag, the captured pieces and
+        the king counters/hash, so unmake_move runs in O(captured pieces) and
+        lookahead no longer needs a deep copy of the board.
+        """
+        frm, to, captured = move
+        piece = self.board[frm // COLS][frm % COLS]
+        skipped = [self.board[row][col] for row, col in captured_squares(captured)]
+        token = (piece, frm, piece.king, skipped, self.white_kings, self.red_kings, self.hash)
+        self.move(piece, to // COLS, to % COLS)
+        if skipped:
+            self.remove(skipped)
+        self.undo_stack.append(token)
+        return token
+
+    def unmake_move(self, token=None):
+        """Take back the most recent make_move (token defaults to the top of undo_stack)"""
+        # Checked before popping: a refused unmake leaves the board and its undo record as they were
+        if token is not None and token is not self.undo_stack[-1]:
+            raise ValueError("unmake_move must take back the most recent move")
+        last = self.undo_stack.pop()
+        piece, frm, was_king, skipped, white_kings, red_kings, saved_hash = last
+        row, col = frm // COLS, frm % COLS
+        self.board[piece.row][piece.col] = 0
+        self.state[piece.row * COLS + piece.col] = 0
+        self.board[row][col] = piece
+        piece.move(row, col)
+        piece.king = was_king
+        self.state[frm] = piece.value
+        for captured in skipped:
+            self.put_back(captured)
+        self.white_kings, self.red_kings = white_kings, red_kings
+        self.hash = saved_hash
+
+    def put_back(self, piece):
+        """Return a captured piece to the board (for combo calculation)"""
+        self.board[piece.row][piece.col] = piece
+        self.state[piece.row * COLS + piece.col] = piece.value
+        self.hash ^= piece_key(piece)
+        self.pieces[piece.color].add(piece)
+        if piece.color == RED:
+            self.red_left += 1
+            self.red_kings += piece.king
+        else:
+            self.white_left += 1
+            self.white_kings += piece.king
@@ -0,0 +1,202 @@
+"""Opening book: weighted moves for early positions, looked up by position hash.
+
+Build one from self-play or recorded games, from the project directory:
+
+    python -m checkers.book --self-play 2000 --player search --out opening_book.bin
+    python -m checkers.book --self-play 2000 --player ppo --out opening_book.bin
+    python -m checkers.book --games games.txt --out opening_book.bin
+
+Recorded games are text files with one game per line, each a space
+separated list of actions (from_square * 64 + to_square) from the start.
+
+The file is MAGIC followed by (key, action, weight) records sorted by key,
+where key is Game.get_board_hash(). OpeningBook binary searches the records
+through mmap, so a lookup touches a handful of pages and no model.
+"""
+import argparse
+import mmap
+import random
+import struct
+import time
+
+MAGIC = b'CBK1'
+RECORD = struct.Struct('<QHH')  # key, action, weight
+MAX_WEIGHT = 0xFFFF
+MODEL_PATH = "model/checkers_ai_model.zip"
+
+
+def write_book(path, counts):
+    """Write {(key, action): weight} as a sorted book file; returns the record count"""
+    top = max(counts.values(), default=0)
+    scale = MAX_WEIGHT / top if top > MAX_WEIGHT else 1.0
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        for key, action in sorted(counts):
+            f.write(RECORD.pack(key, action, max(1, int(counts[key, action] * scale))))
+    return len(counts)
+
+
+class OpeningBook:
+    """Read-only access to a book file through mmap"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:len(MAGIC)] != MAGIC:
+            self.data.close()
+            raise ValueError(f"{path} is not an opening book file")
+        self.size = (len(self.data) - len(MAGIC)) // RECORD.size
+
+    def __len__(self):
+        return self.size
+
+    def close(self):
+        self.data.close()
+
+    def _record(self, i):
+        return RECORD.unpack_from(self.data, len(MAGIC) + i * RECORD.size)
+
+    def lookup(self, key):
+        """[(action, weight), ...] stored for the position key, empty if unknown"""
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        moves = []
+        while lo < self.size:
+            record_key, action, weight = self._record(lo)
+            if record_key != key:
+                break
+            moves.append((action, weight))
+            lo += 1
+        return moves
+
+    def choose(self, key, legal=None, rng=random):
+        """Weighted random book action for key (restricted to `legal` actions if given), or None"""
+        moves = self.lookup(key)
+        if legal is not None:
+            moves = [(action, weight) for action, weight in moves if action in legal]
+        if not moves:
+            return None
+        actions, weights = zip(*moves)
+        return rng.choices(actions, weights)[0]
+
+
+def _actions(game):
+    return {frm * 64 + to for frm, to, _ in game.board.generate_moves(game.turn)}
+
+
+def _random_player(rng):
+    def play(game, legal):
+        return rng.choice(sorted(legal))
+    return play
+
+
+def _search_player(search_time):
+    from .search import Searcher
+    searcher = Searcher()
+
+    def play(game, legal):
+        move, _ = searcher.search(game.board, game.turn, search_time)
+        return move[0] * 64 + move[1]
+    return play
+
+
+def _ppo_player(model_path):
+    # Imported here so books can be built from search or recorded games without torch
+    import numpy as np
+    from sb3_contrib import MaskablePPO
+    from .actions import predict
+    model = MaskablePPO.load(model_path)
+
+    def play(game, legal):
+        board_obs = game.board.state.copy()
+        action_mask = np.zeros((4096,), dtype=np.int8)
+        action_mask[sorted(legal)] = 1
+        return predict(model, board_obs, action_mask, deterministic=False)
+    return play
+
+
+def self_play(player, games, plies, explore=0.1, seed=None, counts=None):
+    """Play `games` games of `player` against itself, counting its moves over the first `plies` plies.
+
+    With probability `explore` a random legal move is played instead (and not
+    counted) so the games branch out beyond the player's favourite line.
+    """
+    from .gameAI import Game
+    rng = random.Random(seed)
+    counts = {} if counts is None else counts
+    game = Game(None, backend='bitboard')
+    for _ in range(games):
+        game.reset()
+        for _ in range(plies):
+            legal = _actions(game)
+            if not legal or game.winner() is not None:
+                break
+            if rng.random() < explore:
+                action = rng.choice(sorted(legal))
+            else:
+                action = player(game, legal)
+                key = (game.get_board_hash(), action)
+                counts[key] = counts.get(key, 0) + 1
+            game.play(action)
+    return counts
+
+
+def read_games(path, plies, counts=None):
+    """Count the first `plies` moves of every game in a recorded games file"""
+    from .gameAI import Game
+    counts = {} if counts is None else counts
+    game = Game(None, backend='bitboard')
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            game.reset()
+            for action in [int(a) for a in line.split()][:plies]:
+                if action not in _actions(game):
+                    print(f"{path}:{number}: illegal action {action}, rest of the game skipped")
+                    break
+                key = (game.get_board_hash(), action)
+                counts[key] = counts.get(key, 0) + 1
+                game.play(action)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', default='opening_book.bin', help="book file to write")
+    parser.add_argument('--games', action='append', default=[], help="recorded games file (repeatable)")
+    parser.add_argument('--self-play', type=int, default=0, help="number of self-play games")
+    parser.add_argument('--player', choices=('search', 'ppo', 'random'), default='search',
+                        help="player for the self-play games")
+    parser.add_argument('--search-time', type=float, default=0.1, help="seconds per move for the search player")
+    parser.add_argument('--model', default=MODEL_PATH, help="MaskablePPO model for the ppo player")
+    parser.add_argument('--plies', type=int, default=12, help="book depth in plies")
+    parser.add_argument('--explore', type=float, default=0.1, help="chance of an unrecorded random move")
+    parser.add_argument('--min-count', type=int, default=1, help="drop moves seen fewer times")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = {}
+    for path in args.games:
+        read_games(path, args.plies, counts)
+    if args.self_play:
+        if args.player == 'search':
+            player = _search_player(args.search_time)
+        elif args.player == 'ppo':
+            player = _ppo_player(args.model)
+        else:
+            player = _random_player(random.Random(args.seed))
+        self_play(player, args.self_play, args.plies, args.explore, args.seed, counts)
+    counts = {key: count for key, count in counts.items() if count >= args.min_count}
+    records = write_book(args.out, counts)
+    positions = len({key for key, _ in counts})
+    print(f"{args.out}: {records} moves in {positions} positions ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,578 @@
+"""Rules conformance: every way the project plays a move must follow checkers.gameAI.Game.
+
+Run from the project directory (no display is opened):
+
+    python -m checkers.conformance                        # every check
+    python -m checkers.conformance --check online --games 200
+
+The 'cases' check holds hand-written positions with the moves, results and
+draws the rules give. A multi-capture is one move to its last landing
+square. A chain removes the last two pieces it jumps. RED's chained jumps
+never land on row 0. 80 half-moves without a capture are a draw, and so is
+a position's third occurrence with the same side to move. Every case is
+checked on both board backends.
+
+The other checks replay the same seeded random games through one front end
+each: the bitboard backend, CheckersEnv, the batched NumPy rules and
+CheckersVecEnv, two online GameStates relaying moves, and Game.to_bytes()
+snapshots restored on each backend and in CheckersEnv. Every position,
+legal move set and game result is compared with the core's. The
+'first-move' check makes sure the agent's first step in CheckersEnv and
+CheckersVecEnv moves a piece, alone and against a (random) OpponentPool,
+whichever side the reset left to move. The exit
+status is 1 on any mismatch, so a rules change or optimisation is checked
+here once, for all of them. CheckersVecEnv needs stable_baselines3; without
+it that check is reported as skipped.
+"""
+import os
+
+# Headless: set before anything imports pygame
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import contextlib
+import io
+import pickle
+import random
+
+import numpy as np
+
+from . import batch_moves
+from .constants import RED, WHITE, SQUARE_SIZE
+from .gameAI import BACKENDS, Game
+from .perft import POSITIONS, load_board
+
+MAX_PLIES = 400
+SHOWN_FAILURES = 5
+
+# Diagrams as in checkers.perft; moves are ((row, col), (row, col), pieces captured)
+CASES = {
+    'opening': {
+        'diagram': POSITIONS['start']['diagram'],
+        'turn': RED,
+        'moves': [((5, 0), (4, 1), 0), ((5, 2), (4, 1), 0), ((5, 2), (4, 3), 0), ((5, 4), (4, 3), 0),
+                  ((5, 4), (4, 5), 0), ((5, 6), (4, 5), 0), ((5, 6), (4, 7), 0)],
+    },
+    # A double capture is one move; stopping after the first jump is another
+    'double-jump': {
+        'diagram': POSITIONS['multi-jump']['diagram'],
+        'turn': RED,
+        'moves': [((5, 2), (3, 0), 1), ((5, 2), (3, 4), 1), ((5, 2), (1, 2), 2), ((5, 2), (1, 6), 2),
+                  ((6, 5), (5, 4), 0), ((6, 5), (5, 6), 0)],
+        'play': ((5, 2), (1, 6)),
+        'after': [
+            '........',
+            '......r.',
+            '...w....',
+            '........',
+            '.w......',
+            '........',
+            '.....r..',
+            '........',
+        ],
+    },
+    # A chain removes only the last two pieces it jumps
+    'triple-jump': {
+        'diagram': [
+            '........',
+            '........',
+            '.....w..',
+            '........',
+            '...w....',
+            '........',
+            '.w......',
+            'r.......',
+        ],
+        'turn': RED,
+        'moves': [((7, 0), (5, 2), 1), ((7, 0), (3, 4), 2), ((7, 0), (1, 6), 2)],
+        'play': ((7, 0), (1, 6)),
+        'after': [
+            '........',
+            '......r.',
+            '........',
+            '........',
+            '........',
+            '........',
+            '.w......',
+            '........',
+        ],
+    },
+    # RED's chained jumps stop short of row 0 (a single jump may land there)
+    'chain-to-back-row': {
+        'diagram': [
+            '........',
+            '....w...',
+            '........',
+            '..w.....',
+            '.r......',
+            '........',
+            '........',
+            '........',
+        ],
+        'turn': RED,
+        'moves': [((4, 1), (3, 0), 0), ((4, 1), (2, 3), 1)],
+    },
+    'promotion': {
+        'diagram': [
+            '........',
+            '........',
+            '........',
+            'r.r.....',
+            '........',
+            '........',
+            '.w......',
+            '........',
+        ],
+        'turn': WHITE,
+        'moves': [((6, 1), (7, 0), 0), ((6, 1), (7, 2), 0)],
+        'play': ((6, 1), (7, 2)),
+        'after': [
+            '........',
+            '........',
+            '........',
+            'r.r.....',
+            '........',
+            '........',
+            '........',
+            '..W.....',
+        ],
+    },
+    'last-piece-taken': {
+        'diagram': [
+            '........',
+            '........',
+            '........',
+            '........',
+            '...w....',
+            '..r.....',
+            '........',
+            '........',
+        ],
+        'turn': RED,
+        'moves': [((5, 2), (4, 1), 0), ((5, 2), (3, 4), 1)],
+        'play': ((5, 2), (3, 4)),
+        'winner': RED,
+    },
+    # The 40-move rule counts half-moves: 40 per player
+    'no-capture-limit': {
+        'diagram': POSITIONS['start']['diagram'],
+        'turn': RED,
+        'no_capture_count': 79,
+        'play': ((5, 0), (4, 1)),
+        'draw': '40_moves_no_capture',
+    },
+    'below-no-capture-limit': {
+        'diagram': POSITIONS['start']['diagram'],
+        'turn': RED,
+        'no_capture_count': 78,
+        'play': ((5, 0), (4, 1)),
+        'draw': None,
+    },
+    'blocked': {
+        'diagram': [
+            '.w......',
+            'r.......',
+            '.......w',
+            '........',
+            '........',
+            '........',
+            '........',
+            '........',
+        ],
+        'turn': RED,
+        'moves': [],
+        'draw': 'no_legal_moves',
+    },
+    'lone-kings': {
+        'diagram': [
+            '........',
+            '........',
+            '........',
+            '..W.....',
+            '........',
+            '....R...',
+            '........',
+            '........',
+        ],
+        'turn': RED,
+        'draw': 'insufficient_material',
+    },
+    # Kings shuffling out and back: the position comes back with RED to move every 4 half-moves,
+    # so the line draws on its last move and not before
+    'threefold-repetition': {
+        'diagram': [
+            '.W.W....',
+            '........',
+            '........',
+            '........',
+            '........',
+            '........',
+            '........',
+            '....R.R.',
+        ],
+        'turn': RED,
+        'line': [((7, 4), (6, 3)), ((0, 1), (1, 0)), ((6, 3), (7, 4)), ((1, 0), (0, 1))] * 2,
+        'draw': 'threefold_repetition',
+    },
+}
+
+_SYMBOLS = {0: '.', 1: 'w', 2: 'W', -1: 'r', -2: 'R'}
+
+
+def _action(frm, to):
+    return (frm[0] * 8 + frm[1]) * 64 + to[0] * 8 + to[1]
+
+
+def _notation(action, captured):
+    frm, to = divmod(action, 64)
+    return divmod(frm, 8), divmod(to, 8), bin(captured).count('1')
+
+
+def diagram(board):
+    """The POSITIONS-style diagram of any board backend"""
+    state = np.asarray(board.state).reshape(8, 8)
+    return [''.join(_SYMBOLS[int(value)] for value in row) for row in state]
+
+
+def case_game(case, backend='list'):
+    """Game on backend set up at a CASES position"""
+    game = Game(None, backend=backend)
+    game.board = load_board(BACKENDS[backend], case['diagram'])
+    game.turn = case['turn']
+    game._contexts = {}
+    game.draws.reset(game.get_board_hash())
+    game.no_capture_count = case.get('no_capture_count', 0)
+    return game
+
+
+def check_cases(records):
+    failures = []
+    for name, case in CASES.items():
+        for backend in BACKENDS:
+            game = case_game(case, backend)
+            label = f"{name}[{backend}]"
+            if 'moves' in case:
+                moves = sorted(_notation(action, captured) for action, captured in game.context().actions.items())
+                if moves != sorted(case['moves']):
+                    failures.append(f"{label}: moves {moves}, expected {sorted(case['moves'])}")
+            if 'play' in case:
+                game.play(_action(*case['play']))
+            for ply, move in enumerate(case.get('line', ())):
+                if game.check_draw() is not None:
+                    failures.append(f"{label}: {game.check_draw()} after {ply} half-moves of the line")
+                    break
+                game.play(_action(*move))
+            if 'after' in case and diagram(game.board) != case['after']:
+                failures.append(f"{label}: position {diagram(game.board)}, expected {case['after']}")
+            if game.winner() != case.get('winner'):
+                failures.append(f"{label}: winner {game.winner()}, expected {case.get('winner')}")
+            if 'draw' in case and game.check_draw() != case['draw']:
+                failures.append(f"{label}: draw {game.check_draw()}, expected {case['draw']}")
+    return failures
+
+
+def record_games(games, seed=0):
+    """Seeded random games played by the core: per game, a list of plies
+
+    (action, board state after, legal actions after, winner, draw).
+    """
+    rng = random.Random(seed)
+    records = []
+    for _ in range(games):
+        game = Game(None)
+        plies = []
+        while True:
+            legal = sorted(game.context().actions)
+            action = legal[rng.randrange(len(legal))]
+            game.play(action)
+            winner, draw = game.winner(), game.check_draw()
+            plies.append((action, game.board.state.tobytes(), frozenset(game.context().actions), winner, draw))
+            if winner is not None or draw is not None or len(plies) >= MAX_PLIES:
+                break
+        records.append(plies)
+    return records
+
+
+def _result(winner, draw):
+    return winner if winner is not None else draw
+
+
+def check_backends(records):
+    """The bitboard backend replaying the list backend's games"""
+    failures = []
+    for index, plies in enumerate(records):
+        game = Game(None, backend='bitboard')
+        for ply, (action, state, legal, winner, draw) in enumerate(plies):
+            game.play(action)
+            got = (np.asarray(game.board.state).tobytes(), frozenset(game.context().actions),
+                   game.winner(), game.check_draw())
+            if got != (state, legal, winner, draw):
+                failures.append(f"game {index} ply {ply}: bitboard differs from the list backend")
+                break
+    return failures
+
+
+def check_env(records):
+    """CheckersEnv fed the games' moves, the agent playing both sides"""
+    from checkers_env import CheckersEnv
+    env = CheckersEnv()
+    env.max_steps = MAX_PLIES + 1
+    failures = []
+    # CheckersEnv prints every high-reward step
+    with contextlib.redirect_stdout(io.StringIO()):
+        for index, plies in enumerate(records):
+            env.reset()
+            for ply, (action, state, legal, winner, draw) in enumerate(plies):
+                obs, _, terminated, _, info = env.step(action)
+                ended = _result(winner, draw) is not None
+                got = (obs['board'].tobytes(), terminated, _result(info.get('winner'), info.get('draw')))
+                if got != (state, ended, _result(winner, draw)) or \
+                        (not ended and frozenset(obs['action_mask'].nonzero()[0].tolist()) != legal):
+                    failures.append(f"game {index} ply {ply}: CheckersEnv differs from the core")
+                    break
+    return failures
+
+
+def check_batch(records):
+    """checkers.batch_moves legal masks and moves, one position at a time"""
+    failures = []
+    start = Game(None)
+    for index, plies in enumerate(records):
+        state, legal, turn = start.board.state, frozenset(start.context().actions), RED
+        for ply, (action, after, next_legal, _, _) in enumerate(plies):
+            masks = batch_moves.legal_masks(state[None], turn)
+            boards, _, ok = batch_moves.apply_actions(state[None], turn, [action])
+            if frozenset(masks[0].nonzero()[0].tolist()) != legal or not ok[0] or boards[0].tobytes() != after:
+                failures.append(f"game {index} ply {ply}: batch_moves differs from the core")
+                break
+            state, legal, turn = boards[0], next_legal, WHITE if turn == RED else RED
+    return failures
+
+
+def check_vec_env(records):
+    """CheckersVecEnv with one game per row, or None without stable_baselines3"""
+    try:
+        from checkers_vec_env import CheckersVecEnv
+    except ImportError:
+        return None
+    vec = CheckersVecEnv(num_envs=len(records), max_steps=MAX_PLIES + 1)
+    obs = vec.reset()
+    failures = []
+    live = [True] * len(records)
+    for ply in range(max(len(plies) for plies in records)):
+        actions = []
+        for row, plies in enumerate(records):
+            live[row] = live[row] and ply < len(plies)
+            legal = obs['action_mask'][row].nonzero()[0]
+            actions.append(plies[ply][0] if live[row] else (legal[0] if len(legal) else 0))
+        obs, _, dones, infos = vec.step(np.array(actions))
+        for row, plies in enumerate(records):
+            if not live[row]:
+                continue
+            _, state, legal, winner, draw = plies[ply]
+            ended = _result(winner, draw) is not None
+            board = infos[row]['terminal_observation']['board'] if dones[row] else obs['board'][row]
+            got = (board.tobytes(), bool(dones[row]), _result(infos[row].get('winner'), infos[row].get('draw')))
+            if got != (state, ended, _result(winner, draw)) or \
+                    (not ended and frozenset(obs['action_mask'][row].nonzero()[0].tolist()) != legal):
+                failures.append(f"game {row} ply {ply}: CheckersVecEnv differs from the core")
+                live[row] = False
+            elif dones[row]:
+                live[row] = False
+    vec.close()
+    return failures
+
+
+def check_first_move(records):
+    """The agent's first step is played: valid and the board changes, in CheckersEnv and CheckersVecEnv
+
+    Each env runs alone (the agent starts as RED) and against an empty
+    OpponentPool (random moves: RED's opening is played in reset and the agent
+    starts as WHITE). CheckersVecEnv is left out without stable_baselines3.
+    """
+    from checkers_env import CheckersEnv
+    from .opponent_pool import OpponentPool
+    failures = []
+    for opponent in (None, OpponentPool(seed=0)):
+        mode = 'alone' if opponent is None else 'against an opponent'
+        expected = RED if opponent is None else WHITE
+        env = CheckersEnv(opponent=opponent)
+        for index in range(len(records)):
+            obs, _ = env.reset(seed=index)
+            before = obs['board'].copy()
+            legal = obs['action_mask'].nonzero()[0]
+            if env.current_player != expected or env.game.turn != expected:
+                failures.append(f"CheckersEnv {mode}, reset {index}: the agent does not start as the side to move")
+                continue
+            obs, _, terminated, _, info = env.step(int(legal[index % len(legal)]))
+            if not info['valid_move'] or terminated or np.array_equal(obs['board'], before):
+                failures.append(f"CheckersEnv {mode}, reset {index}: the first move was not played")
+        try:
+            from checkers_vec_env import CheckersVecEnv
+        except ImportError:
+            continue
+        vec = CheckersVecEnv(num_envs=len(records), opponent=opponent)
+        obs = vec.reset()
+        before = obs['board'].copy()
+        actions = [mask.nonzero()[0][row % mask.sum()] for row, mask in enumerate(obs['action_mask'])]
+        obs, _, dones, infos = vec.step(np.array(actions))
+        for row, info in enumerate(infos):
+            if not info['valid_move'] or dones[row] or np.array_equal(obs['board'][row], before[row]):
+                failures.append(f"CheckersVecEnv {mode}, game {row}: the first move was not played")
+        vec.close()
+    return failures
+
+
+def check_snapshots(records):
+    """Every position saved with Game.to_bytes() and restored: new and reused games, both backends, CheckersEnv
+
+    Snapshots have either side to move. CheckersEnv starts the agent as that
+    side; in self-play the agent is WHITE and RED's move is played on reset.
+    Either way the agent's first step must move a piece.
+    """
+    from checkers_env import CheckersEnv
+    from .opponent_pool import OpponentPool
+    env = CheckersEnv()
+    self_play = CheckersEnv(opponent=OpponentPool(seed=0))
+    reused = [Game(None, backend=backend) for backend in BACKENDS]
+    failures = []
+    for index, plies in enumerate(records):
+        game = Game(None)
+        for ply, (action, state, legal, winner, _) in enumerate(plies):
+            game.play(action)
+            data = game.to_bytes()
+            for other in reused:
+                other.restore(data)
+            expected = (state, legal, winner, game.get_board_hash(), game.no_capture_count)
+            for other in [Game.from_bytes(data, backend=backend) for backend in BACKENDS] + reused:
+                got = (np.asarray(other.board.state).tobytes(), frozenset(other.context().actions), other.winner(),
+                       other.get_board_hash(), other.no_capture_count)
+                if got != expected or other.to_bytes() != data:
+                    failures.append(f"game {index} ply {ply}: restored {other.backend} game differs")
+            obs, _ = env.reset(options={'state': data})
+            if obs['board'].tobytes() != state or \
+                    frozenset(obs['action_mask'].nonzero()[0].tolist()) != frozenset(game.context().actions):
+                failures.append(f"game {index} ply {ply}: CheckersEnv reset to the snapshot differs")
+            if winner is None and game.check_draw() is None:
+                failures += _first_step(env, data, game.turn, f"game {index} ply {ply}")
+                try:
+                    failures += _first_step(self_play, data, WHITE, f"game {index} ply {ply}, self-play")
+                except ValueError:
+                    pass  # RED's move on reset ended the game: no first step to check
+            if failures:
+                return failures
+    return failures
+
+
+def _first_step(env, data, player, label):
+    """Failures of env reset to a snapshot: the agent must be player, to move, and its first legal move played"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        obs, _ = env.reset(options={'state': data})
+        before = obs['board'].copy()
+        if env.current_player != player or env.game.turn != player:
+            return [f"{label}: CheckersEnv reset does not leave the agent to move"]
+        obs, _, _, _, info = env.step(int(obs['action_mask'].nonzero()[0][0]))
+    if not info['valid_move'] or np.array_equal(obs['board'], before):
+        return [f"{label}: CheckersEnv's first step from the snapshot was not played"]
+    return []
+
+
+class Loopback:
+    """In-memory stand-in for network.connection.Network: what one end sends, the other receives"""
+
+    def __init__(self):
+        self.peer = None
+        self.inbox = []
+
+    def send(self, data):
+        self.peer.inbox.append(pickle.dumps(data))
+
+    def receive(self):
+        return pickle.loads(self.inbox.pop(0)) if self.inbox else None
+
+
+def _click(square):
+    row, col = divmod(square, 8)
+    return col * SQUARE_SIZE + SQUARE_SIZE // 2, row * SQUARE_SIZE + SQUARE_SIZE // 2
+
+
+def check_online(records):
+    """Two online GameStates (main.py HOST and JOIN) clicking the games' moves and relaying them"""
+    from game.game_state import GameState
+    failures = []
+    for index, plies in enumerate(records):
+        host_network, join_network = Loopback(), Loopback()
+        host_network.peer, join_network.peer = join_network, host_network
+        host = GameState("HOST", None, host_network, RED)
+        join = GameState("JOIN", None, join_network, WHITE)
+        for ply, (action, state, _, winner, draw) in enumerate(plies):
+            mover = host if host.game.turn == RED else join
+            mover.select(_click(action // 64))
+            mover.select(_click(action % 64))
+            host.handle_network()
+            join.handle_network()
+            got = [(side.game.board.state.tobytes(), side.outcome()) for side in (host, join)]
+            if got != [(state, _result(winner, draw))] * 2:
+                failures.append(f"game {index} ply {ply}: online play differs from the core")
+                break
+    return failures
+
+
+def check_front_ends(records):
+    """The local and single-player windows and the online mode play on the core's Game"""
+    import LocalMultiplayer
+    import Singleplayer
+    from checkers_env import CheckersEnv
+    from game.game_state import GameState
+    games = {
+        'LocalMultiplayer': LocalMultiplayer.Game,
+        'Singleplayer': Singleplayer.Game,
+        'CheckersEnv': type(CheckersEnv().game),
+        'GameState': type(GameState("LOCAL", None).game),
+    }
+    return [f"{name} plays on {cls.__module__}.{cls.__name__}" for name, cls in games.items() if cls is not Game]
+
+
+CHECKS = {
+    'cases': check_cases,
+    'backends': check_backends,
+    'env': check_env,
+    'batch': check_batch,
+    'vec-env': check_vec_env,
+    'online': check_online,
+    'first-move': check_first_move,
+    'snapshots': check_snapshots,
+    'front-ends': check_front_ends,
+}
+
+
+def run(check_names, games=50, seed=0):
+    """{check: list of failures, or None if skipped}"""
+    records = record_games(games, seed)
+    return {name: CHECKS[name](records) for name in check_names}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=50, help="seeded random games replayed per check")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--check', action='append', choices=list(CHECKS),
+                        help="check to run (repeatable, default: all)")
+    args = parser.parse_args()
+
+    results = run(args.check or list(CHECKS), args.games, args.seed)
+    failed = False
+    for name, failures in results.items():
+        if failures is None:
+            print(f"{name:<11} skipped (stable_baselines3 not installed)")
+            continue
+        failed |= bool(failures)
+        print(f"{name:<11} {'ok' if not failures else f'{len(failures)} MISMATCH'}")
+        for failure in failures[:SHOWN_FAILURES]:
+            print(f"    {failure}")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Incremental, bounded state of the draw rules for one game (see Game.check_draw).
+
+Men only move forward and captures only remove pieces, so no position from
+before the last irreversible move (a capture or a man move) can come back.
+The repetition counts therefore only cover the window since that move and
+are cleared by each one. A window is never longer than the no-capture
+streak, and a streak of NO_CAPTURE_LIMIT half-moves draws the game, so the
+window stops growing there: at most NO_CAPTURE_LIMIT + 1 positions are
+kept, however long a caller keeps playing.
+"""
+
+NO_CAPTURE_LIMIT = 80  # half-moves without a capture that draw the game (40 per player)
+
+
+class DrawTracker:
+    """Repetition counts since the last irreversible move, and the no-capture streak"""
+
+    def __init__(self, key):
+        self.reset(key)
+
+    def reset(self, key):
+        """Start over at the position with Zobrist key `key`"""
+        self.counts = {key: 1}
+        self.window = 1  # positions recorded since the last irreversible move
+        self.no_capture_count = 0
+
+    def record(self, key, capture, irreversible):
+        """Count the position a move reached; irreversible: the move was a capture or a man move"""
+        self.no_capture_count = 0 if capture else self.no_capture_count + 1
+        if irreversible:
+            self.counts = {}
+            self.window = 0
+        if self.window > NO_CAPTURE_LIMIT:
+            return  # drawn by the no-capture rule already
+        self.window += 1
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def count(self, key):
+        """Times the position with key `key` occurred in the window"""
+        return self.counts.get(key, 0)
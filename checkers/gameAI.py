@@ -1,58 +1,175 @@
-import pygame
-from .constants import RED, WHITE, BLUE, SQUARE_SIZE, WIDTH
-from checkers.board import Board
+import numpy as np
+from .constants import RED, WHITE
+from .draw_tracker import DrawTracker, NO_CAPTURE_LIMIT
+from .actions import COMPACT_DIM, GRID_TO_COMPACT
+from .movegen import captured_squares
+from .zobrist import side_key
+from checkers.boardAI import Board
+from checkers.bitboard import MASKS, BitBoard
+
+# Board implementations selectable with Game(win, backend=...)
+BACKENDS = {
+    'list': Board,
+    'bitboard': BitBoard,
+}
+
+_UNKNOWN = object()
+
+
+def _mask(columns, size):
+    mask = np.zeros((size,), dtype=np.int8)
+    mask[columns] = 1
+    return mask
+
+
+class PositionContext:
+    """Everything derived from one position and side to move, computed on first use.
+
+    Game keeps one per colour and drops them after every move, so move
+    validation, selection, the draw check and the observation share a single
+    move generation per ply. The arrays are shared between callers: read only.
+    """
+
+    def __init__(self, board, color, stats=None):
+        self.board = board
+        self.color = color
+        self.stats = stats  # PhaseStats charged with movegen and mask building, or None
+        self.hash = board.hash
+        self.draw = _UNKNOWN  # Game.check_draw() result, for the side to move only
+        self._actions = None
+        self._mask = None
+        self._compact_mask = None
+        self._state = None
+
+    @property
+    def has_moves(self):
+        """Whether the side has a legal move, without generating them all unless they already are"""
+        if self._actions is not None:
+            return bool(self._actions)
+        return self.board.has_valid_moves(self.color)
+
+    @property
+    def actions(self):
+        """{from_square * 64 + to_square: captured mask} of every legal move"""
+        if self._actions is None:
+            if self.stats is None:
+                self._actions = self._generate()
+            else:
+                self._actions = self.stats.measure('movegen', self._generate)
+        return self._actions
+
+    def _generate(self):
+        return {frm * 64 + to: captured for frm, to, captured in self.board.generate_moves(self.color)}
+
+    @property
+    def mask(self):
+        if self._mask is None:
+            self._mask = self._build_mask(list(self.actions), 4096)
+        return self._mask
+
+    @property
+    def compact_mask(self):
+        """mask in the compact action encoding (see checkers.actions)"""
+        if self._compact_mask is None:
+            self._compact_mask = self._build_mask(GRID_TO_COMPACT[list(self.actions)], COMPACT_DIM)
+        return self._compact_mask
+
+    def _build_mask(self, columns, size):
+        if self.stats is None:
+            return _mask(columns, size)
+        return self.stats.measure('mask', _mask, columns, size)
+
+    @property
+    def state(self):
+        if self._state is None:
+            self._state = self.board.state.copy()
+        return self._state
+
+    def observation(self, encoding='grid'):
+        return {'board': self.state, 'action_mask': self.compact_mask if encoding == 'compact' else self.mask}
+
+    def valid_moves(self, piece):
+        """get_valid_moves(piece) from the cached moves: {(row, col): [captured pieces]}"""
+        frm = piece.row * 8 + piece.col
+        moves = {}
+        for action, captured in self.actions.items():
+            if action // 64 == frm:
+                to = action % 64
+                moves[(to // 8, to % 8)] = [self.board.get_piece(row, col) for row, col in captured_squares(captured)]
+        return moves
+
+
+# Game.to_bytes() of the starting position, which Game.reset() restores
+START_STATE = BitBoard().to_bytes() + bytes((1, 0))
+
 
 class Game:
-    def __init__(self, win):
+    def __init__(self, win, backend='list', stats=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown board backend: {backend}")
+        self.backend = backend
+        self.stats = stats  # checkers.phase_stats.PhaseStats, None: not profiled
         self._init()
         self.win = win
-        self.position_count = {}  # Tracks how many times each position occurs
-        self.no_capture_count = 0
-        self.move_history = []
     
     def update(self):
         self.board.draw(self.win)
         if self.selected:
-            self.draw_valid_moves(self.board.get_valid_moves(self.selected))
+            self.draw_valid_moves(self.valid_moves)
         if self.draw_offer:
             self.draw_draw_indication()
 
     def _init(self):
         self.selected = None
-        self.board = Board()
+        self.board = BACKENDS[self.backend]()
         self.turn = RED
         self.valid_moves = {}
-        self.move_history = []
-        self.position_count = {}
-        self.no_capture_count = 0
         self.draw_offer = False
-        self._record_position()
+        self._contexts = {}
+        self.draws = DrawTracker(self.get_board_hash())
 
-    def _record_position(self):
-        """Record the current board position in position_count"""
-        position_hash = self.get_board_hash()
-        if position_hash in self.position_count:
-            self.position_count[position_hash] += 1
-        else:
-            self.position_count[position_hash] = 1
-        self.move_history.append(position_hash)
+    @property
+    def no_capture_count(self):
+        """Half-moves since the last capture"""
+        return self.draws.no_capture_count
+
+    @no_capture_count.setter
+    def no_capture_count(self, value):
+        self.draws.no_capture_count = value
 
     def winner(self):
         return self.board.winner()
 
+    def context(self, color=None):
+        """PositionContext of the current position for color (default: the side to move)"""
+        color = self.turn if color is None else color
+        context = self._contexts.get(color)
+        # The hash check also catches boards changed behind the Game's back
+        if context is None or context.hash != self.board.hash:
+            context = self._contexts[color] = PositionContext(self.board, color, self.stats)
+        return context
+
     def check_draw(self):
-        """Returns draw type if detected, None otherwise"""
+        """Returns draw type if detected, None otherwise (computed once per ply)"""
+        context = self.context()
+        if context.draw is _UNKNOWN:
+            if self.stats is None:
+                context.draw = self._check_draw(context)
+            else:
+                context.draw = self.stats.measure('draw', self._check_draw, context)
+        return context.draw
+
+    def _check_draw(self, context):
         # 1. Threefold repetition
         if self.check_repetition(3):
             return "threefold_repetition"
             
         # 2. 40-move rule (40 moves per player = 80 half-moves)
-        if self.no_capture_count >= 80:
+        if self.no_capture_count >= NO_CAPTURE_LIMIT:
             return "40_moves_no_capture"
             
         # 3. No legal moves (stalemate)
-        if not any(self.board.get_valid_moves(piece) 
-                 for piece in self.board.get_all_pieces(self.turn)):
+        if not context.has_moves:
             return "no_legal_moves"
             
         # 4. Insufficient material
@@ -63,20 +180,8 @@ class Game:
 
     def is_insufficient_material(self):
         """Check if neither player can win with remaining pieces"""
-        white_pieces = 0
-        red_pieces = 0
-        white_kings = 0
-        red_kings = 0
-        
-        for piece in self.board.get_all_pieces():
-            if piece.color == WHITE:
-                white_pieces += 1
-                if piece.king:
-                    white_kings += 1
-            else:
-                red_pieces += 1
-                if piece.king:
-                    red_kings += 1
+        white_pieces, red_pieces = self.board.white_left, self.board.red_left
+        white_kings, red_kings = self.board.white_kings, self.board.red_kings
         
         # Lone king vs lone king
         if white_pieces == 1 and red_pieces == 1:
@@ -91,61 +196,108 @@ class Game:
 
     def check_repetition(self, count):
         """Check if current position has occurred 'count' times"""
-        current_hash = self.get_board_hash()
-        return self.position_count.get(current_hash, 0) >= count
+        return self.draws.count(self.get_board_hash()) >= count
 
     def get_board_hash(self):
-        """Creates unique hash of current board state including turn"""
-        pieces_tuple = tuple(
-            (piece.row, piece.col, piece.king, piece.color) 
-            for piece in self.board.get_all_pieces()
-        )
-        return hash((pieces_tuple, self.turn))
+        """64-bit Zobrist key of the board (kept incrementally by Board) and side to move"""
+        return self.board.hash ^ side_key(self.turn)
 
     def draw_draw_indication(self):
-        font = pygame.font.SysFont("Arial", 24)
-        text = font.render("Draw Offer Active!", True, (255, 215, 0))
-        self.win.blit(text, (WIDTH//2 - text.get_width()//2, 10))
+        # Imported here so the rules load without pygame (see checkers.render)
+        from .render import draw_draw_indication
+        draw_draw_indication(self.win)
 
     def reset(self):
-        self._init()
+        self.restore(START_STATE)
+
+    def to_bytes(self):
+        """18-byte snapshot: the board's to_bytes(), the side to move (0 WHITE, 1 RED), the no-capture count.
+
+        Repetitions are not part of it: a restored game counts them from its
+        own position on, like a new game.
+        """
+        side = 0 if self.turn == WHITE else 1
+        return self.board.to_bytes() + bytes((side, min(self.no_capture_count, NO_CAPTURE_LIMIT)))
+
+    @classmethod
+    def from_bytes(cls, data, win=None, backend='list', stats=None):
+        game = cls(win, backend=backend, stats=stats)
+        game.restore(data)
+        return game
+
+    def restore(self, data):
+        """Set the game to a to_bytes() snapshot in place, without building a new board or pieces"""
+        if len(data) != MASKS.size + 2 or data[MASKS.size] > 1:
+            raise ValueError("Not a Game.to_bytes() snapshot")
+        self.board.restore(data[:MASKS.size])
+        self.turn = WHITE if data[MASKS.size] == 0 else RED
+        self.selected = None
+        self.valid_moves = {}
+        self.draw_offer = False
+        self._contexts = {}
+        self.draws.reset(self.get_board_hash())
+        self.no_capture_count = data[MASKS.size + 1]
 
     def select(self, row, col):
+        if self.stats is None:
+            return self._select(row, col)
+        return self.stats.measure('select', self._select, row, col)
+
+    def play(self, action):
+        """Play the grid action from_square * 64 + to_square for the side to move; returns the pieces captured.
+
+        The move is checked against the legal moves first: an illegal one raises
+        ValueError and leaves the game unchanged. Front ends that get moves from
+        outside (the network, an engine, the env) go through here.
+        """
+        captured = self.context().actions.get(action)
+        if captured is None:
+            raise ValueError(f"Illegal move {action} for the side to move")
+        self.selected = None
+        self.select(*divmod(action // 64, 8))
+        self.select(*divmod(action % 64, 8))
+        return bin(captured).count('1')
+
+    def _select(self, row, col):
         if self.selected:
             result = self._move(row, col)
             if not result:
                 self.selected = None
-                self.select(row, col)
+                self._select(row, col)
         
         piece = self.board.get_piece(row, col)
         if piece != 0 and piece.color == self.turn:
             self.selected = piece
-            self.valid_moves = self.board.get_valid_moves(piece)
+            self.valid_moves = self.context().valid_moves(piece)
             return True
         return False
 
     def _move(self, row, col):
+        if self.stats is None:
+            return self._apply_move(row, col)
+        return self.stats.measure('move', self._apply_move, row, col)
+
+    def _apply_move(self, row, col):
         if self.selected and (row, col) in self.valid_moves:
             skipped = self.valid_moves[(row, col)]
+            # Men only move forward, so neither a capture nor a man move can be undone
+            irreversible = bool(skipped) or not self.selected.king
             self.board.move(self.selected, row, col)
             
             if skipped:
                 self.board.remove(skipped)
-                self.no_capture_count = 0  # Reset on capture
-            else:
-                self.no_capture_count += 1
                 
-            self._record_position()
+            self._contexts = {}
             self.change_turn()
+            # Keyed with the side to move next, as check_repetition looks it up
+            self.draws.record(self.get_board_hash(), bool(skipped), irreversible)
             return True
         return False
 
     def draw_valid_moves(self, moves):
-        for move in moves:
-            row, col = move
-            pygame.draw.circle(self.win, BLUE, 
-                             (col * SQUARE_SIZE + SQUARE_SIZE//2, 
-                              row * SQUARE_SIZE + SQUARE_SIZE//2), 15)
+        # Imported here so the rules load without pygame (see checkers.render)
+        from .render import draw_valid_moves
+        draw_valid_moves(self.win, moves)
 
     def change_turn(self):
         self.valid_moves = {}
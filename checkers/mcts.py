@@ -0,0 +1,192 @@
+"""Monte Carlo tree search guided by the MaskablePPO policy and value head.
+
+PUCT search as in AlphaZero: the policy gives each move its prior and the
+value head scores new leaves, so no random rollouts are played. Leaves are
+gathered into batches of `batch_size` positions and evaluated with one
+forward pass; a virtual loss on every node of a pending path steers the
+other playouts of the batch to different leaves.
+
+Evaluators take (boards (K, 64) int8, masks (K, 4096) int8), encoded like
+CheckersEnv observations, and return (priors (K, 4096), values (K,)) with
+values in [-1, 1] from WHITE's point of view.
+"""
+import copy
+import math
+import time
+
+import numpy as np
+
+from .actions import COMPACT_ACTIONS, GRID_DIM, convert_mask, encoding_of
+from .constants import RED, WHITE
+
+VALUE_SCALE = 10.0  # the env pays +-10 for a win, so the value head is squashed with tanh(v / 10)
+VIRTUAL_LOSS = 1
+C_PUCT = 1.5
+
+
+class PolicyEvaluator:
+    """Priors from the masked policy logits and values from the value head of a MaskablePPO model"""
+
+    def __init__(self, model, value_scale=VALUE_SCALE):
+        self.policy = model.policy
+        self.encoding = encoding_of(model)
+        self.value_scale = value_scale
+
+    def __call__(self, boards, masks):
+        # Imported here so the rest of the module works without torch installed
+        import torch
+        masks = convert_mask(masks, self.encoding)
+        obs, _ = self.policy.obs_to_tensor({'board': boards, 'action_mask': masks})
+        with torch.no_grad():
+            distribution = self.policy.get_distribution(obs, action_masks=masks.astype(bool))
+            priors = distribution.distribution.probs.cpu().numpy()
+            values = self.policy.predict_values(obs).cpu().numpy().reshape(-1)
+        if self.encoding == 'compact':
+            grid = np.zeros((len(priors), GRID_DIM), dtype=priors.dtype)
+            grid[:, COMPACT_ACTIONS] = priors
+            priors = grid
+        return priors, np.tanh(values / self.value_scale)
+
+
+class MaterialEvaluator:
+    """Uniform priors and a material count value; needs no model, for testing and benchmarking"""
+
+    def __init__(self, scale=3.0):
+        self.scale = scale
+
+    def __call__(self, boards, masks):
+        priors = masks / np.maximum(masks.sum(axis=1, keepdims=True), 1)
+        return priors, np.tanh(boards.sum(axis=1) / self.scale)
+
+
+def encode(board, color):
+    """CheckersEnv observation arrays (board, action_mask) and the legal moves for color"""
+    board_obs = board.state.copy()
+    moves = board.generate_moves(color)
+    action_mask = np.zeros((4096,), dtype=np.int8)
+    for from_idx, to_idx, _ in moves:
+        action_mask[from_idx * 64 + to_idx] = 1
+    return board_obs, action_mask, moves
+
+
+def _other(color):
+    return WHITE if color == RED else RED
+
+
+class Node:
+    """Tree node; value_sum is from the point of view of the side that moved into it"""
+
+    def __init__(self, prior, move=None):
+        self.prior = prior
+        self.move = move
+        self.visits = 0
+        self.value_sum = 0.0
+        self.children = None  # None until expanded
+        self.terminal = None  # value for the side to move once known to be game over
+
+    def q(self):
+        return self.value_sum / self.visits if self.visits else 0.0
+
+    def select(self, c_puct):
+        scale = c_puct * math.sqrt(self.visits)
+        return max(self.children, key=lambda child: child.q() + scale * child.prior / (1 + child.visits))
+
+
+class MCTS:
+    """Batched PUCT player.
+
+    search(board, color, playouts, time_limit) returns (move, info) where
+    move is a generate_moves() tuple and info reports playouts, batches,
+    elapsed seconds, playouts/sec and the root value.
+    """
+
+    def __init__(self, evaluator, batch_size=16, c_puct=C_PUCT, virtual_loss=VIRTUAL_LOSS):
+        self.evaluator = evaluator
+        self.batch_size = batch_size
+        self.c_puct = c_puct
+        self.virtual_loss = virtual_loss
+
+    def search(self, board, color, playouts=400, time_limit=None):
+        start = time.perf_counter()
+        deadline = start + time_limit if time_limit else math.inf
+        board = copy.deepcopy(board)
+        root = Node(1.0)
+        done = batches = 0
+        while done < playouts and time.perf_counter() < deadline:
+            done += self._run_batch(board, color, root, min(self.batch_size, playouts - done))
+            batches += 1
+            if root.children == [] or root.terminal is not None:
+                break
+
+        best = max(root.children, key=lambda child: child.visits) if root.children else None
+        elapsed = time.perf_counter() - start
+        return (best.move if best else None), {
+            'playouts': done,
+            'batches': batches,
+            'time': elapsed,
+            'playouts_per_sec': done / elapsed if elapsed > 0 else 0.0,
+            'value': best.q() if best else 0.0,
+        }
+
+    def _descend(self, board, color, root):
+        """Walk to a leaf applying virtual loss; returns (path, color to move at the leaf, make_move tokens)"""
+        path = [root]
+        tokens = []
+        node = root
+        while node.children:
+            node = node.select(self.c_puct)
+            tokens.append(board.make_move(node.move))
+            color = _other(color)
+            node.visits += self.virtual_loss
+            node.value_sum -= self.virtual_loss
+            path.append(node)
+        return path, color, tokens
+
+    def _backup(self, path, value):
+        """Propagate value (for the side to move at the leaf) up the path, removing the virtual loss"""
+        for node in reversed(path[1:]):
+            value = -value
+            node.visits += 1 - self.virtual_loss
+            node.value_sum += value + self.virtual_loss
+        path[0].visits += 1
+
+    def _undo_virtual(self, path):
+        for node in path[1:]:
+            node.visits -= self.virtual_loss
+            node.value_sum += self.virtual_loss
+
+    def _run_batch(self, board, color, root, size):
+        """Select up to `size` leaves, evaluate them in one call and back them up; returns playouts done"""
+        pending = []
+        done = 0
+        for _ in range(size):
+            path, leaf_color, tokens = self._descend(board, color, root)
+            leaf = path[-1]
+            if leaf.terminal is None and any(leaf is waiting[0][-1] for waiting in pending):
+                # Virtual loss could not steer away from a leaf already in the batch
+                self._undo_virtual(path)
+                for token in reversed(tokens):
+                    board.unmake_move(token)
+                break
+            if leaf.terminal is None:
+                if board.winner() is not None:
+                    leaf.terminal = -1.0  # the side to move has no pieces left
+                else:
+                    board_obs, action_mask, moves = encode(board, leaf_color)
+                    if moves:
+                        pending.append((path, leaf_color, board_obs, action_mask, moves))
+                    else:
+                        leaf.terminal = 0.0  # Game.check_draw calls this a draw
+            for token in reversed(tokens):
+                board.unmake_move(token)
+            if leaf.terminal is not None:
+                self._backup(path, leaf.terminal)
+                done += 1
+
+        if pending:
+            priors, values = self.evaluator(np.stack([p[2] for p in pending]), np.stack([p[3] for p in pending]))
+            for (path, leaf_color, _, _, moves), prior, value in zip(pending, priors, values):
+                path[-1].children = [Node(float(prior[move[0] * 64 + move[1]]), move) for move in moves]
+                self._backup(path, float(value) if leaf_color == WHITE else -float(value))
+                done += 1
+        return done
@@ -0,0 +1,99 @@
+from .constants import ROWS, COLS, RED, WHITE
+
+# A move is a flat tuple (from_square, to_square, captured) where squares are
+# 8x8 indices (row * 8 + col, the same numbering as the 'board' observation)
+# and captured is a bitmask with bit (row * 8 + col) set for every piece the
+# move removes. The 4096 action index of a move is from_square * 64 + to_square.
+
+
+def square(row, col):
+    return row * COLS + col
+
+
+def captured_squares(captured):
+    """Yield the (row, col) of every square set in a captured mask"""
+    while captured:
+        low = captured & -captured
+        yield divmod(low.bit_length() - 1, COLS)
+        captured ^= low
+
+
+def action_of(move):
+    return move[0] * 64 + move[1]
+
+
+def _walk(grid, row, col, step, side, color, skipped, targets):
+    """Iterative twin of Board._traverse_left/_traverse_right for one diagonal.
+
+    Chained jumps keep the vertical direction, record only the last two
+    captured pieces and, going up, cannot land on row 0 -- the same rules the
+    recursive traversal implements.
+    """
+    top = 1 if skipped and step < 0 else 0
+    r1, c1 = row + step, col + side
+    if r1 < top or r1 >= ROWS or c1 < 0 or c1 >= COLS:
+        return
+    current = grid[r1][c1]
+    if current == 0:
+        if not skipped:
+            targets[r1 * COLS + c1] = 0
+        return
+    if current.color == color:
+        return
+    r2, c2 = r1 + step, c1 + side
+    if r2 < top or r2 >= ROWS or c2 < 0 or c2 >= COLS or grid[r2][c2] != 0:
+        return
+    jumped = 1 << (r1 * COLS + c1)
+    targets[r2 * COLS + c2] = jumped | skipped
+    _walk(grid, r2, c2, step, -1, color, jumped, targets)
+    _walk(grid, r2, c2, step, 1, color, jumped, targets)
+
+
+def has_move(grid, pieces, color):
+    """Whether any of `pieces` (all of colour `color`) has a step or a jump.
+
+    Stops at the first one found instead of generating every move: a piece
+    can move if a diagonal neighbour ahead of it is empty, or holds an
+    opponent with an empty square behind (a first jump may land on row 0).
+    """
+    for piece in pieces:
+        row, col = piece.row, piece.col
+        for step in ((-1, 1) if piece.king else (-1,) if color == RED else (1,)):
+            r1 = row + step
+            if r1 < 0 or r1 >= ROWS:
+                continue
+            r2 = r1 + step
+            cells = grid[r1]
+            for side in (-1, 1):
+                c1 = col + side
+                if c1 < 0 or c1 >= COLS:
+                    continue
+                current = cells[c1]
+                if current == 0:
+                    return True
+                c2 = c1 + side
+                if current.color != color and 0 <= r2 < ROWS and 0 <= c2 < COLS and grid[r2][c2] == 0:
+                    return True
+    return False
+
+
+def generate_moves(grid, color):
+    """Return every legal move of `color` on a list-of-lists board in one pass"""
+    moves = []
+    for row in range(ROWS):
+        cells = grid[row]
+        for col in range((row + 1) % 2, COLS, 2):
+            piece = cells[col]
+            if piece == 0 or piece.color != color:
+                continue
+            targets = {}
+            if color == RED or piece.king:
+                _walk(grid, row, col, -1, -1, color, 0, targets)
+                _walk(grid, row, col, -1, 1, color, 0, targets)
+            if color == WHITE or piece.king:
+                _walk(grid, row, col, 1, -1, color, 0, targets)
+                _walk(grid, row, col, 1, 1, color, 0, targets)
+            frm = row * COLS + col
+            for to, captured in targets.items():
+                moves.append((frm, to, captured))
+    return moves
@@ -0,0 +1,100 @@
+"""Frozen MaskablePPO snapshots that play RED in self-play training.
+
+    pool = OpponentPool(glob.glob("models/pool/*.zip"))
+    vec_env = CheckersVecEnv(16, opponent=pool)
+
+Each episode draws one snapshot (uniformly) to answer every agent move.
+act() answers a whole batch of positions with one forward pass per
+snapshot, whatever env they come from. The policies are loaded once, in the
+process that owns the pool: CheckersVecEnv and SharedMemoryVecEnv both call
+act() there, so rollout workers never hold a model.
+
+Snapshots may use either action encoding (see checkers.actions); positions
+and answers are always in grid terms. Until the first snapshot is added the
+opponent plays uniformly random legal moves.
+"""
+import copy
+import os
+
+import numpy as np
+
+from .actions import COMPACT_ACTIONS, convert_mask, encoding_of
+
+RANDOM = -1  # snapshot id of the random-move opponent (empty pool)
+
+
+class OpponentPool:
+    """The max_size most recently added policies, by snapshot id"""
+
+    def __init__(self, paths=(), max_size=8, device='cpu', deterministic=False, seed=None):
+        self.max_size = max_size
+        self.device = device
+        self.deterministic = deterministic
+        self.rng = np.random.default_rng(seed)
+        self.snapshots = {}  # id -> (policy, encoding, name), oldest first
+        self.next_id = 0
+        for path in paths:
+            self.add(path)
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def names(self):
+        return [name for _, _, name in self.snapshots.values()]
+
+    def add(self, model, name=None):
+        """Freeze a MaskablePPO model (or load a checkpoint path) into the pool; returns its id"""
+        if isinstance(model, (str, os.PathLike)):
+            # Imported here so the env modules import without torch installed
+            from sb3_contrib import MaskablePPO
+            name = name or os.path.basename(os.fspath(model))
+            model = MaskablePPO.load(model, device=self.device)
+            policy = model.policy
+        else:
+            name = name or f"snapshot_{self.next_id}"
+            policy = copy.deepcopy(model.policy).to(self.device)
+        policy.set_training_mode(False)
+        self.snapshots[self.next_id] = (policy, encoding_of(model), name)
+        self.next_id += 1
+        while len(self.snapshots) > self.max_size:
+            del self.snapshots[next(iter(self.snapshots))]
+        return self.next_id - 1
+
+    def sample(self, n, rng=None):
+        """Snapshot ids for n new episodes"""
+        if not self.snapshots:
+            return np.full(n, RANDOM)
+        return (rng or self.rng).choice(list(self.snapshots), size=n)
+
+    def act(self, boards, masks, snapshots):
+        """Grid actions for (K, 64) boards with (K, 4096) grid masks, each answered by its snapshot
+
+        Ids no longer in the pool (evicted since their episode began) play the newest snapshot.
+        """
+        masks = np.asarray(masks)
+        snapshots = np.asarray(snapshots)
+        actions = np.zeros(len(masks), dtype=np.int64)
+        if self.snapshots:
+            newest = next(reversed(self.snapshots))
+            snapshots = np.where(np.isin(snapshots, list(self.snapshots)), snapshots, newest)
+        else:
+            snapshots = np.full(len(masks), RANDOM)
+        for snapshot in np.unique(snapshots):
+            rows = np.nonzero(snapshots == snapshot)[0]
+            if snapshot == RANDOM:
+                actions[rows] = [self.rng.choice(np.nonzero(mask)[0]) for mask in masks[rows]]
+            else:
+                actions[rows] = self._forward(snapshot, np.asarray(boards)[rows], masks[rows])
+        return actions
+
+    def _forward(self, snapshot, boards, masks):
+        """One batched forward pass of a snapshot's policy"""
+        # Imported here so the rest of the module works without torch installed
+        import torch
+        policy, encoding, _ = self.snapshots[snapshot]
+        masks = convert_mask(masks, encoding)
+        obs, _ = policy.obs_to_tensor({'board': boards, 'action_mask': masks})
+        with torch.no_grad():
+            distribution = policy.get_distribution(obs, action_masks=masks.astype(bool))
+            actions = distribution.get_actions(deterministic=self.deterministic).cpu().numpy()
+        return COMPACT_ACTIONS[actions] if encoding == 'compact' else actions
@@ -0,0 +1,133 @@
+"""Multi-process alpha-beta search, young brothers wait style at the root.
+
+Each iteration of iterative deepening searches the first root move (the
+previous iteration's best) with a full window, in one worker. Its score is
+then the bound every other root move is tested against: the siblings go to
+the process pool together with a null window around it, so each worker
+prunes as hard as the sequential search would. A sibling that fails high is
+re-searched with an open window and, if it really is better, raises the
+bound. Workers run checkers.search.Searcher and keep their transposition
+table between tasks, so later iterations reuse it; each task carries the
+id of its search() call, and a worker ages its table (new_search, as
+Searcher.search does) when the id changes.
+"""
+import multiprocessing
+import os
+import time
+
+from .constants import RED, WHITE
+from .search import Searcher, SearchTimeout, INFINITY, MATE_BOUND, order_moves
+from .zobrist import side_key
+
+# Width of the window siblings are tested with; scores step by 0.5 (Board.evaluate)
+NULL_WINDOW = 0.001
+
+_searcher = None
+_search_id = None  # search() call the worker's last task came from
+
+
+def _init_worker(tt_bits):
+    global _searcher
+    _searcher = Searcher(tt_bits)
+
+
+def _other(color):
+    return WHITE if color == RED else RED
+
+
+def _search_task(task):
+    """Play `move` and search the rest in the (alpha, beta) window; returns (move, score for color, nodes)"""
+    global _search_id
+    board, color, move, depth, alpha, beta, deadline, search_id = task
+    if search_id != _search_id:
+        # A new root position: entries from earlier searches may now be replaced
+        _searcher.tt.new_search()
+        _search_id = search_id
+    _searcher.nodes = 0
+    # The root is on the path, as in Searcher.search, so lines back to it count as repetitions
+    _searcher.path = {board.hash ^ side_key(color)}
+    # perf_counter is per process, so the shared deadline travels as wall-clock time
+    _searcher.deadline = time.perf_counter() + (deadline - time.time())
+    board.make_move(move)
+    try:
+        score = -_searcher._negamax(board, _other(color), depth - 1, -beta, -alpha, 1)
+    except SearchTimeout:
+        score = None
+    return move, score, _searcher.nodes
+
+
+class ParallelSearcher:
+    """Drop-in for Searcher that spreads each iteration over `workers` processes.
+
+    Use as a context manager (or call close()) to shut the pool down.
+    """
+
+    def __init__(self, workers=None, tt_bits=16, max_depth=64):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_depth = max_depth
+        self.nodes = 0
+        self.searches = 0  # search() calls so far; tasks carry it as their search id
+        self.pool = multiprocessing.Pool(self.workers, initializer=_init_worker, initargs=(tt_bits,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def _run(self, tasks):
+        """[(move, score, nodes)] of _search_task over tasks, in order; SearchTimeout if any ran out of time"""
+        results = self.pool.map(_search_task, tasks, chunksize=1)
+        self.nodes += sum(nodes for _, _, nodes in results)
+        if any(score is None for _, score, _ in results):
+            raise SearchTimeout()
+        return results
+
+    def _iterate(self, board, color, moves, depth, deadline):
+        """(best move, score) at depth: the first move in full, the others against its score"""
+        best_move = moves[0]
+        [(_, alpha, _)] = self._run([(board, color, best_move, depth, -INFINITY, INFINITY, deadline, self.searches)])
+        siblings = [(board, color, move, depth, alpha, alpha + NULL_WINDOW, deadline, self.searches)
+                    for move in moves[1:]]
+        for move, score, _ in self._run(siblings):
+            if score > alpha:
+                # Failed high against the first move's score: find its exact value (alpha may have risen since)
+                [(_, score, _)] = self._run([(board, color, move, depth, alpha, INFINITY, deadline, self.searches)])
+                if score > alpha:
+                    best_move, alpha = move, score
+        return best_move, alpha
+
+    def search(self, board, color, time_limit=1.0, max_depth=None):
+        start = time.perf_counter()
+        deadline = time.time() + time_limit
+        self.nodes = 0
+        self.searches += 1
+        moves = board.generate_moves(color)
+        best_move = moves[0] if moves else None
+        best_score = 0.0
+        reached = 0
+        if len(moves) > 1:
+            for depth in range(1, (max_depth or self.max_depth) + 1):
+                # Searcher's root order: the previous best first, then captures
+                ordered = order_moves(list(moves), best_move if reached else None)
+                try:
+                    best_move, best_score = self._iterate(board, color, ordered, depth, deadline)
+                except SearchTimeout:
+                    break
+                reached = depth
+                if abs(best_score) >= MATE_BOUND or time.time() >= deadline:
+                    break
+
+        elapsed = time.perf_counter() - start
+        return best_move, {
+            'depth': reached,
+            'nodes': self.nodes,
+            'time': elapsed,
+            'nps': self.nodes / elapsed if elapsed > 0 else 0.0,
+            'score': best_score,
+            'workers': self.workers,
+        }
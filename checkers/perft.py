@@ -0,0 +1,205 @@
+"""Perft: count the leaf nodes of the move tree to check and time move generation.
+
+Run from the project directory:
+
+    python -m checkers.perft                  # both board backends, stored positions
+    python -m checkers.perft --depth 7 --impl bitboard --position start
+
+Expected counts were produced by checkers.boardAI (the rules CheckersEnv
+trains on); any implementation that disagrees is reported as MISMATCH.
+Whole games under every front end are checked by checkers.conformance.
+"""
+import argparse
+import time
+
+from .constants import ROWS, COLS, RED, WHITE
+from .piece import Piece
+from .zobrist import hash_pieces
+
+# Board diagrams list rows 0..7 top to bottom: w/W white man/king,
+# r/R red man/king, '.' empty. WHITE moves down (towards row 7), RED up.
+POSITIONS = {
+    'start': {
+        'diagram': [
+            '.w.w.w.w',
+            'w.w.w.w.',
+            '.w.w.w.w',
+            '........',
+            '........',
+            'r.r.r.r.',
+            '.r.r.r.r',
+            'r.r.r.r.',
+        ],
+        'turn': RED,
+        'depth': 6,
+        'expected': {
+            1: (7, 0), 2: (49, 0), 3: (379, 11), 4: (2872, 219),
+            5: (23582, 1919), 6: (190647, 22447), 7: (1607254, 193382),
+        },
+    },
+    'multi-jump': {
+        'diagram': [
+            '........',
+            '........',
+            '...w.w..',
+            '........',
+            '.w.w....',
+            '..r.....',
+            '.....r..',
+            '........',
+        ],
+        'turn': RED,
+        'depth': 5,
+        'expected': {1: (6, 4), 2: (36, 7), 3: (131, 40), 4: (671, 91), 5: (2080, 379)},
+    },
+    'promotion-chain': {
+        'diagram': [
+            '........',
+            '..w.....',
+            '........',
+            '..w.....',
+            '...r.r..',
+            '........',
+            '.....r..',
+            '........',
+        ],
+        'turn': WHITE,
+        'depth': 5,
+        'expected': {1: (5, 2), 2: (23, 2), 3: (79, 13), 4: (334, 33), 5: (1181, 129)},
+    },
+    'kings': {
+        'diagram': [
+            '...R....',
+            '........',
+            '.....w..',
+            '..W.....',
+            '.....r..',
+            '..R.....',
+            '.W......',
+            '........',
+        ],
+        'turn': WHITE,
+        'depth': 5,
+        'expected': {
+            1: (10, 1), 2: (77, 11), 3: (656, 76), 4: (5031, 723),
+            5: (38825, 5073), 6: (291679, 37751),
+        },
+    },
+}
+
+
+def load_board(board_cls, diagram):
+    """Build a board_cls instance holding the pieces of a POSITIONS diagram"""
+    board = board_cls()
+    if hasattr(board, 'board'):
+        piece_cls = type(board.get_piece(0, 1))
+        grid = [[0] * COLS for _ in range(ROWS)]
+        for row, line in enumerate(diagram):
+            for col, char in enumerate(line):
+                if char in 'wWrR':
+                    piece = piece_cls(row, col, WHITE if char in 'wW' else RED)
+                    if char.isupper():
+                        piece.make_king()
+                    grid[row][col] = piece
+        board.board = grid
+        if hasattr(board, 'index_pieces'):
+            board.index_pieces()
+    else:
+        board.remove(board.get_all_pieces())
+        for row, line in enumerate(diagram):
+            for col, char in enumerate(line):
+                if char in 'wWrR':
+                    piece = Piece(row, col, WHITE if char in 'wW' else RED)
+                    if char.isupper():
+                        piece.make_king()
+                    board.put_back(piece)
+    if hasattr(board, 'hash'):
+        board.hash = hash_pieces(board.get_all_pieces())
+    return board
+
+
+def _other(color):
+    return WHITE if color == RED else RED
+
+
+def _perft_make(board, color, depth):
+    moves = board.generate_moves(color)
+    if depth == 1:
+        return len(moves), sum(1 for move in moves if move[2])
+    nodes = captures = 0
+    for move in moves:
+        token = board.make_move(move)
+        n, c = _perft_make(board, _other(color), depth - 1)
+        board.unmake_move(token)
+        nodes += n
+        captures += c
+    return nodes, captures
+
+
+def perft(board, color, depth):
+    """Return (leaf nodes, captures among the leaf moves) of the tree `depth` plies below board.
+
+    The board is walked in place with make_move/unmake_move.
+    """
+    if depth <= 0:
+        return 1, 0
+    return _perft_make(board, color, depth)
+
+
+def implementations():
+    """Name -> board class of every backend of the rules core (checkers.gameAI.BACKENDS)"""
+    from .boardAI import Board as AIBoard
+    from .bitboard import BitBoard
+    return {
+        'boardAI': AIBoard,
+        'bitboard': BitBoard,
+    }
+
+
+def run(impl_names, position_names, depth=None):
+    """Run perft and return a list of result dicts (one per implementation and position)"""
+    impls = implementations()
+    results = []
+    for position_name in position_names:
+        position = POSITIONS[position_name]
+        d = depth or position['depth']
+        expected = position['expected'].get(d)
+        for name in impl_names:
+            board = load_board(impls[name], position['diagram'])
+            start = time.perf_counter()
+            nodes, captures = perft(board, position['turn'], d)
+            elapsed = time.perf_counter() - start
+            results.append({
+                'impl': name,
+                'position': position_name,
+                'depth': d,
+                'nodes': nodes,
+                'captures': captures,
+                'seconds': elapsed,
+                'nodes_per_sec': nodes / elapsed if elapsed else 0.0,
+                'ok': expected is None or expected == (nodes, captures),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--depth', type=int, default=None, help="override the stored depth of each position")
+    parser.add_argument('--impl', action='append', choices=sorted(implementations()),
+                        help="implementation to run (repeatable, default: all)")
+    parser.add_argument('--position', action='append', choices=sorted(POSITIONS),
+                        help="stored position to run (repeatable, default: all)")
+    args = parser.parse_args()
+
+    results = run(args.impl or list(implementations()), args.position or list(POSITIONS), args.depth)
+    print(f"{'position':<16} {'impl':<11} {'depth':>5} {'nodes':>10} {'captures':>9} {'nodes/s':>10}  check")
+    failed = False
+    for r in results:
+        failed |= not r['ok']
+        print(f"{r['position']:<16} {r['impl']:<11} {r['depth']:>5} {r['nodes']:>10} {r['captures']:>9} "
+              f"{r['nodes_per_sec']:>10.0f}  {'ok' if r['ok'] else 'MISMATCH'}")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Opt-in phase timers for CheckersEnv, Game and CheckersVecEnv.
+
+    env = CheckersEnv(profile=True)
+    ...
+    per_step_us(env.phase_stats())   # {'step': 48.1, 'movegen': 11.9, 'mask': 3.0, ...}
+
+Instrumented code checks `stats is not None` before touching the clock, so a
+disabled env pays one attribute test per phase. Times come from the
+monotonic time.perf_counter_ns() and are inclusive: 'step' contains
+'select', which contains 'move', and so on. Per-ply caches (PositionContext)
+mean a phase is only charged when its work is actually done. CheckersVecEnv
+has no per-piece work: its 'move' is apply_actions and its 'mask' is
+legal_masks, move generation included.
+"""
+from time import perf_counter_ns
+
+PHASES = ('step', 'observation', 'movegen', 'mask', 'select', 'move', 'draw', 'opponent')
+
+
+class PhaseStats:
+    """Nanoseconds and calls per phase, and the env steps they were spent on"""
+
+    def __init__(self):
+        self.steps = 0
+        self.nanoseconds = dict.fromkeys(PHASES, 0)
+        self.calls = dict.fromkeys(PHASES, 0)
+
+    def measure(self, phase, function, *args):
+        """function(*args), with its time charged to phase"""
+        start = perf_counter_ns()
+        try:
+            return function(*args)
+        finally:
+            self.nanoseconds[phase] += perf_counter_ns() - start
+            self.calls[phase] += 1
+
+    def totals(self):
+        """Cumulative counters, as plain data (picklable across worker pipes)"""
+        return {'steps': self.steps, 'nanoseconds': dict(self.nanoseconds), 'calls': dict(self.calls)}
+
+
+def merge(totals):
+    """Sum of several totals() (e.g. one per env of a VecEnv)"""
+    merged = PhaseStats().totals()
+    for part in totals:
+        merged['steps'] += part['steps']
+        for phase in PHASES:
+            merged['nanoseconds'][phase] += part['nanoseconds'][phase]
+            merged['calls'][phase] += part['calls'][phase]
+    return merged
+
+
+def per_step_us(totals, since=None):
+    """{phase: microseconds per env step} between two totals() (since=None: from the start)"""
+    since = since or PhaseStats().totals()
+    steps = totals['steps'] - since['steps']
+    if steps <= 0:
+        return dict.fromkeys(PHASES, 0.0)
+    return {phase: (totals['nanoseconds'][phase] - since['nanoseconds'][phase]) / 1000 / steps for phase in PHASES}
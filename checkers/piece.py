@@ -1,37 +1,42 @@
-from .constants import RED, WHITE, SQUARE_SIZE, GREY, CROWN
-import pygame
+from .constants import WHITE, SQUARE_SIZE
 
 class Piece:
     PADDING = 18
     OUTLINE = 2
+    # Boards create and move pieces constantly during training, so keep them small
+    __slots__ = ('row', 'col', 'color', 'king')
 
     def __init__(self, row, col, color):
         self.row = row
         self.col = col
         self.color = color
         self.king = False
-        self.x = 0
-        self.y = 0
-        self.calc_pos()
 
-    def calc_pos(self):
-        self.x = SQUARE_SIZE * self.col + SQUARE_SIZE // 2
-        self.y = SQUARE_SIZE * self.row + SQUARE_SIZE // 2
+    @property
+    def x(self):
+        return SQUARE_SIZE * self.col + SQUARE_SIZE // 2
+
+    @property
+    def y(self):
+        return SQUARE_SIZE * self.row + SQUARE_SIZE // 2
+
+    @property
+    def value(self):
+        """Observation encoding: 1 white man, 2 white king, -1 red man, -2 red king"""
+        value = 2 if self.king else 1
+        return value if self.color == WHITE else -value
 
     def make_king(self):
         self.king = True
     
     def draw(self, win):
-        radius = SQUARE_SIZE//2 - self.PADDING
-        pygame.draw.circle(win, GREY , (self.x, self.y), radius + self.OUTLINE)
-        pygame.draw.circle(win, self.color , (self.x, self.y), radius)
-        if self.king:
-            win.blit(CROWN, (self.x - CROWN.get_width()//2, self.y - CROWN.get_height()//2))
+        # Imported here so the rules load without pygame (see checkers.render)
+        from .render import draw_piece
+        draw_piece(win, self)
 
     def move(self, row, col):
         self.row = row
         self.col = col
-        self.calc_pos()
 
     def __repr__(self):
         return str(self.color)
\ No newline at end of file
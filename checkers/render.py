@@ -0,0 +1,116 @@
+"""pygame drawing of boards, pieces and Game overlays.
+
+The rules modules (constants, piece, the boards, game, gameAI) never import
+pygame: their draw methods import this module on first use, so training
+and search processes load no SDL at all. The crown sprite is loaded once,
+on first draw, from the project's assets directory whatever the working
+directory.
+
+BoardFrames turns board arrays into RGB frames without a display, for the
+envs' 'rgb_array' mode and evaluation videos.
+"""
+import os
+
+import numpy as np
+import pygame
+
+from .constants import BLACK, BLUE, BWHITE, COLS, GREY, RED, ROWS, SQUARE_SIZE, WHITE, WIDTH
+from .piece import Piece
+
+ASSETS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets')
+
+_crown = None
+
+
+def crown():
+    """The king crown sprite (needs pygame initialised by the caller)"""
+    global _crown
+    if _crown is None:
+        _crown = pygame.transform.scale(pygame.image.load(os.path.join(ASSETS, 'crown.png')), (44, 25))
+    return _crown
+
+
+def draw_squares(win):
+    win.fill(BLACK)
+    for row in range(ROWS):
+        for col in range(row % 2, COLS, 2):
+            pygame.draw.rect(win, BWHITE, (row*SQUARE_SIZE, col *SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+
+
+def draw_piece(win, piece):
+    radius = SQUARE_SIZE//2 - piece.PADDING
+    pygame.draw.circle(win, GREY , (piece.x, piece.y), radius + piece.OUTLINE)
+    pygame.draw.circle(win, piece.color , (piece.x, piece.y), radius)
+    if piece.king:
+        sprite = crown()
+        win.blit(sprite, (piece.x - sprite.get_width()//2, piece.y - sprite.get_height()//2))
+
+
+def draw_board(win, board):
+    """Squares and pieces of any board backend"""
+    draw_squares(win)
+    for piece in board.get_all_pieces():
+        draw_piece(win, piece)
+
+
+def draw_valid_moves(win, moves):
+    for move in moves:
+        row, col = move
+        pygame.draw.circle(win, BLUE,
+                           (col * SQUARE_SIZE + SQUARE_SIZE//2,
+                            row * SQUARE_SIZE + SQUARE_SIZE//2), 15)
+
+
+def draw_draw_indication(win):
+    font = pygame.font.SysFont("Arial", 24)
+    text = font.render("Draw Offer Active!", True, (255, 215, 0))
+    win.blit(text, (WIDTH//2 - text.get_width()//2, 10))
+
+
+# 1 on the dark squares, where pieces stand (draw_squares leaves them BLACK)
+_DARK = np.add.outer(np.arange(ROWS), np.arange(COLS)) % 2
+
+
+class BoardFrames:
+    """(size, size, 3) uint8 RGB frames of int8[64] boards (Piece.value encoding), drawn offscreen.
+
+    Every square is one of eleven tiles -- a light square, or a dark square
+    empty or holding one of the four piece kinds -- drawn once with the
+    functions above and scaled to size // 8 pixels. A frame is then a single
+    NumPy gather from the board array: no display, no per-piece drawing. At
+    the default size it is pixel for pixel what the game window shows.
+    """
+
+    def __init__(self, size=WIDTH):
+        if size <= 0 or size % COLS:
+            raise ValueError(f"Frame size must be a positive multiple of {COLS}, got {size}")
+        self.size = size
+        square = size // COLS
+        # [dark square][board value + 2] -> (square, square, 3) tile
+        self.tiles = np.zeros((2, 5, square, square, 3), dtype=np.uint8)
+        surface = pygame.Surface((2 * SQUARE_SIZE, SQUARE_SIZE))
+        for value in range(-2, 3):
+            # Square (row 0, col 1) is the dark one of the pair draw_squares paints
+            draw_squares(surface)
+            if value:
+                piece = Piece(0, 1, WHITE if value > 0 else RED)
+                if abs(value) == 2:
+                    piece.make_king()
+                draw_piece(surface, piece)
+            if square != SQUARE_SIZE:
+                tiles = pygame.transform.smoothscale(surface, (2 * square, square))
+            else:
+                tiles = surface
+            pixels = pygame.surfarray.array3d(tiles).transpose(1, 0, 2)
+            self.tiles[0, value + 2] = pixels[:, :square]
+            self.tiles[1, value + 2] = pixels[:, square:]
+
+    def frame(self, board):
+        """Frame of one int8[64] board"""
+        return self.frames(np.asarray(board)[None])[0]
+
+    def frames(self, boards):
+        """(N, size, size, 3) frames of an (N, 64) batch of boards, e.g. CheckersVecEnv.boards"""
+        boards = np.asarray(boards).reshape(-1, ROWS, COLS)
+        tiles = self.tiles[_DARK, boards + 2]  # (N, rows, cols, square, square, 3)
+        return tiles.transpose(0, 1, 3, 2, 4, 5).reshape(len(boards), self.size, self.size, 3)
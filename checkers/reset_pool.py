@@ -0,0 +1,161 @@
+"""Reset pools: Game.to_bytes() positions CheckersEnv starts its episodes from.
+
+Build one from recorded games, random endgames and the start position, from
+the project directory:
+
+    python -m checkers.reset_pool --games games.txt --skip 20 --out reset_pool.bin
+    python -m checkers.reset_pool --endgame 2 1 2 0 --endgame 0 3 0 2 --count 5000 --out endgames.bin
+
+then train with CheckersEnv(reset_pool='endgames.bin') (or a list of
+snapshots). Recorded games use the checkers.book format: one game per line,
+space separated actions (from_square * 64 + to_square) from the start.
+
+The file is MAGIC followed by fixed-size Game.to_bytes() records; a reset
+restores one in place, so episodes start without building boards or pieces.
+
+Positions keep their side to move, and CheckersEnv's agent starts as that
+side. In self-play the agent only plays WHITE: from a RED-to-move position
+the opponent's move is played during reset, and a position that move ends
+is swapped for another (reset gives up with ValueError after
+MAX_DRAWS positions in a row end that way). Pools only hold games still
+going: save_pool and load_pool reject finished positions. --turn white keeps the endgames to positions the
+agent starts itself.
+"""
+import argparse
+import random
+
+from .bitboard import MASKS, SQUARE_ROW
+from .constants import RED, WHITE
+from .gameAI import START_STATE, Game
+
+MAGIC = b'CRP1'
+RECORD_SIZE = len(START_STATE)
+MAX_DRAWS = 100  # pool positions in a row CheckersEnv.reset tries before giving up
+
+
+def check_pool(states, name='reset pool'):
+    """states, once every one is checked to be a snapshot of a game still going; ValueError otherwise
+
+    A finished position (a result, a draw, no legal move for the side to
+    move) cannot start an episode: CheckersEnv would have nothing to play.
+    """
+    game = Game(None, backend='bitboard')
+    for index, state in enumerate(states):
+        if len(state) != RECORD_SIZE:
+            raise ValueError(f"{name}: record {index} is not a Game.to_bytes() snapshot")
+        game.restore(state)
+        if not _live(game):
+            raise ValueError(f"{name}: record {index} is a finished game")
+    return states
+
+
+def save_pool(path, states):
+    """Write Game.to_bytes() snapshots as a pool file; returns the record count"""
+    check_pool(states, path)
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        for state in states:
+            f.write(state)
+    return len(states)
+
+
+def load_pool(path):
+    """[Game.to_bytes() snapshot, ...] of a pool file, checked with check_pool"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC or (len(data) - len(MAGIC)) % RECORD_SIZE:
+        raise ValueError(f"{path} is not a reset pool file")
+    return check_pool([data[i:i + RECORD_SIZE] for i in range(len(MAGIC), len(data), RECORD_SIZE)], path)
+
+
+def _live(game):
+    return game.winner() is None and game.check_draw() is None
+
+
+def game_positions(path, skip=0, every=1, states=None):
+    """Snapshots of the positions of a recorded games file: from ply `skip` on, one in `every`, games still going"""
+    states = [] if states is None else states
+    game = Game(None, backend='bitboard')
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            game.reset()
+            for ply, action in enumerate(int(a) for a in line.split()):
+                if action not in game.context().actions:
+                    print(f"{path}:{number}: illegal action {action}, rest of the game skipped")
+                    break
+                game.play(action)
+                if ply + 1 >= skip and (ply + 1 - skip) % every == 0 and _live(game):
+                    states.append(game.to_bytes())
+    return states
+
+
+def endgames(signature, count, seed=None, turn=None, states=None):
+    """`count` random positions with (white men, white kings, red men, red kings) = signature
+
+    Men are only placed where they have not been promoted yet; positions that
+    are already over (no piece or move left, or a draw) are drawn again.
+    turn None picks the side to move at random.
+    """
+    if sum(signature) > 32 or signature[0] + signature[1] == 0 or signature[2] + signature[3] == 0:
+        raise ValueError(f"No playable endgame with (white men, white kings, red men, red kings) = {signature}")
+    rng = random.Random(seed)
+    states = [] if states is None else states
+    game = Game(None, backend='bitboard')
+    # White men never stand on row 7, red men never on row 0
+    allowed = (
+        [sq for sq in range(32) if SQUARE_ROW[sq] != 7],
+        list(range(32)),
+        [sq for sq in range(32) if SQUARE_ROW[sq] != 0],
+        list(range(32)),
+    )
+    found = attempts = 0
+    while found < count:
+        attempts += 1
+        if attempts > 100 * count + 1000:
+            raise ValueError(f"Could not draw {count} live positions for {signature}")
+        occupied, masks = 0, []
+        for pieces, squares in zip(signature, allowed):
+            free = [sq for sq in squares if not occupied >> sq & 1]
+            if len(free) < pieces:
+                break
+            mask = sum(1 << sq for sq in rng.sample(free, pieces))
+            occupied |= mask
+            masks.append(mask)
+        else:
+            side = rng.choice((WHITE, RED)) if turn is None else turn
+            game.restore(MASKS.pack(*masks) + bytes((0 if side == WHITE else 1, 0)))
+            if _live(game):
+                states.append(game.to_bytes())
+                found += 1
+    return states
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', default='reset_pool.bin', help="pool file to write")
+    parser.add_argument('--games', action='append', default=[], help="recorded games file (repeatable)")
+    parser.add_argument('--skip', type=int, default=0, help="plies of each recorded game left out")
+    parser.add_argument('--every', type=int, default=1, help="keep one recorded position in this many")
+    parser.add_argument('--endgame', type=int, nargs=4, action='append', default=[],
+                        metavar=('WM', 'WK', 'RM', 'RK'), help="random endgame pieces (repeatable)")
+    parser.add_argument('--count', type=int, default=1000, help="positions per endgame")
+    parser.add_argument('--turn', choices=('white', 'red'), default=None,
+                        help="side to move in the endgames (default: either)")
+    parser.add_argument('--start', type=int, default=0, help="copies of the start position")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    states = [START_STATE] * args.start
+    for path in args.games:
+        game_positions(path, args.skip, args.every, states)
+    turn = {'white': WHITE, 'red': RED, None: None}[args.turn]
+    for index, signature in enumerate(args.endgame):
+        seed = None if args.seed is None else args.seed + index
+        endgames(tuple(signature), args.count, seed, turn, states)
+    if not states:
+        parser.error("nothing to write: give --games, --endgame or --start")
+    print(f"{save_pool(args.out, states)} positions written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Classical alpha-beta engine over the make/unmake board API.
+
+Negamax with iterative deepening, capture-only quiescence and a fixed-size
+transposition table, scored with Board.evaluate(). Works on any board that
+has generate_moves/make_move/unmake_move/hash (boardAI.Board, BitBoard).
+"""
+import time
+
+from .constants import RED, WHITE
+from .zobrist import side_key
+
+WIN_SCORE = 1000.0
+MATE_BOUND = WIN_SCORE - 100  # scores beyond it are wins/losses a known number of plies away
+INFINITY = float('inf')
+EXACT, LOWER, UPPER = range(3)
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class TranspositionTable:
+    """Fixed-size table of search results with 2**bits slots.
+
+    Each slot holds one (key, depth, score, flag, move, generation) tuple, so
+    memory is bounded by the slot count (about 8 MB for the default 2**16).
+    A slot is replaced when the new result is searched at least as deep, is
+    for the same position, or the old one is left over from a previous search.
+    """
+
+    def __init__(self, bits=16):
+        self.size = 1 << bits
+        self.mask = self.size - 1
+        self.slots = [None] * self.size
+        self.generation = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def clear(self):
+        self.slots = [None] * self.size
+
+    def probe(self, key):
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, score, flag, move):
+        index = key & self.mask
+        entry = self.slots[index]
+        if entry is None or entry[0] == key or depth >= entry[1] or entry[5] != self.generation:
+            self.slots[index] = (key, depth, score, flag, move, self.generation)
+
+
+def _to_tt(score, ply):
+    """Mate score found `ply` plies from the root -> distance from the node, as the TT keeps it"""
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def _from_tt(score, ply):
+    """TT score -> mate distance from the root again, for a node `ply` plies deep"""
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+
+def _other(color):
+    return WHITE if color == RED else RED
+
+
+def _capture_count(move):
+    return bin(move[2]).count("1")
+
+
+def order_moves(moves, tt_move):
+    """Sort moves in place for search: tt_move first, then the biggest captures"""
+    moves.sort(key=_capture_count, reverse=True)
+    if tt_move is not None and tt_move in moves:
+        moves.remove(tt_move)
+        moves.insert(0, tt_move)
+    return moves
+
+
+class Searcher:
+    """Iterative deepening alpha-beta player.
+
+    search(board, color, time_limit) returns (move, info) where move is a
+    generate_moves() tuple (or None without legal moves) and info reports
+    the depth reached, nodes, elapsed seconds, nodes/sec and score.
+    """
+
+    def __init__(self, tt_bits=16, max_depth=64):
+        self.tt = TranspositionTable(tt_bits)
+        self.max_depth = max_depth
+        self.nodes = 0
+        self.deadline = INFINITY
+        self.path = set()
+        self.root_move = None
+        self.repetitions = 0  # repetition cut-offs so far: results that saw one are path-dependent
+
+    def evaluate(self, board, color):
+        score = board.evaluate()
+        return score if color == WHITE else -score
+
+    def search(self, board, color, time_limit=1.0, max_depth=None):
+        start = time.perf_counter()
+        self.deadline = start + time_limit
+        self.nodes = 0
+        self.path = set()
+        self.tt.new_search()
+
+        moves = board.generate_moves(color)
+        best_move = moves[0] if moves else None
+        best_score = 0.0
+        reached = 0
+        if len(moves) > 1:
+            for depth in range(1, (max_depth or self.max_depth) + 1):
+                try:
+                    score = self._negamax(board, color, depth, -INFINITY, INFINITY, 0)
+                except SearchTimeout:
+                    break
+                best_move, best_score, reached = self.root_move, score, depth
+                if abs(score) >= MATE_BOUND or time.perf_counter() >= self.deadline:
+                    break
+
+        elapsed = time.perf_counter() - start
+        return best_move, {
+            'depth': reached,
+            'nodes': self.nodes,
+            'time': elapsed,
+            'nps': self.nodes / elapsed if elapsed > 0 else 0.0,
+            'score': best_score,
+        }
+
+    def _order(self, moves, tt_move):
+        return order_moves(moves, tt_move)
+
+    def _tick(self):
+        self.nodes += 1
+        if not self.nodes & 1023 and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+
+    def _negamax(self, board, color, depth, alpha, beta, ply):
+        self._tick()
+        if board.winner() is not None:
+            return -WIN_SCORE + ply  # the side to move has no pieces left
+        if depth <= 0:
+            return self._quiesce(board, color, alpha, beta, ply)
+
+        key = board.hash ^ side_key(color)
+        if ply and key in self.path:
+            self.repetitions += 1
+            return 0.0  # repetition along the current line
+
+        alpha_orig = alpha
+        tt_move = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_move = entry[4]
+            if ply and entry[1] >= depth:
+                score, flag = _from_tt(entry[2], ply), entry[3]
+                if flag == EXACT:
+                    return score
+                if flag == LOWER and score >= beta:
+                    return score
+                if flag == UPPER and score <= alpha:
+                    return score
+
+        moves = board.generate_moves(color)
+        if not moves:
+            return 0.0  # Game.check_draw calls this a draw (no_legal_moves)
+
+        other = _other(color)
+        best_score = -INFINITY
+        best_move = None
+        repetitions = self.repetitions
+        self.path.add(key)
+        try:
+            for move in self._order(moves, tt_move):
+                token = board.make_move(move)
+                try:
+                    score = -self._negamax(board, other, depth - 1, -beta, -alpha, ply + 1)
+                finally:
+                    board.unmake_move(token)
+                if score > best_score:
+                    best_score, best_move = score, move
+                    if score > alpha:
+                        alpha = score
+                        if alpha >= beta:
+                            break
+        finally:
+            self.path.discard(key)
+
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        # A draw by repetition only holds on this line: keep it out of the table
+        if self.repetitions == repetitions:
+            self.tt.store(key, depth, _to_tt(best_score, ply), flag, best_move)
+        if ply == 0:
+            self.root_move = best_move
+        return best_score
+
+    def _quiesce(self, board, color, alpha, beta, ply):
+        """Resolve pending captures so the static evaluation is not taken mid-exchange"""
+        self._tick()
+        if board.winner() is not None:
+            return -WIN_SCORE + ply
+        stand_pat = self.evaluate(board, color)
+        if stand_pat >= beta:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        captures = [move for move in board.generate_moves(color) if move[2]]
+        captures.sort(key=_capture_count, reverse=True)
+        other = _other(color)
+        for move in captures:
+            token = board.make_move(move)
+            try:
+                score = -self._quiesce(board, other, -beta, -alpha, ply + 1)
+            finally:
+                board.unmake_move(token)
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
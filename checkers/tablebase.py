@@ -0,0 +1,323 @@
+"""Endgame tablebases: retrograde analysis of every position with few pieces.
+
+Build them once from the project directory:
+
+    python -m checkers.tablebase --pieces 4 --out tablebases
+
+Results follow the rules Game/CheckersEnv play by: a side with no pieces has
+lost, while no legal moves and insufficient material (lone piece vs lone
+piece, lone piece vs two kings) are draws. Repetition and the no-capture
+counter are ignored, as usual for tablebases.
+
+Each material signature (white men, white kings, red men, red kings) is one
+file holding one byte per (position, side to move); Tablebase probes them
+through mmap so only touched pages are read.
+"""
+import argparse
+import itertools
+import mmap
+import os
+import time
+from math import comb
+
+from .constants import RED, WHITE
+from .bitboard import BitBoard, SQUARE_OF
+
+MAGIC = b'CTB1'
+# Value byte: 0 draw, 2d+1 win in d plies, 2d+2 loss in d plies, 255 not a position
+DRAW = 0
+INVALID = 255
+MAX_DISTANCE = 126
+
+# Men never stand on their own promotion row: white men use squares 0..27
+# (rows 0-6), red men squares 4..31 (rows 1-7). Kings may use all 32.
+WHITE_MAN_SQUARES = 28
+RED_MAN_OFFSET = 4
+
+
+def encode(result, distance):
+    distance = min(distance, MAX_DISTANCE)
+    if result == 'win':
+        return 2 * distance + 1
+    if result == 'loss':
+        return 2 * distance + 2
+    return DRAW
+
+
+def decode(value):
+    """Byte -> (result, distance) from the side to move's point of view"""
+    if value == DRAW:
+        return 'draw', 0
+    if value % 2:
+        return 'win', (value - 1) // 2
+    return 'loss', (value - 2) // 2
+
+
+def _score(value):
+    """Order child values from the mover's side: winning fast > draw > losing slowly"""
+    result, distance = decode(value)
+    if result == 'loss':  # the child side to move loses, so the mover wins
+        return 1000 - (distance + 1)
+    if result == 'win':
+        return -1000 + (distance + 1)
+    return 0
+
+
+def _popcount(b):
+    return bin(b).count("1")
+
+
+def _rank(mask, offset=0):
+    """Colex rank of the set bits of mask (shifted down by offset) among same-size subsets"""
+    rank = 0
+    i = 1
+    while mask:
+        low = mask & -mask
+        rank += comb(low.bit_length() - 1 - offset, i)
+        i += 1
+        mask ^= low
+    return rank
+
+
+def signature_of(white_men, white_kings, red_men, red_kings):
+    return _popcount(white_men), _popcount(white_kings), _popcount(red_men), _popcount(red_kings)
+
+
+def table_size(signature):
+    wm, wk, rm, rk = signature
+    return comb(WHITE_MAN_SQUARES, wm) * comb(32, wk) * comb(32 - RED_MAN_OFFSET, rm) * comb(32, rk) * 2
+
+
+def index_of(signature, white_men, white_kings, red_men, red_kings, turn):
+    _, wk, rm, rk = signature
+    index = _rank(white_men)
+    index = index * comb(32, wk) + _rank(white_kings)
+    index = index * comb(32 - RED_MAN_OFFSET, rm) + _rank(red_men, RED_MAN_OFFSET)
+    index = index * comb(32, rk) + _rank(red_kings)
+    return index * 2 + (0 if turn == WHITE else 1)
+
+
+def signatures(max_pieces):
+    """Every signature with both sides on the board, children before parents.
+
+    Captures lower the piece count and promotions turn a man into a king, so
+    ordering by (pieces, men) guarantees every other table a move can reach
+    is already solved.
+    """
+    result = []
+    for wm, wk, rm, rk in itertools.product(range(max_pieces + 1), repeat=4):
+        if wm + wk >= 1 and rm + rk >= 1 and wm + wk + rm + rk <= max_pieces:
+            result.append((wm, wk, rm, rk))
+    result.sort(key=lambda s: (sum(s), s[0] + s[2], s))
+    return result
+
+
+def file_name(signature):
+    return 'tb_%d%d%d%d.bin' % signature
+
+
+def _insufficient(signature):
+    """Game.is_insufficient_material for a signature"""
+    wm, wk, rm, rk = signature
+    white, red = wm + wk, rm + rk
+    if white == 1 and red == 1:
+        return True
+    return (white == 1 and red == 2 and rk == 2) or (red == 1 and white == 2 and wk == 2)
+
+
+def _positions(signature):
+    """Yield (white_men, white_kings, red_men, red_kings) masks of every placement"""
+    wm, wk, rm, rk = signature
+    for a in itertools.combinations(range(WHITE_MAN_SQUARES), wm):
+        white_men = sum(1 << sq for sq in a)
+        for b in itertools.combinations(range(32), wk):
+            white_kings = sum(1 << sq for sq in b)
+            if white_kings & white_men:
+                continue
+            white = white_men | white_kings
+            for c in itertools.combinations(range(RED_MAN_OFFSET, 32), rm):
+                red_men = sum(1 << sq for sq in c)
+                if red_men & white:
+                    continue
+                for d in itertools.combinations(range(32), rk):
+                    red_kings = sum(1 << sq for sq in d)
+                    if red_kings & (white | red_men):
+                        continue
+                    yield white_men, white_kings, red_men, red_kings
+
+
+def _solve(signature, solved, board):
+    """Retrograde analysis of one signature; `solved` maps signature -> finished bytearray"""
+    size = table_size(signature)
+    values = bytearray([INVALID]) * size
+    pending = {}   # index -> (best external score or None, [internal child indices])
+    max_external = 0
+    insufficient = _insufficient(signature)
+
+    for masks in _positions(signature):
+        for turn in (WHITE, RED):
+            index = index_of(signature, *masks, turn)
+            board.white_men, board.white_king_mask, board.red_men, board.red_king_mask = masks
+            moves = board.moves(turn)
+            if not moves or insufficient:
+                values[index] = DRAW
+                continue
+            other = RED if turn == WHITE else WHITE
+            best = None
+            internal = []
+            for frm, to, captured in moves:
+                board.white_men, board.white_king_mask, board.red_men, board.red_king_mask = masks
+                board._move_square(frm, to)
+                while captured:
+                    low = captured & -captured
+                    board._remove_square(low.bit_length() - 1)
+                    captured ^= low
+                child = (board.white_men, board.white_king_mask, board.red_men, board.red_king_mask)
+                child_signature = signature_of(*child)
+                if child_signature == signature:
+                    internal.append(index_of(signature, *child, other))
+                    continue
+                if child_signature[2] + child_signature[3] == 0 or child_signature[0] + child_signature[1] == 0:
+                    score = _score(encode('loss', 0))   # the opponent has no pieces left
+                else:
+                    value = solved[child_signature][index_of(child_signature, *child, other)]
+                    score = _score(value)
+                    max_external = max(max_external, decode(value)[1])
+                if best is None or score > best:
+                    best = score
+            pending[index] = (best, internal)
+
+    # Pass n settles every position won or lost in exactly n plies.
+    n = 1
+    changed = True
+    while pending and (n <= max_external + 2 or changed):
+        changed = False
+        settled = []
+        for index, (best, internal) in pending.items():
+            complete = True
+            for child in internal:
+                value = values[child]
+                if value == INVALID:
+                    complete = False
+                    continue
+                score = _score(value)
+                if best is None or score > best:
+                    best = score
+            if best is not None and best == 1000 - n:
+                settled.append((index, encode('win', n)))
+            elif complete and best == 0:
+                settled.append((index, DRAW))
+            elif complete and best == -1000 + n:
+                settled.append((index, encode('loss', n)))
+        for index, value in settled:
+            values[index] = value
+            del pending[index]
+            changed = True
+        n += 1
+    for index in pending:
+        values[index] = DRAW   # neither side can force a result
+    return values
+
+
+def generate(directory, max_pieces, log=print):
+    """Write tablebase files for every signature with up to max_pieces pieces"""
+    os.makedirs(directory, exist_ok=True)
+    board = BitBoard()
+    solved = {}
+    for signature in signatures(max_pieces):
+        start = time.perf_counter()
+        values = _solve(signature, solved, board)
+        solved[signature] = values
+        with open(os.path.join(directory, file_name(signature)), 'wb') as f:
+            f.write(MAGIC)
+            f.write(values)
+        log(f"{file_name(signature)}: {len(values)} entries in {time.perf_counter() - start:.1f}s")
+
+
+class Tablebase:
+    """Read-only access to generated tablebase files through mmap"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.tables = {}
+        self.max_pieces = 0
+        for name in os.listdir(directory):
+            if name.startswith('tb_') and name.endswith('.bin'):
+                self.max_pieces = max(self.max_pieces, sum(int(c) for c in name[3:-4]))
+
+    def close(self):
+        for table in self.tables.values():
+            if table is not None:
+                table.close()
+        self.tables = {}
+
+    def _table(self, signature):
+        if signature not in self.tables:
+            path = os.path.join(self.directory, file_name(signature))
+            table = None
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if table[:len(MAGIC)] != MAGIC:
+                    table.close()
+                    raise ValueError(f"{path} is not a tablebase file")
+            self.tables[signature] = table
+        return self.tables[signature]
+
+    def _masks(self, board):
+        if isinstance(board, BitBoard):
+            return board.white_men, board.white_king_mask, board.red_men, board.red_king_mask
+        masks = [0, 0, 0, 0]
+        for piece in board.get_all_pieces():
+            slot = (0 if piece.color == WHITE else 2) + (1 if piece.king else 0)
+            masks[slot] |= 1 << SQUARE_OF[piece.row * 8 + piece.col]
+        return tuple(masks)
+
+    def probe(self, board, turn):
+        """(result, distance in plies) for the side to move, or None if the position is not covered"""
+        if board.white_left + board.red_left > self.max_pieces:
+            return None
+        return self.probe_masks(self._masks(board), turn)
+
+    def probe_masks(self, masks, turn):
+        """probe() from (white men, white kings, red men, red kings) 32-square masks"""
+        signature = signature_of(*masks)
+        if signature[0] + signature[1] == 0 or signature[2] + signature[3] == 0:
+            return None
+        table = self._table(signature)
+        if table is None:
+            return None
+        value = table[len(MAGIC) + index_of(signature, *masks, turn)]
+        if value == INVALID:
+            return None
+        return decode(value)
+
+    def best_move(self, board, turn):
+        """The generate_moves() move with the best tablebase outcome, or None if not covered"""
+        if self.probe(board, turn) is None:
+            return None
+        other = RED if turn == WHITE else WHITE
+        best_move, best_score = None, None
+        for move in board.generate_moves(turn):
+            token = board.make_move(move)
+            if board.winner() is not None:
+                score = _score(encode('loss', 0))
+            else:
+                probed = self.probe(board, other)
+                score = _score(encode(*probed)) if probed is not None else None
+            board.unmake_move(token)
+            if score is not None and (best_score is None or score > best_score):
+                best_move, best_score = move, score
+        return best_move
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pieces', type=int, default=4, help="largest total piece count to solve")
+    parser.add_argument('--out', default='tablebases', help="output directory")
+    args = parser.parse_args()
+    generate(args.out, args.pieces)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import random
+from .constants import COLS, WHITE
+
+# 64-bit Zobrist keys, one per (8x8 square, piece kind), plus one for WHITE
+# to move. A fixed seed keeps keys (and therefore position hashes) stable
+# across processes, so hashes can be stored on disk or sent between workers.
+_rng = random.Random(0x0C4EC4E5)
+
+WHITE_MAN, WHITE_KING, RED_MAN, RED_KING = range(4)
+PIECE_KEYS = [[_rng.getrandbits(64) for _ in range(4)] for _ in range(64)]
+SIDE_KEY = _rng.getrandbits(64)
+
+
+def kind(color, king):
+    if color == WHITE:
+        return WHITE_KING if king else WHITE_MAN
+    return RED_KING if king else RED_MAN
+
+
+def piece_key(piece):
+    return PIECE_KEYS[piece.row * COLS + piece.col][kind(piece.color, piece.king)]
+
+
+def side_key(turn):
+    return SIDE_KEY if turn == WHITE else 0
+
+
+def hash_pieces(pieces):
+    """Hash of a set of pieces computed from scratch (boards keep theirs incrementally)"""
+    h = 0
+    for piece in pieces:
+        h ^= piece_key(piece)
+    return h
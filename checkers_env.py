@@ -1,61 +1,92 @@
 import gymnasium as gym
 import numpy as np
-import pygame
 from gymnasium import spaces
 from checkers.gameAI import Game
-from checkers.constants import ROWS, COLS, WHITE, RED
+from checkers.actions import action_dim, to_grid
+from checkers.tablebase import Tablebase
+from checkers.reset_pool import MAX_DRAWS, check_pool, load_pool
+from checkers.phase_stats import PhaseStats
+from checkers.constants import ROWS, COLS, WHITE, RED, WIDTH
 
 class CheckersEnv(gym.Env):
     metadata = {'render_modes': ['human', 'rgb_array'], 'render_fps': 30}
 
-    def __init__(self, render_mode=None):
+    def __init__(self, render_mode=None, backend='list', tablebase=None, action_encoding='grid', opponent=None,
+                 profile=False, reset_pool=None, render_size=WIDTH):
         # Define observation and action spaces FIRST
+        # 'grid': from * 64 + to over 4096 actions, 'compact': the 250 reachable pairs (checkers.actions)
+        self.action_encoding = action_encoding
+        n_actions = action_dim(action_encoding)
         self.observation_space = spaces.Dict({
             'board': spaces.Box(low=-2, high=2, shape=(64,), dtype=np.int8),
-            'action_mask': spaces.Box(low=0, high=1, shape=(4096,), dtype=np.int8)
+            'action_mask': spaces.Box(low=0, high=1, shape=(n_actions,), dtype=np.int8)
         })
-        self.action_space = spaces.Discrete(4096)
+        self.action_space = spaces.Discrete(n_actions)
         
         super().__init__()
         
         # Attributes
         self.render_mode = render_mode
-        self.game = Game(None)
-        self.current_player = WHITE
+        # profile=True times the phases of every step (see phase_stats()); off, nothing is timed
+        self.stats = PhaseStats() if profile else None
+        self.game = Game(None, backend=backend, stats=self.stats)
+        # Directory (or Tablebase) of endgame tables; covered positions end the episode with the exact result
+        self.tablebase = Tablebase(tablebase) if isinstance(tablebase, str) else tablebase
+        # Self-play: an OpponentPool answers every agent move as RED, so the agent only plays WHITE
+        self.opponent = opponent
+        self.snapshot = None  # pool snapshot playing RED this episode
+        # Game.to_bytes() positions (or a checkers.reset_pool file) reset() starts from at random;
+        # None: the start position. current_player is the side to move (see reset)
+        # Checked up front: a finished position would only fail at the reset that draws it
+        if isinstance(reset_pool, str):
+            reset_pool = load_pool(reset_pool)
+        elif reset_pool is not None:
+            check_pool(reset_pool)
+        self.reset_pool = reset_pool
+        self.current_player = self.game.turn
         self.steps = 0
         self.max_steps = 150
         self.action_history = []
         self.window_size = 800
         self.window = None
         self.clock = None
+        # Checked here rather than at the first render() (BoardFrames is only built then), maybe hours in
+        if render_size <= 0 or render_size % COLS:
+            raise ValueError(f"render_size must be a positive multiple of {COLS}, got {render_size}")
+        self.render_size = render_size  # side of the 'rgb_array' frames, in pixels
+        self.frames = None
 
     def get_observation(self):
-        board_obs = np.zeros((64,), dtype=np.int8)
-        action_mask = np.zeros((4096,), dtype=np.int8)
-
-        for row in range(8):
-            for col in range(8):
-                piece = self.game.board.get_piece(row, col)
-                if piece:
-                    idx = row * 8 + col
-                    value = 1 if piece.color == WHITE else -1
-                    if piece.king:
-                        value *= 2
-                    board_obs[idx] = value
-
-                    if piece.color == self.current_player:
-                        valid_moves = self.game.board.get_valid_moves(piece)
-                        for (to_row, to_col) in valid_moves:
-                            to_idx = to_row * 8 + to_col
-                            action_idx = idx * 64 + to_idx
-                            action_mask[action_idx] = 1
-
-        return {
-            'board': board_obs,
-            'action_mask': action_mask
-        }
+        # Cached for the ply by the game's PositionContext; the arrays must not be modified
+        context = self.game.context(self.current_player)
+        if self.stats is None:
+            return context.observation(self.action_encoding)
+        return self.stats.measure('observation', context.observation, self.action_encoding)
+
+    def phase_stats(self):
+        """Cumulative PhaseStats.totals() of this env (None unless built with profile=True)"""
+        return self.stats.totals() if self.stats is not None else None
 
     def step(self, action):
+        if self.stats is None:
+            return self._step(action)
+        self.stats.steps += 1
+        return self.stats.measure('step', self._step, action)
+
+    def _step(self, action):
+        obs, reward, terminated, truncated, info = self.play(action)
+        if self.opponent is not None and not (terminated or truncated):
+            obs, reward, terminated, info = self.reply(self._opponent_action(), reward, info)
+
+        if reward > 8.0:
+            print(f"\n⚠️ High reward: {reward:.2f} at step {self.steps}")
+            print(f"Last actions: {self.action_history[-5:]}")
+            print(f"Captures: {info.get('captures', 0)}")
+
+        return obs, reward, terminated, truncated, info
+
+    def play(self, action):
+        """The agent's move for current_player, without the opponent's reply"""
         self.steps += 1
         self.action_history.append(action)
 
@@ -68,62 +99,136 @@ class CheckersEnv(gym.Env):
             info['termination_reason'] = 'max_steps'
             return self.get_observation(), reward, terminated, truncated, info
 
-        from_row, from_col = divmod(action // 64, 8)
-        to_row, to_col = divmod(action % 64, 8)
-        piece = self.game.board.get_piece(from_row, from_col)
-        valid_moves = self.game.board.get_valid_moves(piece) if piece else {}
+        action = to_grid(action, self.action_encoding)
 
-        if piece and piece.color == self.current_player and (to_row, to_col) in valid_moves:
+        if action in self.game.context(self.current_player).actions:
             info['valid_move'] = True
-            self.game.select(from_row, from_col)
-            self.game.select(to_row, to_col)
+            # Game.play raises rather than ignore the move if current_player is not the side to move
+            captures = self.game.play(action)
 
             reward += 0.03
-            captures = len(valid_moves.get((to_row, to_col), []))
             if captures:
                 reward += 0.25 * captures
                 info['captures'] = captures
-
-            winner = self.game.winner()
-            draw_type = self.game.check_draw()
-
-            if winner is not None:
-                terminated = True
-                reward += 10.0 if winner == WHITE else -10.0
-                info['winner'] = winner
-                info['termination_reason'] = 'win'
-            elif draw_type is not None:
-                terminated = True
-                reward += 0.2  # Small bonus for surviving till draw
-                info['draw'] = draw_type
-                info['termination_reason'] = 'draw'
-
-            else:
-                # Normal move, continue
-                self.current_player = RED if self.current_player == WHITE else WHITE
+            outcome, terminated = self._outcome(info)
+            reward += outcome
         else:
             # Illegal move
             terminated = True
             reward = -1.0
             info['termination_reason'] = 'invalid_move'
 
-        if reward > 8.0:
-            print(f"\n⚠️ High reward: {reward:.2f} at step {self.steps}")
-            print(f"Last actions: {self.action_history[-5:]}")
-            print(f"Captures: {info.get('captures', 0)}")
-
         return self.get_observation(), reward, terminated, truncated, info
 
+    def reply_observation(self):
+        """(board, grid mask) the opponent answers; arrays are shared, read only"""
+        context = self.game.context(self.current_player)
+        return context.state, context.mask
+
+    def _opponent_action(self):
+        """The opponent's grid action for the position awaiting RED's move"""
+        board, mask = self.reply_observation()
+        if self.stats is None:
+            return self.opponent.act(board[None], mask[None], [self.snapshot])[0]
+        return self.stats.measure('opponent', self.opponent.act, board[None], mask[None], [self.snapshot])[0]
+
+    def reply(self, action, reward, info):
+        """Play the opponent's grid action after play(); returns (obs, reward, terminated, info)
+
+        reward stays WHITE's: the agent's reward plus the cost of the reply.
+        """
+        captures = self.game.play(action)
+        info['opponent_captures'] = captures
+        outcome, terminated = self._outcome(info)
+        return self.get_observation(), reward - 0.25 * captures + outcome, terminated, info
+
+    def _outcome(self, info):
+        """Reward and termination for the position after a move; passes the turn if the game goes on"""
+        winner = self.game.winner()
+        draw_type = self.game.check_draw()
+
+        if winner is not None:
+            info['winner'] = winner
+            info['termination_reason'] = 'win'
+            return (10.0 if winner == WHITE else -10.0), True
+        if draw_type is not None:
+            info['draw'] = draw_type
+            info['termination_reason'] = 'draw'
+            return 0.2, True  # Small bonus for surviving till draw
+        if self.tablebase is not None and self._probe_tablebase(info):
+            if 'winner' in info:
+                return (10.0 if info['winner'] == WHITE else -10.0), True
+            return 0.2, True
+
+        # Normal move, continue
+        self.current_player = RED if self.current_player == WHITE else WHITE
+        return 0.0, False
+
+    def _probe_tablebase(self, info):
+        """Fill info with the tablebase result of the position after the move; False if not covered"""
+        turn = RED if self.current_player == WHITE else WHITE
+        probed = self.tablebase.probe(self.game.board, turn)
+        if probed is None:
+            return False
+        result, distance = probed
+        info['tablebase'] = result
+        info['tablebase_distance'] = distance
+        info['termination_reason'] = 'tablebase'
+        if result == 'draw':
+            info['draw'] = 'tablebase'
+        else:
+            info['winner'] = turn if result == 'win' else self.current_player
+        return True
+
     def reset(self, seed=None, options=None):
+        """options={'state': Game.to_bytes() snapshot} starts from that position instead of the pool's
+
+        The agent plays the side to move. In self-play it only plays WHITE, so
+        when RED is to move the opponent's move is played here first; a pool
+        position that move ends the game is replaced by another.
+        """
         super().reset(seed=seed)
-        self.game.reset()
-        self.current_player = WHITE
+        state = (options or {}).get('state')
+        if state is not None and self.opponent is not None:
+            # RED's move on a finished position would reach the opponent with no legal move
+            check_pool([state], "options['state']")
         self.steps = 0
         self.action_history = []
+        if self.opponent is not None:
+            self.snapshot = self.opponent.sample(1, self.np_random)[0]
+        draws = 1
+        while not self._start(state):
+            if state is not None:
+                raise ValueError("RED's first move ends the game from this state")
+            if draws >= MAX_DRAWS:
+                raise ValueError(f"RED's first move ended the game from {MAX_DRAWS} reset pool positions in a row")
+            draws += 1
         return self.get_observation(), {}
 
+    def _start(self, state):
+        """Set the game to state (None: a pool position or the start); False if RED's opening ended it"""
+        if state is None and self.reset_pool:
+            state = self.reset_pool[self.np_random.integers(len(self.reset_pool))]
+        if state is None:
+            self.game.reset()
+        else:
+            self.game.restore(state)
+        self.current_player = self.game.turn
+        if self.opponent is None or self.current_player == WHITE:
+            return True
+        _, _, terminated, _ = self.reply(self._opponent_action(), 0.0, {})
+        return not terminated
+
     def render(self):
+        if self.render_mode == 'rgb_array':
+            if self.frames is None:
+                # Imported here so training envs never load pygame
+                from checkers.render import BoardFrames
+                self.frames = BoardFrames(self.render_size)
+            return self.frames.frame(self.game.board.state)
         if self.render_mode == 'human':
+            # Imported here so training envs never load pygame
+            import pygame
             if self.window is None:
                 pygame.init()
                 self.window = pygame.display.set_mode((self.window_size, self.window_size))
@@ -134,4 +239,5 @@ class CheckersEnv(gym.Env):
 
     def close(self):
         if self.window:
+            import pygame
             pygame.quit()
@@ -0,0 +1,346 @@
+"""CheckersEnv for N games at once, as a stable_baselines3 VecEnv.
+
+    vec_env = VecMonitor(CheckersVecEnv(num_envs=16))
+    model = MaskablePPO(MaskableActorCriticPolicy, vec_env)
+
+All boards live in one (N, 64) int8 array and a step is a handful of NumPy
+calls over the whole batch (checkers.batch_moves), with the rewards, draw
+rules and info keys of CheckersEnv.step. Finished games reset on their own;
+their last observation is in info['terminal_observation'], as with
+DummyVecEnv.
+
+With opponent=OpponentPool(...) the agent plays WHITE only and every move is
+answered in the same step_wait by a frozen snapshot playing RED, for all
+games in one batched call. The snapshot also plays RED's opening move when
+a game resets, so the agent's first observation is WHITE's.
+"""
+import time
+
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+
+from checkers import batch_moves
+from checkers.actions import COMPACT_ACTIONS, action_dim, grid_mask
+from checkers.boardAI import Board
+from checkers.constants import COLS, WHITE, RED, WIDTH
+from checkers.draw_tracker import NO_CAPTURE_LIMIT
+from checkers.phase_stats import PhaseStats
+from checkers.tablebase import Tablebase
+from checkers.zobrist import PIECE_KEYS, SIDE_KEY, WHITE_MAN, WHITE_KING, RED_MAN, RED_KING
+
+# Zobrist key of each (square, board value + 2), matching Game.get_board_hash()
+_KEYS = np.zeros((64, 5), dtype=np.uint64)
+for _sq in range(64):
+    for _value, _kind in ((1, WHITE_MAN), (2, WHITE_KING), (-1, RED_MAN), (-2, RED_KING)):
+        _KEYS[_sq, _value + 2] = PIECE_KEYS[_sq][_kind]
+_SQUARES = np.arange(64)
+
+# Draw types in the order Game.check_draw tests them
+DRAW_TYPES = ("threefold_repetition", "40_moves_no_capture", "no_legal_moves", "insufficient_material")
+
+
+def _board_keys(boards):
+    return np.bitwise_xor.reduce(_KEYS[_SQUARES, boards + 2], axis=1)
+
+
+def _side_keys(sides):
+    return np.where(sides > 0, SIDE_KEY, 0).astype(np.uint64)
+
+
+START = Board().state
+START_KEY = _board_keys(START[None])[0]
+
+
+def _piece_masks(board):
+    """(white men, white kings, red men, red kings) 32-square masks of one (64,) board"""
+    squares = batch_moves.to_squares(board[None])[0]
+    return tuple(int(np.packbits(squares == value, bitorder='little').view('<u4')[0]) for value in (1, 2, -1, -2))
+
+
+class CheckersVecEnv(VecEnv):
+    metadata = {'render_modes': ['rgb_array']}
+
+    def __init__(self, num_envs=16, tablebase=None, max_steps=150, action_encoding='grid', opponent=None,
+                 profile=False, render_mode=None, render_size=WIDTH):
+        # Masks and actions use action_encoding ('grid' or 'compact', see checkers.actions)
+        self.action_encoding = action_encoding
+        self.compact = action_encoding == 'compact'
+        n_actions = action_dim(action_encoding)
+        self.start_mask = batch_moves.legal_masks(START[None], RED, self.compact)[0]
+        observation_space = spaces.Dict({
+            'board': spaces.Box(low=-2, high=2, shape=(64,), dtype=np.int8),
+            'action_mask': spaces.Box(low=0, high=1, shape=(n_actions,), dtype=np.int8)
+        })
+        self.render_mode = render_mode
+        # Checked here rather than at the first get_images() (BoardFrames is only built then)
+        if render_size <= 0 or render_size % COLS:
+            raise ValueError(f"render_size must be a positive multiple of {COLS}, got {render_size}")
+        self.render_size = render_size  # side of each game's 'rgb_array' frame, in pixels
+        self.frames = None
+        self.tablebase = Tablebase(tablebase) if isinstance(tablebase, str) else tablebase
+        self.max_steps = max_steps
+        # Self-play: an OpponentPool answers every agent move as RED (see checkers.opponent_pool)
+        self.opponent = opponent
+        self.rng = np.random.default_rng()
+
+        # One row per game. players/turns are CheckersEnv.current_player and game.turn
+        # (+1 WHITE, -1 RED): equal while a game goes on, they only differ in a finished
+        # game, where players is still the side that made the last move.
+        self.boards = np.tile(START, (num_envs, 1))
+        self.players = np.ones(num_envs, dtype=np.int8)
+        self.turns = -np.ones(num_envs, dtype=np.int8)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.no_capture = np.zeros(num_envs, dtype=np.int64)
+        # Position hashes since the last capture or man move, as in checkers.draw_tracker: one
+        # per move (two per step in self-play), and no more once the no-capture rule has drawn
+        plies = 2 * max_steps if opponent is not None else max_steps
+        self.history = np.zeros((num_envs, min(plies, NO_CAPTURE_LIMIT) + 1), dtype=np.uint64)
+        self.history_len = np.zeros(num_envs, dtype=np.int64)
+        self.masks = np.zeros((num_envs, n_actions), dtype=np.int8)
+        self.snapshots = np.zeros(num_envs, dtype=np.int64)  # pool snapshot playing RED in each game
+        self.actions = None
+
+        self.total_steps = 0
+        self.step_seconds = 0.0
+        # profile=True times the phases of step_wait (see phase_stats()); off, nothing is timed
+        self.stats = PhaseStats() if profile else None
+        super().__init__(num_envs, observation_space, spaces.Discrete(n_actions))
+        self._reset_rows(np.arange(num_envs))
+
+    def _reset_rows(self, rows):
+        self.boards[rows] = START
+        self.players[rows] = -1
+        self.turns[rows] = -1
+        self.steps[rows] = 0
+        self.no_capture[rows] = 0
+        self.history[rows, 0] = START_KEY  # RED to move adds no side key
+        self.history_len[rows] = 1
+        self.masks[rows] = self.start_mask
+        if self.opponent is not None:
+            self.snapshots[rows] = self.opponent.sample(len(rows), self.rng)
+            self._open(rows)
+
+    def _open(self, rows):
+        """The opponent plays RED's first move in the just reset rows (it cannot end a game)"""
+        masks = grid_mask(self.masks[rows], self.action_encoding)
+        actions = self._timed('opponent', self.opponent.act, self.boards[rows], masks, self.snapshots[rows])
+        boards, _, legal = self._timed('move', batch_moves.apply_actions, self.boards[rows], RED, actions)
+        if not legal.all():
+            raise ValueError("Illegal opening move for RED")
+        self.boards[rows] = boards
+        self.players[rows] = 1
+        self.turns[rows] = 1
+        self.no_capture[rows] = 1
+        # A man moved, so the history starts over at the new position (see _play)
+        self.history[rows, 0] = _board_keys(boards) ^ _side_keys(self.turns[rows])
+        self.history_len[rows] = 1
+        self.masks[rows] = self._timed('mask', batch_moves.legal_masks, boards, WHITE, self.compact)
+
+    def _observation(self):
+        return {'board': self.boards.copy(), 'action_mask': self.masks.copy()}
+
+    def reset(self):
+        # VecEnv.seed() only stores the seeds; like DummyVecEnv, the next reset uses them once.
+        # They drive the snapshot draws; OpponentPool(seed=...) seeds the random opponent's moves
+        if self._seeds[0] is not None:
+            self.rng = np.random.default_rng(self._seeds[0])
+        self._reset_seeds()
+        self._reset_rows(np.arange(self.num_envs))
+        return self._observation()
+
+    def step_async(self, actions):
+        self.actions = np.asarray(actions).reshape(self.num_envs)
+
+    def step_wait(self):
+        if self.stats is None:
+            return self._step_wait()
+        self.stats.steps += self.num_envs
+        return self.stats.measure('step', self._step_wait)
+
+    def _timed(self, phase, function, *args):
+        """function(*args), charged to phase when profiling"""
+        if self.stats is None:
+            return function(*args)
+        return self.stats.measure(phase, function, *args)
+
+    def phase_stats(self):
+        """Cumulative PhaseStats.totals() over all games (None unless built with profile=True)"""
+        return self.stats.totals() if self.stats is not None else None
+
+    def _step_wait(self):
+        start = time.perf_counter()
+        n = self.num_envs
+        actions = self.actions
+
+        self.steps += 1
+        truncated = self.steps >= self.max_steps
+        valid = ~truncated & (self.masks[np.arange(n), actions] == 1)
+        invalid = ~truncated & ~valid
+
+        rewards = np.full(n, -0.02)
+        rewards[valid] += 0.03
+        rewards[invalid] = -1.0
+        infos = [{'valid_move': v, 'captures': 0} for v in valid.tolist()]
+        grid_actions = COMPACT_ACTIONS[actions] if self.compact else actions
+        terminated = invalid | self._play(valid, grid_actions, rewards, infos)
+        if self.opponent is not None:
+            # One batched opponent call answers every game still going, as RED
+            replying = valid & ~terminated
+            rows = np.nonzero(replying)[0]
+            replies = np.zeros(n, dtype=np.int64)
+            if len(rows):
+                masks = grid_mask(self.masks[rows], self.action_encoding)
+                replies[rows] = self._timed('opponent', self.opponent.act, self.boards[rows], masks, self.snapshots[rows])
+            terminated |= self._play(replying, replies, rewards, infos, opponent=True)
+
+        dones = terminated | truncated
+        done_rows = np.nonzero(dones)[0]
+        if len(done_rows):
+            terminal_masks = self._timed('mask', batch_moves.legal_masks, self.boards[done_rows],
+                                         self.players[done_rows], self.compact)
+            for row, mask in zip(done_rows, terminal_masks):
+                info = infos[row]
+                if truncated[row]:
+                    info['termination_reason'] = 'max_steps'
+                elif invalid[row]:
+                    info['termination_reason'] = 'invalid_move'
+                info['terminal_observation'] = {'board': self.boards[row].copy(), 'action_mask': mask}
+            self._reset_rows(done_rows)
+        for info, limit in zip(infos, (truncated & ~terminated).tolist()):
+            info['TimeLimit.truncated'] = limit
+
+        self.total_steps += n
+        self.step_seconds += time.perf_counter() - start
+        return self._observation(), rewards.astype(np.float32), dones, infos
+
+    def _play(self, acting, actions, rewards, infos, opponent=False):
+        """Play the (legal) grid actions of the acting rows and score the positions after them
+
+        Adds each move's reward and outcome to rewards and infos (an opponent's
+        captures cost the agent); returns the rows whose game ended.
+        """
+        men = np.abs(self.boards[np.arange(self.num_envs), actions // 64]) == 1
+        moved, captures, legal = self._timed('move', batch_moves.apply_actions, self.boards, self.players, actions)
+        # As with Game.play, a move the side to move cannot make is an error, never a silent no-op
+        if not legal[acting].all():
+            raise ValueError("Illegal move for the side to move")
+        captures = np.where(acting, captures, 0)
+        self.boards[acting] = moved[acting]
+        self.turns[acting] = -self.turns[acting]
+        self.no_capture[acting] = np.where(captures[acting] > 0, 0, self.no_capture[acting] + 1)
+        # Positions are keyed with the side to move next, as in Game.get_board_hash()
+        hashes = _board_keys(self.boards) ^ _side_keys(self.turns)
+        self.history_len[acting & ((captures > 0) | men)] = 0
+        recording = acting & (self.history_len < self.history.shape[1])
+        self.history[recording, self.history_len[recording]] = hashes[recording]
+        self.history_len[recording] += 1
+
+        key = 'opponent_captures' if opponent else 'captures'
+        rewards += (-0.25 if opponent else 0.25) * captures
+        for row in np.nonzero(acting)[0]:
+            infos[row][key] = int(captures[row])
+
+        white_left = (self.boards > 0).sum(axis=1)
+        red_left = (self.boards < 0).sum(axis=1)
+        winner = np.where(red_left <= 0, 1, np.where(white_left <= 0, -1, 0))
+        wins = acting & (winner != 0)
+        rewards[wins] += 10.0 * winner[wins]
+
+        turn_masks = self._timed('mask', batch_moves.legal_masks, self.boards, self.turns, self.compact)
+        draw_code = self._timed('draw', self._draw_codes, hashes, turn_masks, white_left, red_left)
+        draws = acting & ~wins & (draw_code > 0)
+        rewards[draws] += 0.2
+
+        for row in np.nonzero(wins)[0]:
+            infos[row]['winner'] = WHITE if winner[row] > 0 else RED
+            infos[row]['termination_reason'] = 'win'
+        for row in np.nonzero(draws)[0]:
+            infos[row]['draw'] = DRAW_TYPES[draw_code[row] - 1]
+            infos[row]['termination_reason'] = 'draw'
+        ended = wins | draws
+        if self.tablebase is not None:
+            covered = acting & ~ended & (white_left + red_left <= self.tablebase.max_pieces)
+            for row in np.nonzero(covered)[0]:
+                if self._probe_tablebase(row, infos[row]):
+                    ended[row] = True
+                    if 'winner' in infos[row]:
+                        rewards[row] += 10.0 if infos[row]['winner'] == WHITE else -10.0
+                    else:
+                        rewards[row] += 0.2
+
+        ongoing = acting & ~ended
+        self.players[ongoing] = -self.players[ongoing]
+        self.masks = turn_masks  # ongoing games have players == turns again; the rest get reset
+        return ended
+
+    def _draw_codes(self, hashes, turn_masks, white_left, red_left):
+        """1 + index in DRAW_TYPES of each game's draw (0: none), tested in Game.check_draw order"""
+        white_kings = (self.boards == 2).sum(axis=1)
+        red_kings = (self.boards == -2).sum(axis=1)
+        width = int(self.history_len.max())
+        recorded = np.arange(width) < self.history_len[:, None]
+        return np.select([
+            ((self.history[:, :width] == hashes[:, None]) & recorded).sum(axis=1) >= 3,
+            self.no_capture >= NO_CAPTURE_LIMIT,
+            ~turn_masks.any(axis=1),
+            ((white_left == 1) & (red_left == 1))
+            | ((white_left == 1) & (red_left == 2) & (red_kings == 2))
+            | ((red_left == 1) & (white_left == 2) & (white_kings == 2)),
+        ], [1, 2, 3, 4], 0)
+
+    def _probe_tablebase(self, row, info):
+        """CheckersEnv._probe_tablebase for one row; False if the position is not covered"""
+        player = WHITE if self.players[row] > 0 else RED
+        turn = RED if player == WHITE else WHITE
+        probed = self.tablebase.probe_masks(_piece_masks(self.boards[row]), turn)
+        if probed is None:
+            return False
+        result, distance = probed
+        info['tablebase'] = result
+        info['tablebase_distance'] = distance
+        info['termination_reason'] = 'tablebase'
+        if result == 'draw':
+            info['draw'] = 'tablebase'
+        else:
+            info['winner'] = turn if result == 'win' else player
+        return True
+
+    def action_masks(self):
+        """(N, n_actions) bool masks of the current observations, for MaskablePPO"""
+        return self.masks.astype(bool)
+
+    def get_images(self):
+        """One rgb_array frame per game, all drawn in one batch (see checkers.render.BoardFrames)"""
+        if self.frames is None:
+            # Imported here so training never loads pygame
+            from checkers.render import BoardFrames
+            self.frames = BoardFrames(self.render_size)
+        return list(self.frames.frames(self.boards))
+
+    def steps_per_second(self):
+        """Env steps (all games) per second spent inside step_wait"""
+        return self.total_steps / self.step_seconds if self.step_seconds else 0.0
+
+    def close(self):
+        if self.tablebase is not None:
+            self.tablebase.close()
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        """Attributes belong to the VecEnv and are shared by all games, so indices must name every game"""
+        if set(self._get_indices(indices)) != set(range(self.num_envs)):
+            raise ValueError(f"CheckersVecEnv attributes are shared by all games: cannot set {attr_name} for some")
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        indices = list(self._get_indices(indices))
+        if method_name == 'action_masks':
+            masks = self.action_masks()
+            return [masks[i] for i in indices]
+        return [getattr(self, method_name)(*method_args, **method_kwargs) for _ in indices]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
@@ -0,0 +1,122 @@
+"""Headless matches between AI players, reporting results and search speed.
+
+    python evaluate.py --white mcts --red ppo --games 20
+    python evaluate.py --white mcts-material --red random --games 50 --playouts 200
+    python evaluate.py --white search --red mcts --search-time 0.5
+
+mcts uses the MaskablePPO model for priors and leaf values; mcts-material
+runs the same tree search with a material count instead, so it needs no
+torch. Players report their speed (playouts/s, nodes/s) after the match.
+"""
+import argparse
+import random
+import time
+
+from checkers.actions import predict
+from checkers.constants import RED, WHITE
+from checkers.gameAI import Game
+from checkers.mcts import MCTS, MaterialEvaluator, PolicyEvaluator, encode
+from checkers.search import Searcher
+
+MODEL_PATH = "model/checkers_ai_model.zip"
+PLAYERS = ("mcts", "mcts-material", "ppo", "search", "random")
+MAX_PLIES = 300
+
+_model = None
+
+
+def load_model(path):
+    # Imported here so the search, mcts-material and random players run without torch
+    global _model
+    if _model is None:
+        from sb3_contrib import MaskablePPO
+        _model = MaskablePPO.load(path)
+    return _model
+
+
+class Player:
+    """Callable returning a generate_moves() tuple for game.turn, collecting speed stats"""
+
+    def __init__(self, name, args, seed=None):
+        self.name = name
+        self.args = args
+        self.rng = random.Random(seed)
+        self.moves = 0
+        self.work = 0      # playouts or nodes
+        self.seconds = 0.0
+        if name == "mcts":
+            self.mcts = MCTS(PolicyEvaluator(load_model(args.model)), args.batch_size)
+        elif name == "mcts-material":
+            self.mcts = MCTS(MaterialEvaluator(), args.batch_size)
+        elif name == "search":
+            self.searcher = Searcher()
+
+    def __call__(self, game):
+        start = time.perf_counter()
+        if self.name.startswith("mcts"):
+            move, info = self.mcts.search(game.board, game.turn, self.args.playouts)
+            self.work += info['playouts']
+        elif self.name == "search":
+            move, info = self.searcher.search(game.board, game.turn, self.args.search_time)
+            self.work += info['nodes']
+        elif self.name == "ppo":
+            board_obs, action_mask, moves = encode(game.board, game.turn)
+            action = predict(load_model(self.args.model), board_obs, action_mask)
+            move = next((m for m in moves if m[0] * 64 + m[1] == action), moves[0])
+        else:
+            move = self.rng.choice(game.board.generate_moves(game.turn))
+        self.seconds += time.perf_counter() - start
+        self.moves += 1
+        return move
+
+    def speed(self):
+        if self.name.startswith("mcts"):
+            return f"{self.work / self.seconds:.0f} playouts/s" if self.seconds else "-"
+        if self.name == "search":
+            return f"{self.work / self.seconds:.0f} nodes/s" if self.seconds else "-"
+        return f"{self.seconds / max(self.moves, 1) * 1000:.1f} ms/move"
+
+
+def play_game(white, red, max_plies=MAX_PLIES):
+    """Play one game; returns WHITE, RED or the draw reason"""
+    game = Game(None, backend='bitboard')
+    for _ in range(max_plies):
+        winner = game.winner()
+        if winner is not None:
+            return winner
+        draw_type = game.check_draw()
+        if draw_type:
+            return draw_type
+        frm, to, _ = (white if game.turn == WHITE else red)(game)
+        game.play(frm * 64 + to)
+    return "max_plies"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless matches between AI players")
+    parser.add_argument("--white", choices=PLAYERS, default="mcts")
+    parser.add_argument("--red", choices=PLAYERS, default="ppo")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--playouts", type=int, default=400, help="MCTS playouts per move")
+    parser.add_argument("--batch-size", type=int, default=16, help="MCTS leaves evaluated per forward pass")
+    parser.add_argument("--search-time", type=float, default=0.2, help="seconds per move for the search player")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    white = Player(args.white, args, args.seed)
+    red = Player(args.red, args, args.seed + 1)
+    results = {}
+    for number in range(1, args.games + 1):
+        result = play_game(white, red)
+        label = "white" if result == WHITE else "red" if result == RED else f"draw ({result})"
+        results[label] = results.get(label, 0) + 1
+        print(f"game {number}: {label}")
+
+    print(f"\nWHITE {args.white}: {results.get('white', 0)} wins, {white.speed()}")
+    print(f"RED   {args.red}: {results.get('red', 0)} wins, {red.speed()}")
+    print(f"draws: {sum(n for label, n in results.items() if label.startswith('draw'))}")
+
+
+if __name__ == "__main__":
+    main()
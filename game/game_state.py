@@ -1,71 +1,54 @@
-import pygame
-from game.board import Board
-
-RED = (39,24,16)
-WHITE = (255, 255, 255)
+from checkers.constants import RED, WHITE, SQUARE_SIZE
+from checkers.gameAI import Game
 
 class GameState:
+    """Online and local play on the shared rules core (checkers.gameAI.Game).
+
+    Peers send each other moves as grid actions (from_square * 64 + to_square)
+    rather than boards; a received move goes through Game.play, so an illegal
+    one is rejected and both sides keep the same position.
+    """
     def __init__(self, mode, screen, network=None, player_color=None):
-        self.board = Board()
-        self.turn = RED
-        self.selected = None
-        self.valid_moves = {}
+        self.game = Game(screen)
         self.mode = mode
         self.screen = screen
         self.network = network
         self.player_color = player_color
 
     def handle_network(self):
-        if self.network and self.player_color and self.turn != self.player_color:
-            data = self.network.receive()
-            if data:
-                self.board = data
-                self.change_turn()
+        if self.network and self.player_color and self.game.turn != self.player_color:
+            action = self.network.receive()
+            if action is not None:
+                try:
+                    self.game.play(action)
+                except ValueError as e:
+                    print("Rejected move from opponent:", e)
+
+    def outcome(self):
+        """Winning colour, a Game.check_draw() draw type, or None while the game goes on"""
+        return self.game.winner() or self.game.check_draw()
 
     def select(self, pos):
-        row, col = pos[1] // 100, pos[0] // 100
-        if self.selected:
-            result = self._move(row, col)
-            if not result:
-                self.selected = None
-                self.select(pos)
-        piece = self.board.get_piece(row, col)
-        # only allow selecting on your turn in online mode
-        if piece != 0 and piece.color == self.turn and (not self.network or self.turn == self.player_color):
-            self.selected = piece
-            self.valid_moves = self.board.get_valid_moves(piece)
-            return True
-        return False
-
-    def _move(self, row, col):
-        piece = self.board.get_piece(row, col)
-        if self.selected and (row, col) in self.valid_moves:
-            self.board.move(self.selected, row, col)
-            skipped = self.valid_moves[(row, col)]
-            if skipped:
-                self.board.remove(skipped)
-            # send updated board to opponent
-            if self.network and self.mode in ["HOST", "JOIN"]:
-                self.network.send(self.board)
-            self.change_turn()
-        else:
+        row, col = pos[1] // SQUARE_SIZE, pos[0] // SQUARE_SIZE
+        # only allow moving on your turn in online mode, and not after the game is over
+        if (self.network and self.game.turn != self.player_color) or self.outcome():
             return False
-        return True
-
-    def draw_valid_moves(self, moves):
-        for move in moves:
-            row, col = move
-            pygame.draw.circle(self.screen, (0,255,0), (col*100 + 50, row*100 + 50), 15)
+        selected = self.game.selected
+        if selected and (row, col) in self.game.valid_moves:
+            action = (selected.row * 8 + selected.col) * 64 + row * 8 + col
+            self.game.play(action)
+            # send the move to the opponent
+            if self.network and self.mode in ["HOST", "JOIN"]:
+                self.network.send(action)
+            return True
+        return self.game.select(row, col)
 
     def update(self):
-        self.board.draw(self.screen)
-        self.draw_valid_moves(self.valid_moves)
+        # Imported here so the rules can be driven without a display (see checkers.conformance)
+        import pygame
+        self.game.update()
         pygame.display.update()
 
     def reset(self):
-        self.selected = None
-        self.valid_moves = {}
-
-    def change_turn(self):
-        self.valid_moves = {}
-        self.turn = WHITE if self.turn == RED else RED
+        self.game.selected = None
+        self.game.valid_moves = {}
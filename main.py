@@ -33,6 +33,7 @@ def main():
         player_color = WHITE
 
     game = GameState(mode, screen, network, player_color)
+    finished = False
 
     while run:
         game.handle_network()
@@ -45,6 +46,14 @@ def main():
                 game.select(pos)
 
         game.update()
+        outcome = game.outcome()
+        if outcome is not None and not finished:
+            finished = True
+            if isinstance(outcome, str):
+                result = "Draw (" + outcome.replace("_", " ") + ")"
+            else:
+                result = "Red wins" if outcome == RED else "White wins"
+            pygame.display.set_caption("Checkers - " + result)
         clock.tick(60)
 
     pygame.quit()
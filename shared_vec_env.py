@@ -0,0 +1,304 @@
+"""CheckersEnv games stepped in worker processes, with observations in shared memory.
+
+    vec_env = VecMonitor(SharedMemoryVecEnv(make_masked_env, num_workers=4, envs_per_worker=8))
+
+Each worker owns envs_per_worker envs built by env_fn (ActionMasker-wrapped
+CheckersEnv in train_visualization). Boards, action masks, actions, rewards
+and dones live in multiprocessing.shared_memory arrays, so a step sends one
+small command down each pipe and gets the info dicts back, instead of
+pickling every 4096-wide mask like SubprocVecEnv.
+
+Observations go to a ring of RING_SLOTS slots, one per step: the arrays
+returned by step_wait are views into the shared slot, and stay valid while
+the next steps are collected (the rollout buffer stores the previous
+observation after stepping).
+
+With opponent=OpponentPool(...) a step has two rounds: the workers play the
+agent's moves and publish the positions awaiting RED's reply, the main
+process answers all of them with one batched call, and the workers play the
+replies. The snapshots only ever live in the main process, which also
+plays RED's first move, the same way, in games that start with RED to move.
+"""
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+from stable_baselines3.common.env_util import is_wrapped
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+
+from checkers.actions import GRID_DIM
+from checkers.constants import RED
+
+RING_SLOTS = 4
+
+
+def _layout(n_actions):
+    """name -> (kind, per-env shape, dtype); 'ring' arrays hold RING_SLOTS copies of every env's row"""
+    return {
+        'boards': ('ring', (64,), np.int8),
+        'masks': ('ring', (n_actions,), np.int8),
+        'terminal_boards': ('env', (64,), np.int8),
+        'terminal_masks': ('env', (n_actions,), np.int8),
+        'actions': ('env', (), np.int64),
+        'rewards': ('env', (), np.float32),
+        'dones': ('env', (), bool),
+        # Self-play: positions awaiting the opponent's reply, with grid masks
+        'pending': ('env', (), bool),
+        'reply_boards': ('env', (64,), np.int8),
+        'reply_masks': ('env', (GRID_DIM,), np.int8),
+    }
+
+
+def _shape(kind, shape, num_envs):
+    return ((RING_SLOTS, num_envs) if kind == 'ring' else (num_envs,)) + shape
+
+
+def _attach(names, num_envs, n_actions):
+    """Map the shared blocks created by the main process; returns (blocks, arrays)"""
+    blocks, arrays = [], {}
+    for key, (kind, shape, dtype) in _layout(n_actions).items():
+        block = shared_memory.SharedMemory(name=names[key])
+        blocks.append(block)
+        arrays[key] = np.ndarray(_shape(kind, shape, num_envs), dtype=dtype, buffer=block.buf)
+    return blocks, arrays
+
+
+def _write(arrays, slot, row, env, obs):
+    arrays['boards'][slot, row] = obs['board']
+    arrays['masks'][slot, row] = env.action_masks()
+
+
+def _finish(arrays, slot, row, env, obs, reward, terminated, truncated, info):
+    """Publish one env's step result, resetting it if the game is over; returns info"""
+    done = terminated or truncated
+    info['TimeLimit.truncated'] = truncated and not terminated
+    if done:
+        arrays['terminal_boards'][row] = obs['board']
+        arrays['terminal_masks'][row] = obs['action_mask']
+        obs, _ = env.reset()
+    _write(arrays, slot, row, env, obs)
+    arrays['rewards'][row] = reward
+    arrays['dones'][row] = done
+    return info
+
+
+def _await_opening(arrays, row, env):
+    """Self-play: publish a new game's position for the opponent if RED is to move (the agent plays WHITE)"""
+    arrays['pending'][row] = env.get_wrapper_attr('current_player') == RED
+    if arrays['pending'][row]:
+        arrays['reply_boards'][row], arrays['reply_masks'][row] = env.get_wrapper_attr('reply_observation')()
+
+
+def _worker(remote, names, num_envs, n_actions, first, env_fn, count, self_play):
+    """Step envs first..first+count-1 on commands from the main process"""
+    blocks, arrays = _attach(names, num_envs, n_actions)
+    envs = [env_fn() for _ in range(count)]
+    moves = []
+    try:
+        while True:
+            command, data = remote.recv()
+            if command == 'step':
+                remote.send([_finish(arrays, data, row, env, *env.step(int(arrays['actions'][row])))
+                             for row, env in enumerate(envs, first)])
+            elif command == 'move':
+                # Self-play, first round: the agent's moves; unfinished games wait for a reply
+                moves = [env.step(int(arrays['actions'][row])) for row, env in enumerate(envs, first)]
+                for (row, env), (_, _, terminated, truncated, _) in zip(enumerate(envs, first), moves):
+                    arrays['pending'][row] = not (terminated or truncated)
+                    if arrays['pending'][row]:
+                        arrays['reply_boards'][row], arrays['reply_masks'][row] = \
+                            env.get_wrapper_attr('reply_observation')()
+                remote.send(None)
+            elif command == 'reply':
+                infos = []
+                for (row, env), (obs, reward, terminated, truncated, info) in zip(enumerate(envs, first), moves):
+                    if arrays['pending'][row]:
+                        obs, reward, terminated, info = env.get_wrapper_attr('reply')(
+                            int(arrays['actions'][row]), reward, info)
+                    infos.append(_finish(arrays, data, row, env, obs, reward, terminated, truncated, info))
+                    _await_opening(arrays, row, env)
+                remote.send(infos)
+            elif command == 'open':
+                # Self-play: RED's first move in new games; one it ends is replaced by another game
+                for row, env in enumerate(envs, first):
+                    if arrays['pending'][row]:
+                        obs, _, terminated, _ = env.get_wrapper_attr('reply')(int(arrays['actions'][row]), 0.0, {})
+                        if terminated:
+                            obs, _ = env.reset()
+                        _write(arrays, data, row, env, obs)
+                        _await_opening(arrays, row, env)
+                remote.send(None)
+            elif command == 'reset':
+                for row, env in enumerate(envs, first):
+                    obs, _ = env.reset()
+                    _write(arrays, data, row, env, obs)
+                    if self_play:
+                        _await_opening(arrays, row, env)
+                remote.send(None)
+            elif command == 'close':
+                break
+            else:
+                # Attribute access on some of this worker's envs: data is (argument, local indices)
+                argument, local = data
+                selected = [envs[i] for i in local]
+                if command == 'get_attr':
+                    remote.send([env.get_wrapper_attr(argument) for env in selected])
+                elif command == 'set_attr':
+                    remote.send([env.set_wrapper_attr(*argument) for env in selected])
+                elif command == 'env_method':
+                    name, args, kwargs = argument
+                    remote.send([env.get_wrapper_attr(name)(*args, **kwargs) for env in selected])
+                elif command == 'is_wrapped':
+                    remote.send([is_wrapped(env, argument) for env in selected])
+    finally:
+        for env in envs:
+            env.close()
+        for block in blocks:
+            block.close()
+        remote.close()
+
+
+class SharedMemoryVecEnv(VecEnv):
+    """num_workers processes with envs_per_worker envs each, as one SB3 VecEnv"""
+
+    def __init__(self, env_fn, num_workers=2, envs_per_worker=4, start_method=None, opponent=None):
+        num_envs = num_workers * envs_per_worker
+        # Spaces (and the mask width of the env's action encoding) from one throwaway env
+        probe = env_fn()
+        observation_space, action_space = probe.observation_space, probe.action_space
+        probe.close()
+        n_actions = action_space.n
+
+        self.envs_per_worker = envs_per_worker
+        # Self-play: env_fn's envs play the agent's moves, this process plays RED (see checkers.opponent_pool)
+        self.opponent = opponent
+        self.rng = np.random.default_rng()
+        self.snapshots = np.zeros(num_envs, dtype=np.int64)
+        self.blocks = {}
+        self.arrays = {}
+        for key, (kind, shape, dtype) in _layout(n_actions).items():
+            full_shape = _shape(kind, shape, num_envs)
+            size = max(int(np.prod(full_shape)) * np.dtype(dtype).itemsize, 1)
+            self.blocks[key] = shared_memory.SharedMemory(create=True, size=size)
+            self.arrays[key] = np.ndarray(full_shape, dtype=dtype, buffer=self.blocks[key].buf)
+        names = {key: block.name for key, block in self.blocks.items()}
+
+        context = multiprocessing.get_context(start_method)
+        self.remotes, self.processes = [], []
+        for worker in range(num_workers):
+            remote, worker_remote = context.Pipe()
+            process = context.Process(target=_worker, daemon=True, args=(
+                worker_remote, names, num_envs, n_actions, worker * envs_per_worker, env_fn, envs_per_worker,
+                opponent is not None))
+            process.start()
+            worker_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+
+        self.slot = 0
+        self.closed = False
+        self.render_mode = None
+        super().__init__(num_envs, observation_space, action_space)
+
+    def _observation(self):
+        return {'board': self.arrays['boards'][self.slot], 'action_mask': self.arrays['masks'][self.slot]}
+
+    def reset(self):
+        if self.opponent is not None:
+            self.snapshots[:] = self.opponent.sample(self.num_envs, self.rng)
+        self.slot = (self.slot + 1) % RING_SLOTS
+        for remote in self.remotes:
+            remote.send(('reset', self.slot))
+        for remote in self.remotes:
+            remote.recv()
+        if self.opponent is not None:
+            self._open()
+        return self._observation()
+
+    def step_async(self, actions):
+        self.arrays['actions'][:] = np.asarray(actions).reshape(self.num_envs)
+        self.slot = (self.slot + 1) % RING_SLOTS
+        for remote in self.remotes:
+            remote.send(('step' if self.opponent is None else 'move', self.slot))
+
+    def step_wait(self):
+        if self.opponent is not None:
+            self._reply()
+        infos = []
+        for remote in self.remotes:
+            infos.extend(remote.recv())
+        dones = self.arrays['dones'].copy()
+        for row in np.nonzero(dones)[0]:
+            infos[row]['terminal_observation'] = {
+                'board': self.arrays['terminal_boards'][row].copy(),
+                'action_mask': self.arrays['terminal_masks'][row].copy(),
+            }
+        if self.opponent is not None:
+            if dones.any():
+                self.snapshots[dones] = self.opponent.sample(int(dones.sum()), self.rng)
+            self._open()
+        return self._observation(), self.arrays['rewards'].copy(), dones, infos
+
+    def _reply(self):
+        """Answer every game awaiting RED's move with one batched opponent call"""
+        for remote in self.remotes:
+            remote.recv()
+        rows = np.nonzero(self.arrays['pending'])[0]
+        if len(rows):
+            self.arrays['actions'][rows] = self.opponent.act(
+                self.arrays['reply_boards'][rows], self.arrays['reply_masks'][rows], self.snapshots[rows])
+        for remote in self.remotes:
+            remote.send(('reply', self.slot))
+
+    def _open(self):
+        """Play RED's first move, with one batched opponent call per round, in every game waiting for it"""
+        while self.arrays['pending'].any():
+            rows = np.nonzero(self.arrays['pending'])[0]
+            self.arrays['actions'][rows] = self.opponent.act(
+                self.arrays['reply_boards'][rows], self.arrays['reply_masks'][rows], self.snapshots[rows])
+            for remote in self.remotes:
+                remote.send(('open', self.slot))
+            for remote in self.remotes:
+                remote.recv()
+
+    def action_masks(self):
+        """(N, n_actions) bool masks of the current observations, for MaskablePPO"""
+        return self.arrays['masks'][self.slot].astype(bool)
+
+    def _per_env(self, command, argument, indices):
+        """Run command on the envs at indices (grouped by worker); returns the replies"""
+        targets = {}
+        for index in self._get_indices(indices):
+            worker, local = divmod(index, self.envs_per_worker)
+            targets.setdefault(worker, []).append(local)
+        for worker, local in targets.items():
+            self.remotes[worker].send((command, (argument, local)))
+        return [reply for worker in targets for reply in self.remotes[worker].recv()]
+
+    def get_attr(self, attr_name, indices=None):
+        return self._per_env('get_attr', attr_name, indices)
+
+    def set_attr(self, attr_name, value, indices=None):
+        self._per_env('set_attr', (attr_name, value), indices)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        if method_name == 'action_masks':
+            masks = self.action_masks()
+            return [masks[i] for i in self._get_indices(indices)]
+        return self._per_env('env_method', (method_name, method_args, method_kwargs), indices)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return self._per_env('is_wrapped', wrapper_class, indices)
+
+    def close(self):
+        if self.closed:
+            return
+        for remote in self.remotes:
+            remote.send(('close', None))
+        for process in self.processes:
+            process.join()
+        self.arrays = {}
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.closed = True
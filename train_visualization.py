@@ -1,9 +1,13 @@
 import os
+import argparse
 import datetime
+import functools
+import glob
 import numpy as np
 import torch
 import torch.nn as nn
 import csv
+import time
 import gymnasium as gym
 from sb3_contrib import MaskablePPO
 from sb3_contrib.common.maskable.policies import MaskableActorCriticPolicy
@@ -12,6 +16,11 @@ from stable_baselines3.common.callbacks import BaseCallback
 from stable_baselines3.common.vec_env import DummyVecEnv, VecMonitor
 from stable_baselines3.common.torch_layers import BaseFeaturesExtractor
 from checkers_env import CheckersEnv
+from checkers.actions import ENCODINGS
+from checkers.opponent_pool import OpponentPool
+from checkers.phase_stats import PHASES, merge, per_step_us
+from checkers_vec_env import CheckersVecEnv
+from shared_vec_env import SharedMemoryVecEnv
 
 # === CONFIGURATION ===
 MODEL_DIR = "models"
@@ -20,9 +29,15 @@ MODEL_VERSION = "v2"
 ARCHITECTURE_VERSION = "2.1"
 MODEL_PATH = os.path.join(MODEL_DIR, f"checkers_ai_{MODEL_VERSION}_{ARCHITECTURE_VERSION}")
 LOG_PATH = os.path.join(LOG_DIR, "training_log.csv")
+NUM_ENVS = 16  # games stepped together by CheckersVecEnv (1 = the single CheckersEnv)
+ENVS_PER_WORKER = 8  # CheckersEnv games per rollout process with --num-workers
+POOL_DIR = os.path.join(MODEL_DIR, "pool")  # self-play snapshots
+POOL_SIZE = 8  # snapshots kept in memory as opponents
+SNAPSHOT_INTERVAL = 50_000  # steps between self-play snapshots
 
 os.makedirs(MODEL_DIR, exist_ok=True)
 os.makedirs(LOG_DIR, exist_ok=True)
+os.makedirs(POOL_DIR, exist_ok=True)
 
 # === FEATURE EXTRACTOR ===
 class RobustMaskedFeatureExtractor(BaseFeaturesExtractor):
@@ -45,9 +60,16 @@ class RobustMaskedFeatureExtractor(BaseFeaturesExtractor):
 
 # === CALLBACK ===
 class EnhancedTrainingLogger(BaseCallback):
-    def __init__(self, filename=LOG_PATH):
+    def __init__(self, filename=LOG_PATH, profile=False):
         super().__init__()
         self.filename = filename
+        # With profiled envs: per-phase env microseconds per step over the last rollout,
+        # and its wall time per step (the rest is the policy and SB3)
+        self.profile = profile
+        self.phase_us = dict.fromkeys(PHASES, 0.0)
+        self.rollout_us = 0.0
+        self.last_totals = None
+        self.rollout_start = None
         self.episode_rewards = []
         self.current_episode_rewards = []
         self.valid_moves = 0
@@ -67,7 +89,26 @@ class EnhancedTrainingLogger(BaseCallback):
                 "valid_move_pct",
                 "episode_length",
                 "time_elapsed"
-            ])
+            ] + ([f"{phase}_us" for phase in PHASES] + ["rollout_us"] if profile else []))
+
+    def _phase_totals(self):
+        venv = self.training_env.unwrapped
+        if hasattr(venv, "phase_stats"):
+            return venv.phase_stats()  # CheckersVecEnv: all games at once
+        return merge(self.training_env.env_method("phase_stats"))
+
+    def _on_rollout_start(self) -> None:
+        self.rollout_start = (time.perf_counter_ns(), self.num_timesteps)
+
+    def _on_rollout_end(self) -> None:
+        if not self.profile:
+            return
+        totals = self._phase_totals()
+        self.phase_us = per_step_us(totals, self.last_totals)
+        self.last_totals = totals
+        start, steps = self.rollout_start
+        if self.num_timesteps > steps:
+            self.rollout_us = (time.perf_counter_ns() - start) / 1000 / (self.num_timesteps - steps)
 
     def _on_step(self) -> bool:
         # Track moves and episode completion
@@ -103,7 +144,7 @@ class EnhancedTrainingLogger(BaseCallback):
                         valid_pct,
                         episode_length,
                         time_elapsed
-                    ])
+                    ] + ([self.phase_us[phase] for phase in PHASES] + [self.rollout_us] if self.profile else []))
                 
                 # Print summary
                 print(
@@ -123,12 +164,48 @@ class EnhancedTrainingLogger(BaseCallback):
         
         return True
 
+class OpponentPoolCallback(BaseCallback):
+    """Every `interval` steps, save the model to POOL_DIR and add it to the self-play pool"""
+    def __init__(self, pool, interval=SNAPSHOT_INTERVAL, directory=POOL_DIR):
+        super().__init__()
+        self.pool = pool
+        self.interval = interval
+        self.directory = directory
+        self.last_snapshot = 0
+
+    def _on_step(self) -> bool:
+        if self.num_timesteps - self.last_snapshot >= self.interval:
+            path = os.path.join(self.directory, f"snapshot_{self.num_timesteps}")
+            self.model.save(path)
+            self.pool.add(self.model, name=os.path.basename(path))
+            self.last_snapshot = self.num_timesteps
+            print(f"\n♟️ Opponent pool: {', '.join(self.pool.names())}")
+        return True
+
 # === MASK FUNCTION ===
 def safe_mask_fn(env) -> np.ndarray:
-    obs = env.get_observation()
-    return obs['action_mask'].astype(bool)
+    # Same cached mask as the last observation (in the env's encoding), no extra move generation
+    return env.get_observation()['action_mask'].astype(bool)
+
+# === ENVIRONMENT ===
+def make_masked_env(action_encoding='grid', opponent=None, profile=False):
+    return ActionMasker(CheckersEnv(action_encoding=action_encoding, opponent=opponent, profile=profile), safe_mask_fn)
+
+def make_vec_env(num_envs=NUM_ENVS, num_workers=0, envs_per_worker=ENVS_PER_WORKER, action_encoding='grid',
+                 opponent=None, profile=False):
+    # opponent (an OpponentPool) stays in this process; rollout workers only play the agent's moves
+    env_fn = functools.partial(make_masked_env, action_encoding, profile=profile)
+    if num_workers > 0:
+        return VecMonitor(SharedMemoryVecEnv(env_fn, num_workers, envs_per_worker, opponent=opponent))
+    if num_envs == 1:
+        return VecMonitor(DummyVecEnv([functools.partial(make_masked_env, action_encoding, opponent, profile)]))
+    return VecMonitor(CheckersVecEnv(num_envs, action_encoding=action_encoding, opponent=opponent, profile=profile))
 
 # === MODEL CREATION ===
+def rollout_steps(num_envs):
+    """n_steps per env that keeps ~2048 transitions per rollout, whatever the number of envs"""
+    return max(2048 // num_envs, 64)
+
 def create_model(env):
     policy_kwargs = {
         "features_extractor_class": RobustMaskedFeatureExtractor,
@@ -142,7 +219,7 @@ def create_model(env):
         MaskableActorCriticPolicy,
         env,
         learning_rate=3e-4,
-        n_steps=2048,
+        n_steps=rollout_steps(env.num_envs),
         batch_size=128,
         n_epochs=10,
         gamma=0.95,
@@ -156,16 +233,23 @@ def create_model(env):
     )
 
 # === TRAIN FUNCTION ===
-def train():
-    env = CheckersEnv()
-    env = ActionMasker(env, safe_mask_fn)
-    vec_env = DummyVecEnv([lambda: env])
-    vec_env = VecMonitor(vec_env)
+def train(num_workers=0, envs_per_worker=ENVS_PER_WORKER, action_encoding='grid', self_play=False, profile=False):
+    # Self-play: RED is played by the latest snapshots in POOL_DIR (or the loaded model to start with)
+    pool = None
+    if self_play:
+        snapshots = sorted(glob.glob(os.path.join(POOL_DIR, "*.zip")), key=os.path.getmtime)
+        pool = OpponentPool(snapshots[-POOL_SIZE:], max_size=POOL_SIZE)
+    vec_env = make_vec_env(num_workers=num_workers, envs_per_worker=envs_per_worker,
+                           action_encoding=action_encoding, opponent=pool, profile=profile)
+    # Compact models have a different action head, so they get their own checkpoint
+    # (python -m checkers.actions converts an existing grid one)
+    model_path = MODEL_PATH if action_encoding == 'grid' else f"{MODEL_PATH}_{action_encoding}"
 
     model = None
-    if os.path.exists(MODEL_PATH + ".zip"):
+    if os.path.exists(model_path + ".zip"):
         try:
-            model = MaskablePPO.load(MODEL_PATH, env=vec_env)
+            # The checkpoint's n_steps was set for the env count it was trained with
+            model = MaskablePPO.load(model_path, env=vec_env, n_steps=rollout_steps(vec_env.num_envs))
             print("✅ Loaded existing model and continuing training")
         except Exception as e:
             print(f"❌ Failed to load model: {e}")
@@ -174,12 +258,17 @@ def train():
         print("📦 Creating new model")
         model = create_model(vec_env)
 
-    logger = EnhancedTrainingLogger()
+    logger = EnhancedTrainingLogger(profile=profile)
+    callbacks = [logger]
+    if pool is not None:
+        if not len(pool):
+            pool.add(model, name="initial")
+        callbacks.append(OpponentPoolCallback(pool))
 
     try:
         model.learn(
             total_timesteps=500_000,
-            callback=logger,
+            callback=callbacks,
             log_interval=1,  # Show progress every step
             progress_bar=True,
             reset_num_timesteps=False
@@ -191,8 +280,22 @@ def train():
         model.save(crash_path)
         print(f"💾 Crash recovery model saved to: {crash_path}")
     finally:
-        model.save(MODEL_PATH)
-        print(f"💾 Final model saved to: {MODEL_PATH}")
+        model.save(model_path)
+        print(f"💾 Final model saved to: {model_path}")
+        if isinstance(vec_env.venv, CheckersVecEnv):
+            print(f"⏱️ Env throughput: {vec_env.venv.steps_per_second():.0f} steps/s over {vec_env.num_envs} games")
+        vec_env.close()  # stops rollout workers and frees their shared memory
 
 if __name__ == "__main__":
-    train()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the MaskablePPO checkers model")
+    parser.add_argument("--num-workers", type=int, default=0,
+                        help="rollout processes with shared-memory observations (0: CheckersVecEnv in this process)")
+    parser.add_argument("--envs-per-worker", type=int, default=ENVS_PER_WORKER)
+    parser.add_argument("--action-encoding", choices=ENCODINGS, default="grid",
+                        help="grid: 4096 from-to actions, compact: the 250 reachable ones")
+    parser.add_argument("--self-play", action="store_true",
+                        help=f"play WHITE against frozen snapshots from {POOL_DIR} instead of moving for both sides")
+    parser.add_argument("--profile", action="store_true",
+                        help="time the env phases and log them (microseconds per step) to the training CSV")
+    args = parser.parse_args()
+    train(args.num_workers, args.envs_per_worker, args.action_encoding, args.self_play, args.profile)
\ No newline at end of file